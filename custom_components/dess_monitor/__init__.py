@@ -2,12 +2,24 @@ from __future__ import annotations
 
 import asyncio
 
+import aiohttp
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.typing import ConfigType
 
-from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator
+from custom_components.dess_monitor.api.client import DessClient, REQUEST_TIMEOUT
+from custom_components.dess_monitor.auth import AuthManager
+from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators.burst import BurstManager
+from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator, \
+    async_remove_resolution_plans
 from custom_components.dess_monitor.coordinators.direct_coordinator import DirectCoordinator
+from custom_components.dess_monitor.coordinators.settings_coordinator import SettingsCoordinator
+from custom_components.dess_monitor.coordinators.snapshot import CoordinatorSnapshot
+from custom_components.dess_monitor.services import async_setup_services
 from . import hub
 
 # List of platforms to support. There should be a matching .py file for each,
@@ -16,28 +28,69 @@ PLATFORMS = [Platform.SENSOR, Platform.SELECT, Platform.NUMBER]
 
 type HubConfigEntry = ConfigEntry[hub.Hub]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    # services are shared by every entry, they resolve the entry from the selected device
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: HubConfigEntry) -> bool:
     # Store an instance of the "connecting" class that does the work of speaking
     # with your actual devices.
     await _migrate_data_to_options(hass, entry)
-    my_coordinator = MainCoordinator(hass, entry)
-    direct_coordinator_ctx = DirectCoordinator(hass, entry)
-    await asyncio.gather(
-        my_coordinator.async_config_entry_first_refresh(),
-        direct_coordinator_ctx.async_config_entry_first_refresh()
-    )
-
-    entry.runtime_data = hub.Hub(hass, entry.data["username"], my_coordinator, direct_coordinator_ctx)
-    await entry.runtime_data.init()
-    # This creates each HA object for each platform your device requires.
-    # It's done by calling the `async_setup_entry` function in each platform module.
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    await asyncio.gather(
-        direct_coordinator_ctx.async_refresh(),
-        my_coordinator.async_refresh()
-    )
-    entry.async_on_unload(entry.add_update_listener(_update_listener))
+    # HA's shared connector and user agent, the session is released when the entry unloads
+    session = async_create_clientsession(hass, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT))
+    client = DessClient(session)
+    try:
+        # one token per entry, shared by every coordinator
+        auth_manager = AuthManager(hass, entry, client)
+        await auth_manager.async_load()
+        my_coordinator = MainCoordinator(hass, entry, client, auth_manager)
+        direct_coordinator_ctx = DirectCoordinator(hass, entry, client, auth_manager)
+        snapshot = CoordinatorSnapshot(hass, entry, my_coordinator, direct_coordinator_ctx)
+        stored = await snapshot.async_load()
+        if stored is not None:
+            # warm start, the entities come up from the last good data and refresh in the background
+            await my_coordinator.async_restore(stored)
+            direct_coordinator_ctx.restore(stored)
+        else:
+            await asyncio.gather(
+                my_coordinator.async_config_entry_first_refresh(),
+                direct_coordinator_ctx.async_config_entry_first_refresh()
+            )
+
+        entry.runtime_data = hub.Hub(hass, entry.data["username"], my_coordinator, direct_coordinator_ctx, client,
+                                     auth_manager)
+        await entry.runtime_data.init()
+        settings_coordinator = SettingsCoordinator(hass, entry, my_coordinator)
+        entry.runtime_data.settings_coordinator = settings_coordinator
+        if entry.options.get('direct_request_protocol', False):
+            entry.runtime_data.burst = BurstManager(hass, entry, direct_coordinator_ctx)
+        # This creates each HA object for each platform your device requires.
+        # It's done by calling the `async_setup_entry` function in each platform module.
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        # hand the data the entities were created from to them, instead of fetching it again
+        my_coordinator.async_publish_current()
+        if stored is not None:
+            entry.async_create_background_task(
+                hass, _async_refresh_all(my_coordinator, direct_coordinator_ctx), "dess_monitor warm start refresh"
+            )
+        else:
+            direct_coordinator_ctx.async_publish_current()
+        entry.async_on_unload(my_coordinator.async_add_listener(snapshot.async_schedule_save))
+        # ctrl values are swept in the background, setting entities fill in when it completes
+        entry.async_create_background_task(
+            hass, settings_coordinator.async_refresh(), "dess_monitor settings sweep"
+        )
+        entry.async_on_unload(entry.add_update_listener(_update_listener))
+    except Exception:
+        # HA only runs the unload callbacks, which release the session, when the setup
+        # failed with one of its ConfigEntry errors
+        session.detach()
+        raise
     return True
 
 
@@ -47,10 +100,23 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # needs to unload itself, and remove callbacks. See the classes for further
     # details
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        await entry.runtime_data.close()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the persisted token, data snapshot and resolution plans of a removed entry."""
+    await AuthManager(hass, entry, None).async_remove()
+    await CoordinatorSnapshot(hass, entry, None, None).async_remove()
+    await async_remove_resolution_plans(hass, entry.entry_id)
+
+
+async def _async_refresh_all(*coordinators):
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+
 async def _update_listener(hass: HomeAssistant, entry: ConfigEntry):
     # Reload the integration
     await hass.config_entries.async_reload(entry.entry_id)
@@ -4,7 +4,7 @@ import time
 import urllib
 from datetime import datetime
 
-import aiohttp
+from .client import DessClient
 
 DOMAIN_BASE_URL = "web.dessmonitor.com"
 
@@ -19,38 +19,45 @@ headers = {
 api_semaphore = asyncio.Semaphore(10)
 
 
-async def auth_user(username: str, password_hash: str):
-    async with aiohttp.ClientSession() as session:
-        # print('auth_user', username)
-        params = {
-            "action": "authSource",
-            "usr": username,
-            "source": "1",
-            "company-key": "bnrl_frRFjEz8Mkn",
-        }
-        qs = urllib.parse.urlencode(params, doseq=False, safe="@")
-        salt = int(time.time())
-        sign = hashlib.sha1(f"{salt}{password_hash}&{qs}".encode()).hexdigest()
-        payload = {
-            "sign": sign,
-            "salt": salt,
-            **params,
-        }
-        url = f"https://{DOMAIN_BASE_URL}/public/?{urllib.parse.urlencode(payload, doseq=False, safe='@')}"
-        response = await (await session.get(url, headers=headers)).json()
-        if response["err"] != 0:
-            print(
-                f"Error {response['err']} while authenticating user: {response['desc']}"
-            )
-            raise Exception(f"ErrorAuthFailed")
-        data = response["dat"]
-        return {
-            "token": data["token"],
-            "secret": data["secret"],
-            "expire": data["expire"],
-            "uid": data["uid"],
-            "usr": data["usr"],
-        }
+async def fetch_json(url: str, client: DessClient | None = None):
+    # Without a shared client (e.g. in the config flow) fall back to a one-shot session
+    if client is not None:
+        return await client.get_json(url, headers=headers)
+    async with DessClient() as transient_client:
+        return await transient_client.get_json(url, headers=headers)
+
+
+async def auth_user(username: str, password_hash: str, client: DessClient | None = None):
+    # print('auth_user', username)
+    params = {
+        "action": "authSource",
+        "usr": username,
+        "source": "1",
+        "company-key": "bnrl_frRFjEz8Mkn",
+    }
+    qs = urllib.parse.urlencode(params, doseq=False, safe="@")
+    salt = int(time.time())
+    sign = hashlib.sha1(f"{salt}{password_hash}&{qs}".encode()).hexdigest()
+    payload = {
+        "sign": sign,
+        "salt": salt,
+        **params,
+    }
+    url = f"https://{DOMAIN_BASE_URL}/public/?{urllib.parse.urlencode(payload, doseq=False, safe='@')}"
+    response = await fetch_json(url, client)
+    if response["err"] != 0:
+        print(
+            f"Error {response['err']} while authenticating user: {response['desc']}"
+        )
+        raise Exception(f"ErrorAuthFailed")
+    data = response["dat"]
+    return {
+        "token": data["token"],
+        "secret": data["secret"],
+        "expire": data["expire"],
+        "uid": data["uid"],
+        "usr": data["usr"],
+    }
 
 
 def generate_signature(salt, secret, token, params):
@@ -68,51 +75,50 @@ def generate_params_signature(token, secret, params):
     }
 
 
-async def create_auth_api_request(token, secret, params, raise_error=True):
-    async with aiohttp.ClientSession() as session:
-        async with api_semaphore:
-            payload = generate_params_signature(token, secret, params)
-            # print(payload)
-            params_path = urllib.parse.urlencode(payload, doseq=False, safe="@")
-            url = f"https://{DOMAIN_BASE_URL}/public/?{params_path}"
-            json = await (await session.get(url, headers=headers)).json()
-            if json["err"] == 0:
-                return json["dat"]
+async def create_auth_api_request(token, secret, params, raise_error=True, client: DessClient | None = None):
+    async with api_semaphore:
+        payload = generate_params_signature(token, secret, params)
+        # print(payload)
+        params_path = urllib.parse.urlencode(payload, doseq=False, safe="@")
+        url = f"https://{DOMAIN_BASE_URL}/public/?{params_path}"
+        json = await fetch_json(url, client)
+        if json["err"] == 0:
+            return json["dat"]
+        else:
+            if raise_error:
+                if json["err"] == 10:
+                    raise AuthInvalidateError
+                raise Exception(
+                    f"Error {json['err']} while creating auth api request: {json['desc']}"
+                )
             else:
-                if raise_error:
-                    if json["err"] == 10:
-                        raise AuthInvalidateError
-                    raise Exception(
-                        f"Error {json['err']} while creating auth api request: {json['desc']}"
-                    )
-                else:
-                    return json
+                return json
 
 
 class AuthInvalidateError(Exception):
     pass
 
 
-async def create_auth_api_remote_request(token, secret, params, raise_error=True):
-    async with aiohttp.ClientSession() as session:
-        async with api_semaphore:
-            payload = generate_params_signature(token, secret, params)
-            # print(payload)
-            params_path = urllib.parse.urlencode(payload, doseq=False, safe="@")
-            url = f"https://{DOMAIN_BASE_URL}/remote/?{params_path}"
-            json = await (await session.get(url, headers=headers)).json()
-            if json["err"] == 0:
-                return json["dat"]
+async def create_auth_api_remote_request(token, secret, params, raise_error=True,
+                                         client: DessClient | None = None):
+    async with api_semaphore:
+        payload = generate_params_signature(token, secret, params)
+        # print(payload)
+        params_path = urllib.parse.urlencode(payload, doseq=False, safe="@")
+        url = f"https://{DOMAIN_BASE_URL}/remote/?{params_path}"
+        json = await fetch_json(url, client)
+        if json["err"] == 0:
+            return json["dat"]
+        else:
+            if raise_error:
+                raise Exception(
+                    f"Error {json['err']} while creating auth api request: {json['desc']}"
+                )
             else:
-                if raise_error:
-                    raise Exception(
-                        f"Error {json['err']} while creating auth api request: {json['desc']}"
-                    )
-                else:
-                    return json
+                return json
 
 
-async def get_devices(token, secret, params=None):
+async def get_devices(token, secret, params=None, client: DessClient | None = None):
     if params is None:
         params = {}
     payload = {
@@ -124,7 +130,7 @@ async def get_devices(token, secret, params=None):
         # 'status': '0',
         **params,
     }
-    devices_response = await create_auth_api_request(token, secret, payload)
+    devices_response = await create_auth_api_request(token, secret, payload, client=client)
 
     return devices_response["device"]
 
@@ -138,44 +144,44 @@ def extract_device_identity(device):
     }
 
 
-async def get_device_energy_flow(token, secret, device_identity):
+async def get_device_energy_flow(token, secret, device_identity, client: DessClient | None = None):
     payload = {
         "action": "webQueryDeviceEnergyFlowEs",
         "i18n": "en_US",
         "source": "1",
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
-async def get_device_last_data(token, secret, device_identity):
+async def get_device_last_data(token, secret, device_identity, client: DessClient | None = None):
     payload = {
         "action": "querySPDeviceLastData",
         "i18n": "en_US",
         "source": "1",
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
-async def get_device_pars(token, secret, device_identity):
+async def get_device_pars(token, secret, device_identity, client: DessClient | None = None):
     payload = {
         "action": "queryDeviceParsEs",
         "i18n": "en_US",
         "source": "1",
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
 async def get_device_ctrl_value(
-    token: str, secret: str, device_identity, param_id: str
+    token: str, secret: str, device_identity, param_id: str, client: DessClient | None = None
 ):
     payload = {
         "action": "queryDeviceCtrlValue",
@@ -186,36 +192,37 @@ async def get_device_ctrl_value(
     }
     start = int(datetime.now().timestamp() * 1000)
     # print(payload)
-    response = await create_auth_api_request(token, secret, payload, False)
+    response = await create_auth_api_request(token, secret, payload, False, client=client)
     # print('get_device_ctrl_value time', int(datetime.now().timestamp() * 1000) - start)
     return response
 
 
-async def get_device_ctrl_fields(token: str, secret: str, device_identity):
+async def get_device_ctrl_fields(token: str, secret: str, device_identity, client: DessClient | None = None):
     payload = {
         "action": "queryDeviceCtrlField",
         "i18n": "en_US",
         "source": "1",
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
-async def get_device_fields(token: str, secret: str, device_identity):
+async def get_device_fields(token: str, secret: str, device_identity, client: DessClient | None = None):
     payload = {
         "action": "queryDeviceFields",
         "i18n": "en_US",
         "source": "1",
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
-async def get_device_historical_data(token: str, secret: str, device_identity):
+async def get_device_historical_data(token: str, secret: str, device_identity,
+                                     client: DessClient | None = None):
     payload = {
         "action": "queryDeviceDataOneDayPaging",
         "i18n": "en_US",
@@ -225,12 +232,12 @@ async def get_device_historical_data(token: str, secret: str, device_identity):
         "date": "2025-03-07",
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
-async def get_collectors(token, secret, params):
+async def get_collectors(token, secret, params, client: DessClient | None = None):
     payload = {
         "action": "webQueryCollectorsEs",
         "source": "1",
@@ -239,13 +246,13 @@ async def get_collectors(token, secret, params):
         "pagesize": "15",
         **params,
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
 async def set_ctrl_device_param(
-    token: str, secret: str, device_identity, param_id: str, value: str
+    token: str, secret: str, device_identity, param_id: str, value: str, client: DessClient | None = None
 ):
     payload = {
         "action": "ctrlDevice",
@@ -255,13 +262,13 @@ async def set_ctrl_device_param(
         "val": value,
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
 
 
 async def send_device_direct_command(
-    token: str, secret: str, device_identity, cmd: str
+    token: str, secret: str, device_identity, cmd: str, client: DessClient | None = None
 ):
     payload = {
         "action": "sendCmdToDevice",
@@ -269,6 +276,6 @@ async def send_device_direct_command(
         "cmd": cmd,
         **extract_device_identity(device_identity),
     }
-    response = await create_auth_api_request(token, secret, payload)
+    response = await create_auth_api_request(token, secret, payload, client=client)
 
     return response
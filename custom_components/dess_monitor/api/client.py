@@ -0,0 +1,72 @@
+import asyncio
+
+import aiohttp
+
+try:
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    # aiohttp can only decode br responses when a brotli module is installed
+    ACCEPT_ENCODING = "gzip, deflate"
+
+CONNECTION_LIMIT = 10
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+REQUEST_TIMEOUT = 30
+
+
+class DessClient:
+    """Long-lived HTTP client for the DESS cloud.
+
+    One instance is owned by the hub of a config entry, so every API call of
+    that entry reuses the same keep-alive connections instead of paying a new
+    TCP+TLS handshake per request. The entry hands in a session created by
+    Home Assistant, which releases it with the entry; without one (e.g. a one-off
+    call of the config flow) the client opens and closes its own.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession | None = None):
+        self._session = session
+        self._owns_session = session is None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if not self._owns_session:
+            return self._session
+        if self._session is not None and not self._session.closed:
+            return self._session
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=CONNECTION_LIMIT,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=DNS_CACHE_TTL,
+                    enable_cleanup_closed=True,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                )
+        return self._session
+
+    async def get_json(self, url: str, headers: dict | None = None):
+        session = await self._get_session()
+        # a Home Assistant session only keeps its own default headers, so they go on each request
+        headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+        async with session.get(url, headers=headers) as response:
+            return await response.json(content_type=None)
+
+    async def close(self):
+        """Close a session the client opened itself, a handed in one belongs to its creator."""
+        if not self._owns_session:
+            return
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,54 +1,43 @@
+import binascii
 from enum import Enum
+from functools import lru_cache
+
+
+# -----------------------------------------------------------------------------
+# CRC-XMODEM протокола PI30 (полином 0x1021, начальное значение 0),
+# binascii.crc_hqx считает именно его и написан на C
+# -----------------------------------------------------------------------------
+# байты CRC, совпадающие со служебными символами '(', CR и LF, увеличиваются на 1
+PI30_CRC_RESERVED_BYTES = (0x28, 0x0D, 0x0A)
+
+
+def crc_xmodem(data) -> int:
+    return binascii.crc_hqx(data, 0)
+
+
+def pi30_crc(data) -> bytes:
+    """Два байта CRC кадра PI30 (старший первым) с учётом служебных символов."""
+    crc = crc_xmodem(data)
+    return bytes(
+        byte + 1 if byte in PI30_CRC_RESERVED_BYTES else byte
+        for byte in (crc >> 8, crc & 0xFF)
+    )
 
 
 def decode_ascii_response(hex_string):
-    hex_values = hex_string.strip().split()
-    byte_values = bytes(int(b, 16) for b in hex_values)
-    ascii_str = byte_values.decode('ascii', errors='ignore').strip()
-    if ascii_str.startswith('('):
-        ascii_str = ascii_str[1:]
-    return ascii_str
-
-
-def decode_qpigs(ascii_str):
-    values = ascii_str.split()
-    fields = [
-        "grid_voltage",
-        "grid_frequency",
-        "ac_output_voltage",
-        "ac_output_frequency",
-        "output_apparent_power",
-        "output_active_power",
-        "load_percent",
-        "bus_voltage",
-        "battery_voltage",
-        "battery_charging_current",
-        "battery_capacity",
-        "inverter_heat_sink_temperature",
-        "pv_input_current",
-        "pv_input_voltage",
-        "scc_battery_voltage",
-        "battery_discharge_current",
-        "device_status_bits_b7_b0",
-        "battery_voltage_offset",
-        "eeprom_version",
-        "pv_charging_power",
-        "device_status_bits_b10_b8",
-        "reserved_a",
-        "reserved_bb",
-        "reserved_cccc"
-    ]
-    return dict(zip(fields, values))
-
-
-def decode_qpigs2(ascii_str):
-    values = ascii_str.split()
-    fields = [
-        "pv_current",
-        "pv_voltage",
-        "pv_daily_energy"
-    ]
-    return dict(zip(fields, values))
+    """Hex-строка ответа → полезная нагрузка без '(', CRC и CR.
+
+    Бросает ValueError, если строка не hex или CRC не совпадает.
+    """
+    frame = bytes.fromhex(hex_string)
+    if frame.endswith(b"\r"):
+        frame = frame[:-1]
+    if len(frame) < 3 or pi30_crc(frame[:-2]) != frame[-2:]:
+        raise ValueError("PI30 CRC mismatch")
+    payload = frame[:-2]
+    if payload.startswith(b"("):
+        payload = payload[1:]
+    return payload.decode('ascii', errors='ignore').strip()
 
 
 class BatteryType(Enum):
@@ -99,68 +88,173 @@ class OperatingMode(Enum):
     Fault = 'F'  # Fault — Error condition; inverter is in fault mode
 
 
-def transform_qpiri_value(index, value):
-    try:
-        match index:
-            case 12:
-                return BatteryType(value).name
-            case 15:
-                return ACInputVoltageRange(value).name
-            case 16:
-                return OutputSourcePriority(value).name
-            case 17:
-                return ChargerSourcePriority(value).name
-            case 21:
-                return ParallelMode(value).name
-            case _:
-                return value
-    except ValueError:
-        return value
-
-
-def decode_qpiri(ascii_str):
-    values = ascii_str.split()
-    fields = [
-        "rated_grid_voltage",
-        "rated_input_current",
-        "rated_ac_output_voltage",
-        "rated_output_frequency",
-        "rated_output_current",
-        "rated_output_apparent_power",
-        "rated_output_active_power",
-        "rated_battery_voltage",
-        "low_battery_to_ac_bypass_voltage",
-        "shut_down_battery_voltage",
-        "bulk_charging_voltage",
-        "float_charging_voltage",
-        "battery_type",
-        "max_utility_charging_current",
-        "max_charging_current",
-        "ac_input_voltage_range",
-        "output_source_priority",
-        "charger_source_priority",
-        "parallel_max_number",
-        "reserved_uu",
-        "reserved_v",
-        "parallel_mode",
-        "high_battery_voltage_to_battery_mode",
-        "solar_work_condition_in_parallel",
-        "solar_max_charging_power_auto_adjust",
-        "rated_battery_capacity",
-        "reserved_b",
-        "reserved_ccc"
-    ]
-
-    return {
-        field: transform_qpiri_value(i, value)
-        for i, (field, value) in enumerate(zip(fields, values))
-    }
+# -----------------------------------------------------------------------------
+# Типы полей: строка ответа → значение записи.
+# Если значение не разбирается, в записи остаётся исходная строка.
+# -----------------------------------------------------------------------------
+def _enum(enum_class: type[Enum]):
+    def convert(value):
+        return enum_class(value).name
+
+    return convert
+
+
+def _bits(*flags):
+    """Битовое поле, флаги перечислены от старшего бита; пустое имя — бит пропускается.
+
+    Исходная строка остаётся под именем поля, флаги добавляются в запись как bool.
+    """
+
+    def convert(value):
+        return {flag: bit == '1' for flag, bit in zip(flags, value) if flag}
+
+    return convert
+
+
+def compile_fields(fields):
+    """Таблица (имя, тип) → функция, строящая типизированную запись из строки ответа."""
+    names = tuple(name for name, _ in fields)
+    converters = tuple(converter for _, converter in fields)
+
+    def decode(ascii_str):
+        record = {}
+        for name, converter, value in zip(names, converters, ascii_str.split()):
+            try:
+                converted = converter(value)
+            except ValueError:
+                converted = value
+            if isinstance(converted, dict):
+                record[name] = value
+                record.update(converted)
+            else:
+                record[name] = converted
+        return record
+
+    return decode
+
+
+QPIGS_FIELDS = (
+    ("grid_voltage", float),
+    ("grid_frequency", float),
+    ("ac_output_voltage", float),
+    ("ac_output_frequency", float),
+    ("output_apparent_power", int),
+    ("output_active_power", int),
+    ("load_percent", int),
+    ("bus_voltage", int),
+    ("battery_voltage", float),
+    ("battery_charging_current", int),
+    ("battery_capacity", int),
+    ("inverter_heat_sink_temperature", int),
+    ("pv_input_current", float),
+    ("pv_input_voltage", float),
+    ("scc_battery_voltage", float),
+    ("battery_discharge_current", int),
+    ("device_status_bits_b7_b0", _bits(
+        "sbu_priority_version", "configuration_changed", "scc_firmware_updated", "load_on",
+        "battery_voltage_to_steady", "charging_on", "scc_charging_on", "ac_charging_on",
+    )),
+    ("battery_voltage_offset", int),
+    ("eeprom_version", str),
+    ("pv_charging_power", int),
+    ("device_status_bits_b10_b8", _bits("charging_to_floating", "switch_on", "dustproof_installed")),
+    ("reserved_a", str),
+    ("reserved_bb", str),
+    ("reserved_cccc", str),
+)
+
+QPIGS2_FIELDS = (
+    ("pv_current", float),
+    ("pv_voltage", float),
+    ("pv_daily_energy", float),
+)
+
+QPIRI_FIELDS = (
+    ("rated_grid_voltage", float),
+    ("rated_input_current", float),
+    ("rated_ac_output_voltage", float),
+    ("rated_output_frequency", float),
+    ("rated_output_current", float),
+    ("rated_output_apparent_power", int),
+    ("rated_output_active_power", int),
+    ("rated_battery_voltage", float),
+    ("low_battery_to_ac_bypass_voltage", float),
+    ("shut_down_battery_voltage", float),
+    ("bulk_charging_voltage", float),
+    ("float_charging_voltage", float),
+    ("battery_type", _enum(BatteryType)),
+    ("max_utility_charging_current", int),
+    ("max_charging_current", int),
+    ("ac_input_voltage_range", _enum(ACInputVoltageRange)),
+    ("output_source_priority", _enum(OutputSourcePriority)),
+    ("charger_source_priority", _enum(ChargerSourcePriority)),
+    ("parallel_max_number", int),
+    ("reserved_uu", str),
+    ("reserved_v", str),
+    ("parallel_mode", _enum(ParallelMode)),
+    ("high_battery_voltage_to_battery_mode", float),
+    ("solar_work_condition_in_parallel", int),
+    ("solar_max_charging_power_auto_adjust", int),
+    ("rated_battery_capacity", float),
+    ("reserved_b", str),
+    ("reserved_ccc", str),
+)
+
+QBEQI_FIELDS = (
+    ("equalization_function", int),
+    ("equalization_time", int),  # (min)
+    ("interval_days", int),
+    ("max_charging_current", int),
+    ("float_voltage", float),
+    ("reserved_1", str),
+    ("equalization_timeout", int),  # (min)
+    ("immediate_activation_flag", int),
+    ("elapsed_time", int),  # (min)
+)
+
+# QPGSn — состояние n-го инвертора параллельной системы
+QPGS_FIELDS = (
+    ("parallel_unit_exists", int),
+    ("serial_number", str),
+    ("work_mode", _enum(OperatingMode)),
+    ("fault_code", str),
+    ("grid_voltage", float),
+    ("grid_frequency", float),
+    ("ac_output_voltage", float),
+    ("ac_output_frequency", float),
+    ("output_apparent_power", int),
+    ("output_active_power", int),
+    ("load_percent", int),
+    ("battery_voltage", float),
+    ("battery_charging_current", int),
+    ("battery_capacity", int),
+    ("pv_input_voltage", float),
+    ("total_charging_current", int),
+    ("total_output_apparent_power", int),
+    ("total_output_active_power", int),
+    ("total_output_percent", int),
+    ("inverter_status_bits", _bits(
+        "scc_ok", "ac_charging_on", "scc_charging_on", "", "", "line_loss", "load_on", "configuration_changed",
+    )),
+    ("output_mode", int),
+    ("charger_source_priority", _enum(ChargerSourcePriority)),
+    ("max_charging_current", int),
+    ("max_charging_current_range", int),
+    ("max_utility_charging_current", int),
+    ("pv_input_current", float),
+    ("battery_discharge_current", int),
+)
+
+decode_qpigs = compile_fields(QPIGS_FIELDS)
+decode_qpigs2 = compile_fields(QPIGS2_FIELDS)
+decode_qpiri = compile_fields(QPIRI_FIELDS)
+decode_qbeqi = compile_fields(QBEQI_FIELDS)
+decode_qpgs = compile_fields(QPGS_FIELDS)
 
 
 def decode_qmod(ascii_str):
-    mode_code = ascii_str.strip()[0]
     try:
-        mode = OperatingMode(mode_code)
+        mode = OperatingMode(ascii_str.strip()[:1]).name
     except ValueError:
         mode = "Unknown"
     return {"operating_mode": mode}
@@ -182,86 +276,86 @@ def decode_qvfw(ascii_str):
     return {"Firmware Version": ascii_str.replace("VERFW:", "").strip()}
 
 
-def decode_qbeqi(ascii_str):
-    values = ascii_str.split()
-    fields = [
-        "equalization_function",
-        "equalization_time",  # (min)
-        "interval_days",
-        "max_charging_current",
-        "float_voltage",
-        "reserved_1",
-        "equalization_timeout",  # (min)
-        "immediate_activation_flag",
-        "elapsed_time"  # (min)
-    ]
-    return dict(zip(fields, values))
+RESPONSE_DECODERS = {
+    "QPIGS": decode_qpigs,
+    "QPIGS2": decode_qpigs2,
+    "QPIRI": decode_qpiri,
+    "QMOD": decode_qmod,
+    "QMN": decode_qmn,
+    "QID": decode_qid,
+    "QSID": decode_qid,
+    "QFLAG": decode_qflag,
+    "QVFW": decode_qvfw,
+    "QBEQI": decode_qbeqi,
+}
+# команды с числовым параметром: QPGS0, QPGS1, ...
+PARAMETERISED_RESPONSE_DECODERS = {
+    "QPGS": decode_qpgs,
+}
 
 
-# Тестовый универсальный декодер
+def get_response_decoder(command: str):
+    command = command.upper()
+    decoder = RESPONSE_DECODERS.get(command)
+    if decoder is None:
+        prefix = command.rstrip("0123456789")
+        if prefix != command:
+            decoder = PARAMETERISED_RESPONSE_DECODERS.get(prefix)
+    return decoder
+
+
+# Универсальный декодер: одна типизированная запись на ответ
 def decode_direct_response(command: str, hex_input: str) -> dict:
     if hex_input == 'null':
         return {"error": "null response received. Command not accepted."}
-    ascii_str = decode_ascii_response(hex_input)
+    try:
+        ascii_str = decode_ascii_response(hex_input)
+    except ValueError as e:
+        return {"error": f"Invalid response received: {e}."}
 
     if ascii_str.startswith("NAK") or "NAK" in ascii_str:
         return {"error": "NAK response received. Command not accepted."}
 
-    match command.upper():
-        case "QPIGS":
-            return decode_qpigs(ascii_str)
-        case "QPIGS2":
-            return decode_qpigs2(ascii_str)
-        case "QPIRI":
-            return decode_qpiri(ascii_str)
-        case "QMOD":
-            return decode_qmod(ascii_str)
-        case "QMN":
-            return decode_qmn(ascii_str)
-        case "QID" | "QSID":
-            return decode_qid(ascii_str)
-        case "QFLAG":
-            return decode_qflag(ascii_str)
-        case "QVFW":
-            return decode_qvfw(ascii_str)
-        case "QBEQI":
-            return decode_qbeqi(ascii_str)
-        case _:
-            return {"Raw": ascii_str}
-
-
-direct_commands = {
-    "QPIGS": "51 50 49 47 53 B7 A9 0D",
-    "QPIGS2": "51 50 49 47 53 32 2B 8A 0D",
-    "QPIRI": "51 50 49 52 49 F8 54 0D",
-    "QMOD": "51 4D 4F 44 49 C1 0D",
-    "QPIWS": "51 50 49 57 53 B4 DA 0D",
-    "QVFW": "51 56 46 57 62 99 0D",
-    "QMCHGCR": "51 4D 43 48 47 43 52 D8 55 0D",
-    "QMUCHGCR": "51 4D 55 43 48 47 43 52 26 34 0D",
-    "QFLAG": "51 46 4C 41 47 98 74 0D",
-    "QSID": "51 53 49 44 BB 05 0D",
-    "QID": "51 49 44 D6 EA 0D",
-    "QMN": "51 4D 4E BB 64 0D",
-    "QBEQI": "51 42 45 51 49 31 6B 0D",  # CRC может отличаться в зависимости от устройства
-}
+    decoder = get_response_decoder(command)
+    if decoder is None:
+        return {"Raw": ascii_str}
+    return decoder(ascii_str)
+
 
+# -----------------------------------------------------------------------------
+# Кадры запросов: команда + CRC + CR, строятся для любой команды (в т.ч. QPGSn)
+# и кэшируются
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=128)
+def build_command_frame(command_name: str) -> bytes:
+    command = command_name.strip().upper().encode("ascii")
+    if not command:
+        raise ValueError("Empty PI30 command")
+    return command + pi30_crc(command) + b"\r"
 
+
+@lru_cache(maxsize=128)
 def get_command_hex(command_name: str) -> str:
-    return direct_commands.get(command_name.upper(), "Unknown command")
+    return " ".join(f"{byte:02X}" for byte in build_command_frame(command_name))
+
+
+# часто используемые команды, кадры совпадают с get_command_hex
+KNOWN_COMMANDS = (
+    "QPIGS", "QPIGS2", "QPIRI", "QMOD", "QPIWS", "QVFW", "QMCHGCR", "QMUCHGCR", "QFLAG", "QSID", "QID", "QMN",
+    "QBEQI",
+)
+direct_commands = {name: get_command_hex(name) for name in KNOWN_COMMANDS}
 
 
-# Функция поиска команды по HEX
+# Функция поиска команды по HEX: команда — это кадр без CRC и CR, если CRC сходится
 def get_command_name_by_hex(hex_string: str) -> str:
-    normalized_input = hex_string.strip().upper().replace("  ", " ")
-    for name, hex_cmd in direct_commands.items():
-        if normalized_input == hex_cmd.upper():
-            return name
-    return "Unknown HEX command"
-
-# # Пример вызова:
-# hex_data = "28 32 33 31 2E 38 20 35 30 2E 30 20 32 33 31 2E 38 20 35 30 2E 30 20 30 31 31 35 20 30 30 31 36 20 30 30 32 20 34 30 38 20 32 37 2E 30 30 20 30 31 32 20 30 39 35 20 30 30 33 30 20 30 30 30 30 20 30 30 30 2E 30 20 30 30 2E 30 30 20 30 30 30 30 30 20 30 30 30 31 30 31 30 31 20 30 30 20 30 30 20 30 30 30 30 31 20 30 31 30 9E CA 0D"
-# decoded = decode_direct_response('QPIGS2', hex_data)
-#
-# for key, value in decoded.items():
-#     print(f"{key:35} : {value}")
+    try:
+        frame = bytes.fromhex(hex_string)
+    except ValueError:
+        return "Unknown HEX command"
+    if frame.endswith(b"\r"):
+        frame = frame[:-1]
+    command = frame[:-2]
+    if not command or pi30_crc(command) != frame[-2:] or not command.isascii():
+        return "Unknown HEX command"
+    return command.decode("ascii")
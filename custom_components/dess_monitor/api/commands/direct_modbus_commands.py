@@ -1,23 +1,39 @@
 import struct
 import json
+from functools import lru_cache
 
 # -----------------------------------------------------------------------------
 # CRC16 (Modbus RTU) calculation function
 # -----------------------------------------------------------------------------
-def calculate_crc16(data: bytes) -> int:
+def _build_crc16_table() -> tuple:
     """
-    Рассчитывает CRC16 для Modbus RTU (полином 0xA001).
-    Возвращает 16-битное значение CRC.
+    Таблица CRC16 на 256 значений: результат 8 сдвигов для каждого байта.
     """
-    crc = 0xFFFF
-    for byte in data:
-        crc ^= byte
+    table = []
+    for byte in range(256):
+        crc = byte
         for _ in range(8):
             if crc & 0x0001:
-                crc >>= 1
-                crc ^= 0xA001
+                crc = (crc >> 1) ^ 0xA001
             else:
                 crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = _build_crc16_table()
+
+
+def calculate_crc16(data) -> int:
+    """
+    Рассчитывает CRC16 для Modbus RTU (полином 0xA001) по таблице, один шаг на байт.
+    Принимает bytes, bytearray или memoryview (без копирования).
+    Возвращает 16-битное значение CRC.
+    """
+    crc = 0xFFFF
+    table = CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
     return crc
 
 # -----------------------------------------------------------------------------
@@ -133,7 +149,9 @@ human_readable_requests = [
 
 # -----------------------------------------------------------------------------
 # Функция строит Modbus RTU кадр для чтения "Read Holding Registers" (функция 0x03)
+# Кадры неизменяемы, поэтому каждый собирается один раз и берётся из кэша
 # -----------------------------------------------------------------------------
+@lru_cache(maxsize=1024)
 def build_modbus_request(slave_id: int, start_address: int, register_count: int) -> bytes:
     """
     Формирует PDU + CRC16-байты для Modbus RTU (функция 0x03 Read Holding Registers).
@@ -158,107 +176,294 @@ def build_combined_modbus_query(slave_id: int, requests: list) -> bytes:
       - slave_id : адрес устройства (один и тот же для всех запросов)
       - requests : список (start_address, register_count)
     Возвращает: единый bytes, содержащий все Modbus RTU-кадры подряд.
+    Результат кэшируется по (slave_id, план запросов).
+    """
+    return _build_combined_modbus_query(slave_id, tuple((start, count) for start, count in requests))
+
+
+@lru_cache(maxsize=64)
+def _build_combined_modbus_query(slave_id: int, requests: tuple) -> bytes:
+    return b"".join(build_modbus_request(slave_id, start_addr, count) for start_addr, count in requests)
+
+# -----------------------------------------------------------------------------
+# Компилированный декодер окна регистров
+# Для каждого запроса (start_address, register_count) карта регистров один раз
+# превращается в struct.Struct и векторы (имя, масштаб, ASCII), после чего
+# данные кадра разбираются одним unpack_from без копирования буфера.
+# -----------------------------------------------------------------------------
+# Функции ответа: чтение регистров и исключение (0x03 | 0x80)
+FUNC_READ_HOLDING = 0x03
+FUNC_READ_HOLDING_EXCEPTION = 0x83
+
+
+class RegisterWindow:
+    """
+    Скомпилированное окно регистров одного запроса.
+      - struct  : struct.Struct для всех данных кадра (big-endian)
+      - fields  : кортеж (имя, масштаб или None, ASCII-флаг), по одному на значение unpack
+    """
+    __slots__ = ("start_address", "register_count", "struct", "fields")
+
+    def __init__(self, start_address: int, register_count: int, struct_format: str, fields: tuple):
+        self.start_address = start_address
+        self.register_count = register_count
+        self.struct = struct.Struct(struct_format)
+        self.fields = fields
+
+    def decode_into(self, results: dict, buffer, offset: int):
+        for (name, scale, is_ascii), value in zip(self.fields, self.struct.unpack_from(buffer, offset)):
+            if is_ascii:
+                # 0x00 пропускаем, как и прежде
+                value = value.replace(b"\x00", b"").decode("latin-1")
+            elif scale is not None:
+                value = value / scale
+            results[name] = value
+
+
+@lru_cache(maxsize=256)
+def compile_register_window(start_address: int, register_count: int) -> RegisterWindow:
+    """
+    Строит формат struct и векторы полей для окна по REGISTER_DEFINITIONS.
+    Многорегистровые Int/UInt берут первое слово, остальные пропускаются (pad).
+    Регистры без описания попадают в результат как Raw_<адрес>.
+    """
+    codes = [">"]
+    fields = []
+    offset = 0
+    while offset < register_count:
+        reg_addr = start_address + offset
+        available = register_count - offset
+        definition = REGISTER_DEFINITIONS.get(reg_addr)
+        if definition is not None and not (definition[1] == "ULong" and available < 2):
+            name, dtype, scale, nregs = definition
+            nregs = min(nregs, available)
+            if dtype == "ULong":
+                codes.append("I")
+                fields.append((name, None, False))
+                nregs = 2
+            elif dtype == "ASCII":
+                codes.append(f"{2 * nregs}s")
+                fields.append((name, None, True))
+            elif dtype in ("Int", "UInt"):
+                codes.append("h" if dtype == "Int" else "H")
+                fields.append((name, scale, False))
+            else:
+                codes.append("H")
+                fields.append((name, None, False))
+            if dtype not in ("ULong", "ASCII") and nregs > 1:
+                codes.append(f"{2 * (nregs - 1)}x")
+            offset += nregs
+        else:
+            # Нет описания для этого адреса
+            codes.append("H")
+            fields.append((f"Raw_{reg_addr}", None, False))
+            offset += 1
+    return RegisterWindow(start_address, register_count, "".join(codes), tuple(fields))
+
+
+# -----------------------------------------------------------------------------
+# Поиск кадров ответа: [Slave ID][Func][...][CRC lo][CRC hi]
+# Кадр признаётся только при совпадении CRC, поэтому байты 0x01 0x03 внутри
+# данных не принимаются за заголовок.
+# -----------------------------------------------------------------------------
+def iter_modbus_frames(raw_bytes, slave_ids=None):
     """
-    combined = bytearray()
-    for start_addr, count in requests:
-        frame = build_modbus_request(slave_id, start_addr, count)
-        combined.extend(frame)
-    return bytes(combined)
+    Перебирает кадры ответа, возвращая (slave_id, function, data memoryview).
+    Для исключения (0x83) data содержит один байт кода исключения.
+      - slave_ids : допустимые адреса устройств, None — любой адрес 1..247
+    """
+    view = memoryview(raw_bytes).cast("B")
+    size = len(view)
+    idx = 0
+    while idx + 5 <= size:
+        slave_id = view[idx]
+        function = view[idx + 1]
+        if (slave_ids is None and 1 <= slave_id <= 247) or (slave_ids is not None and slave_id in slave_ids):
+            if function == FUNC_READ_HOLDING:
+                frame_len = 3 + view[idx + 2] + 2  # ID(1) + Func(1) + Count(1) + Data(N) + CRC(2)
+                data_start, data_end = idx + 3, idx + frame_len - 2
+            elif function == FUNC_READ_HOLDING_EXCEPTION:
+                frame_len = 5  # ID(1) + Func(1) + Exception(1) + CRC(2)
+                data_start, data_end = idx + 2, idx + 3
+            else:
+                frame_len = 0
+            if frame_len and idx + frame_len <= size:
+                crc_end = idx + frame_len - 2
+                # CRC в порядке LSb, MSb
+                received_crc = view[crc_end] | (view[crc_end + 1] << 8)
+                if received_crc == calculate_crc16(view[idx:crc_end]):
+                    yield slave_id, function, view[data_start:data_end]
+                    idx += frame_len
+                    continue
+        idx += 1
+
 
 # -----------------------------------------------------------------------------
 # Функция разбора «сырых» байтов ответа Modbus RTU (несколько кадров подряд)
-# Возвращает словарь: { 'Field Name': value, ... }
+# Возвращает словарь: { slave_id: { 'Field Name': value, ... } }
 # -----------------------------------------------------------------------------
-def parse_modbus_response(raw_bytes: bytes) -> dict:
+def parse_modbus_response_by_slave(raw_bytes, requests=None, slave_ids=None) -> dict:
+    """
+    Разбирает ответ на серию запросов от одного или нескольких устройств.
+    Кадры каждого slave_id сопоставляются с requests по порядку; кадр исключения
+    занимает место своего запроса. raw_bytes может быть bytes, bytearray или memoryview.
+    """
+    if requests is None:
+        requests = human_readable_requests
+    results = {}
+    positions = {}
+    for slave_id, function, data in iter_modbus_frames(raw_bytes, slave_ids):
+        slave_results = results.setdefault(slave_id, {})
+        req_idx = positions.get(slave_id, 0)
+        positions[slave_id] = req_idx + 1
+        if function != FUNC_READ_HOLDING or req_idx >= len(requests):
+            continue
+        window = compile_register_window(*requests[req_idx])
+        if len(data) != window.struct.size:
+            # длина данных не соответствует запросу, кадр пропускаем
+            continue
+        window.decode_into(slave_results, data, 0)
+    return results
+
+
+def parse_modbus_response(raw_bytes, slave_id: int = 0x01, requests=None) -> dict:
     """
     Разбирает байты, которые вернуло устройство Modbus RTU, отвечая на серию запросов.
     Возвращает Python-словарь, где ключи — понятные имена полей, а значения
     — уже приведённые к нужному типу (с масштабированием, ASCII-декодом и т.п.).
     """
-    def _unpack_ulong(vals):
-        # Объединяет два 16-битных слова в 32-бит беззнаковое
-        hi_word, lo_word = vals
-        return (hi_word << 16) | lo_word
-
-    def _unpack_ascii(vals):
-        # Каждое 16-бит слово → два байта → символы ASCII (0x00 пропускаем)
-        chars = []
-        for word in vals:
-            hi = (word >> 8) & 0xFF
-            lo = word & 0xFF
-            if hi != 0:
-                chars.append(chr(hi))
-            if lo != 0:
-                chars.append(chr(lo))
-        return "".join(chars)
+    return parse_modbus_response_by_slave(raw_bytes, requests, (slave_id,)).get(slave_id, {})
 
-    results = {}
-    idx = 0
-    req_idx = 0
-
-    while idx < len(raw_bytes) - 4:
-        # Ищём заголовок очередного кадра: [Slave ID=0x01][Func=0x03]
-        if raw_bytes[idx] == 0x01 and raw_bytes[idx + 1] == 0x03:
-            byte_count = raw_bytes[idx + 2]
-            frame_len = 3 + byte_count + 2  # ID(1) + Func(1) + Count(1) + Data(N) + CRC(2)
-            frame = raw_bytes[idx : idx + frame_len]
-
-            # Проверяем CRC
-            payload = frame[:-2]
-            received_crc = (frame[-2] << 8) | frame[-1]
-            calc_crc = calculate_crc16(payload)
-            crc_ok = (received_crc == calc_crc)
-            # Если хотите, можете логировать crc_ok == False
-
-            data = frame[3 : 3 + byte_count]
-
-            # Сопоставляем этот кадр с запросом из списка (по порядку)
-            if req_idx < len(human_readable_requests):
-                start_addr, reg_count = human_readable_requests[req_idx]
-            else:
-                start_addr, reg_count = (None, None)
-
-            # Каждый регистр = 2 байта → собираем список 16-бит значений
-            values = []
-            for r in range(reg_count):
-                hi = data[2*r]
-                lo = data[2*r + 1]
-                values.append((hi << 8) | lo)
-
-            # Обрабатываем в соответствии с REGISTER_DEFINITIONS
-            offset = 0
-            while offset < reg_count:
-                reg_addr = start_addr + offset
-                if reg_addr in REGISTER_DEFINITIONS:
-                    name, dtype, scale, nregs = REGISTER_DEFINITIONS[reg_addr]
-                    if dtype == "ULong":
-                        # Берём два регистра (nregs=2)
-                        raw_val = _unpack_ulong(values[offset : offset + nregs])
-                        results[name] = raw_val
-                    elif dtype == "Int":
-                        raw_val = values[offset]
-                        # Распознаём signed 16-bit
-                        if raw_val & 0x8000:
-                            raw_val = -((~raw_val & 0xFFFF) + 1)
-                        results[name] = raw_val / scale
-                    elif dtype == "UInt":
-                        results[name] = values[offset] / scale
-                    elif dtype == "ASCII":
-                        results[name] = _unpack_ascii(values[offset : offset + nregs])
-                    else:
-                        results[name] = values[offset]
-                    offset += nregs
-                else:
-                    # Нет описания для этого адреса
-                    results[f"Raw_{reg_addr}"] = values[offset]
-                    offset += 1
-
-            idx += frame_len
-            req_idx += 1
+# -----------------------------------------------------------------------------
+# Планировщик чтения: объединяет нужные регистры в минимум окон
+# Каждое окно стоит заголовка кадра, CRC и оборота устройства, поэтому соседние
+# блоки склеиваются, если разрыв между ними не больше max_gap регистров и окно
+# не превышает max_frame регистров (лимит Modbus — 125).
+# -----------------------------------------------------------------------------
+DEFAULT_MAX_FRAME_REGISTERS = 64
+DEFAULT_MAX_GAP_REGISTERS = 4
+MODBUS_MAX_READ_REGISTERS = 125
+
+
+def wanted_register_blocks(definitions: dict | None = None) -> tuple:
+    """
+    Блоки [start, end) из REGISTER_DEFINITIONS, перекрывающиеся блоки сливаются.
+    """
+    if definitions is None:
+        definitions = REGISTER_DEFINITIONS
+    blocks = []
+    for start, (_, _, _, nregs) in sorted(definitions.items()):
+        end = start + nregs
+        if blocks and start < blocks[-1][1]:
+            blocks[-1] = (blocks[-1][0], max(blocks[-1][1], end))
         else:
-            idx += 1
+            blocks.append((start, end))
+    return tuple(blocks)
 
-    return results
+
+@lru_cache(maxsize=64)
+def plan_register_reads(blocks: tuple, max_frame: int = DEFAULT_MAX_FRAME_REGISTERS,
+                        max_gap: int = DEFAULT_MAX_GAP_REGISTERS,
+                        unreadable: frozenset = frozenset(), isolated: frozenset = frozenset()) -> tuple:
+    """
+    Строит план чтения ((start_address, register_count), ...).
+      - blocks     : отсортированные блоки [start, end) нужных регистров
+      - unreadable : регистры, на которые устройство ответило исключением; блоки с ними
+                     не читаются, и через них не склеиваются окна
+      - isolated   : блоки, которые читаются только отдельным окном
+    """
+    max_frame = min(max_frame, MODBUS_MAX_READ_REGISTERS)
+    plan = []
+    window = None
+    window_isolated = False
+    for start, end in blocks:
+        if any(reg in unreadable for reg in range(start, end)):
+            continue
+        block_isolated = (start, end) in isolated
+        if (
+                window is not None
+                and not window_isolated
+                and not block_isolated
+                and start - window[1] <= max_gap
+                and end - window[0] <= max_frame
+                and not any(reg in unreadable for reg in range(window[1], start))
+        ):
+            window = (window[0], end)
+            continue
+        if window is not None:
+            plan.append(window)
+        window = (start, end)
+        window_isolated = block_isolated
+    if window is not None:
+        plan.append(window)
+    # блок длиннее кадра режется на части
+    return tuple(
+        (chunk, min(max_frame, end - chunk))
+        for start, end in plan
+        for chunk in range(start, end, max_frame)
+    )
+
+
+class ModbusReadPlanner:
+    """
+    Планы чтения по devcode с учётом регистров, которые устройство не отдаёт.
+
+    Окно, на которое пришло исключение (0x83), сначала разбивается на отдельные
+    блоки; если исключение приходит на отдельный блок, его регистры помечаются
+    нечитаемыми и больше не запрашиваются.
+    """
+
+    def __init__(self, definitions: dict | None = None, max_frame: int = DEFAULT_MAX_FRAME_REGISTERS,
+                 max_gap: int = DEFAULT_MAX_GAP_REGISTERS):
+        self.blocks = wanted_register_blocks(definitions)
+        self.max_frame = max_frame
+        self.max_gap = max_gap
+        self._unreadable: dict[str, set[int]] = {}
+        self._isolated: dict[str, set[tuple[int, int]]] = {}
+
+    def plan(self, devcode) -> tuple:
+        devcode = str(devcode)
+        return plan_register_reads(
+            self.blocks, self.max_frame, self.max_gap,
+            frozenset(self._unreadable.get(devcode, ())),
+            frozenset(self._isolated.get(devcode, ())),
+        )
+
+    def record_exception(self, devcode, start_address: int, register_count: int):
+        devcode = str(devcode)
+        end_address = start_address + register_count
+        blocks = [
+            (start, end) for start, end in self.blocks
+            if start < end_address and end > start_address
+        ]
+        if len(blocks) > 1:
+            self._isolated.setdefault(devcode, set()).update(blocks)
+        else:
+            self._unreadable.setdefault(devcode, set()).update(range(start_address, end_address))
+
+    def observe_response(self, devcode, plan: tuple, raw_bytes, slave_id: int = 0x01):
+        """
+        Сопоставляет кадры ответа с планом и запоминает окна с исключениями.
+        """
+        for req_idx, (_, function, _) in enumerate(iter_modbus_frames(raw_bytes, (slave_id,))):
+            if req_idx >= len(plan):
+                break
+            if function == FUNC_READ_HOLDING_EXCEPTION:
+                self.record_exception(devcode, *plan[req_idx])
+
+    def as_dict(self) -> dict:
+        return {
+            devcode: {
+                "unreadable": sorted(self._unreadable.get(devcode, ())),
+                "isolated": sorted(list(block) for block in self._isolated.get(devcode, ())),
+            }
+            for devcode in set(self._unreadable) | set(self._isolated)
+        }
+
+    def load(self, stored: dict | None):
+        for devcode, learned in (stored or {}).items():
+            self._unreadable.setdefault(devcode, set()).update(learned.get("unreadable", ()))
+            self._isolated.setdefault(devcode, set()).update(tuple(block) for block in learned.get("isolated", ()))
 
 # -----------------------------------------------------------------------------
 # Пример использования (генерация запроса + разбор ответа)
@@ -1,8 +1,12 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any, Dict, Optional
 
 from custom_components.dess_monitor.api import set_ctrl_device_param, get_device_ctrl_value, send_device_direct_command
+from custom_components.dess_monitor.api.client import DessClient
 from custom_components.dess_monitor.api.commands.direct_commands import decode_direct_response, get_command_hex
 from custom_components.dess_monitor.api.resolvers.data_keys_map import SENSOR_KEYS_MAP
+from custom_components.dess_monitor.api.resolvers.resolution_plan import ResolutionPlans, AliasKeys
 
 
 def resolve_param(data, where, case_insensitive=False, find_all=False, default=None, root_keys=None):
@@ -90,6 +94,147 @@ def resolve_param(data, where, case_insensitive=False, find_all=False, default=N
         return found[0] if found else default
 
 
+class ParamIndex:
+    """
+    Flattened case-insensitive lookup of every entry carrying an "id" or "par" field.
+
+    Built in a single pre-order walk, keeping the first entry per key, so a lookup
+    returns exactly what resolve_param(data, {"id"/"par": key}, case_insensitive=True)
+    would find, without walking the payload again. It is derived from the payload
+    and kept next to it (MainCoordinator.param_indexes), not inside it, so the
+    payload compares by its values only.
+
+    With `plans` the learned lookups of the device are tried first, see
+    _find_indexed_entry.
+    """
+
+    __slots__ = ("data", "plans", "ids", "pars", "sections", "resolved", "lookups", "tables", "_frames")
+
+    def __init__(self, data, plans: Optional[ResolutionPlans] = None):
+        self.data = data
+        self.plans = plans
+        self.ids: Dict[str, Dict[str, Any]] = {}
+        self.pars: Dict[str, Dict[str, Any]] = {}
+        # (field, key) -> top-level payload section the entry was found in
+        self.sections: Dict[tuple[str, str], Optional[str]] = {}
+        # resolver name -> value, filled by the memoized resolvers of data_resolvers
+        self.resolved: Dict[str, Any] = {}
+        # resolver name -> (did a sensor key lookup, found an entry), the capability probe
+        self.lookups: Dict[str, tuple[bool, bool]] = {}
+        self._frames: list[list[bool]] = []
+        # other lookup tables derived from the same payload, built on first use
+        self.tables: Dict[str, Any] = {}
+        if isinstance(data, dict):
+            self._add_entry(data, None)
+            for section, v in data.items():
+                if isinstance(v, (dict, list)):
+                    self._add(v, section)
+        else:
+            self._add(data, None)
+
+    def _add_entry(self, current, section):
+        item_id = current.get("id")
+        if isinstance(item_id, str) and item_id.lower() not in self.ids:
+            self.ids[item_id.lower()] = current
+            self.sections[("id", item_id.lower())] = section
+        item_par = current.get("par")
+        if isinstance(item_par, str) and item_par.lower() not in self.pars:
+            self.pars[item_par.lower()] = current
+            self.sections[("par", item_par.lower())] = section
+
+    def _add(self, current, section):
+        if isinstance(current, dict):
+            self._add_entry(current, section)
+            for v in current.values():
+                if isinstance(v, (dict, list)):
+                    self._add(v, section)
+        elif isinstance(current, list):
+            for item in current:
+                if isinstance(item, (dict, list)):
+                    self._add(item, section)
+
+    def begin_resolver(self):
+        self._frames.append([False, False])
+
+    def end_resolver(self, name):
+        looked_up, found = self._frames.pop()
+        self.lookups[name] = (looked_up, found)
+
+    def note_resolver(self, name):
+        """Account the lookups of a (possibly memoized) resolver to the resolver calling it."""
+        if self._frames and name in self.lookups:
+            looked_up, found = self.lookups[name]
+            frame = self._frames[-1]
+            frame[0] = frame[0] or looked_up
+            frame[1] = frame[1] or found
+
+    def note_lookup(self, found: bool):
+        if self._frames:
+            frame = self._frames[-1]
+            frame[0] = True
+            frame[1] = frame[1] or found
+
+    def alias_keys(self) -> AliasKeys:
+        """(field, key) of every SENSOR_KEYS_MAP alias present in the payload."""
+        keys = self.tables.get("alias_keys")
+        if keys is None:
+            keys = frozenset(
+                [("id", key) for key in self.ids.keys() & _ALL_SENSOR_KEYS]
+                + [("par", key) for key in self.pars.keys() & _ALL_SENSOR_KEYS]
+            )
+            self.tables["alias_keys"] = keys
+        return keys
+
+    def is_capable(self, name) -> bool:
+        """False when a resolver only did sensor key lookups and none of them found an entry."""
+        looked_up, found = self.lookups.get(name, (False, False))
+        return found or not looked_up
+
+
+def build_param_index(data, plans: Optional[ResolutionPlans] = None) -> ParamIndex:
+    return ParamIndex(data, plans)
+
+
+# index of the payload whose resolvers are being evaluated, see active_param_index
+_ACTIVE_INDEX: ContextVar[Optional[ParamIndex]] = ContextVar("dess_monitor_param_index", default=None)
+
+
+@contextmanager
+def active_param_index(index: ParamIndex):
+    """Serve `index` to every lookup on its payload made inside the block."""
+    token = _ACTIVE_INDEX.set(index)
+    try:
+        yield index
+    finally:
+        _ACTIVE_INDEX.reset(token)
+
+
+def current_param_index(data) -> Optional[ParamIndex]:
+    """The active index when it belongs to this payload, None otherwise."""
+    index = _ACTIVE_INDEX.get()
+    return index if index is not None and index.data is data else None
+
+
+def get_param_index(data) -> ParamIndex:
+    """Return the active index of the payload, or build a throwaway one."""
+    index = current_param_index(data)
+    if index is None:
+        index = ParamIndex(data)
+    return index
+
+
+_LOWER_KEYS_CACHE: Dict[str, tuple[str, ...]] = {}
+_ALL_SENSOR_KEYS = frozenset(key.lower() for keys in SENSOR_KEYS_MAP.values() for key in keys)
+
+
+def _sensor_keys(name: str) -> tuple[str, ...]:
+    keys = _LOWER_KEYS_CACHE.get(name)
+    if keys is None:
+        keys = tuple(key.lower() for key in SENSOR_KEYS_MAP.get(name, []))
+        _LOWER_KEYS_CACHE[name] = keys
+    return keys
+
+
 def safe_float(val: Optional[str], default: float = 0.0) -> float:
     try:
         return float(val) if val is not None else default
@@ -97,22 +242,76 @@ def safe_float(val: Optional[str], default: float = 0.0) -> float:
         return default
 
 
-def get_sensor_value_simple(
+def _find_sensor_entry(
         name: str,
         data: Dict[str, Any],
-        device_data: Dict[str, Any]
-) -> Optional[str]:
-    keys = SENSOR_KEYS_MAP.get(name, [])
+        device_data: Dict[str, Any],
+        stop_on_disabled: bool
+) -> tuple[str, Dict[str, Any]] | None:
+    """
+    Return ("id" | "par", entry) of the first alias of SENSOR_KEYS_MAP[name] in the payload.
+
+    A disabled par (status 0) is skipped, or ends the search with stop_on_disabled.
+    The learned plan of the device is tried first, a miss falls back to the full scan.
+    """
+    index = get_param_index(data)
+    found = _find_indexed_entry(index, name, device_data, stop_on_disabled)
+    index.note_lookup(found is not None)
+    return found
+
+
+def _plan_steps(index: ParamIndex, pn):
+    """Learned steps of the device valid for this payload, checked once per payload."""
+    steps = index.tables.get("plan_steps")
+    if steps is None:
+        steps = index.plans.steps_for(pn, index.alias_keys())
+        index.tables["plan_steps"] = steps
+    return steps
+
+
+def _find_indexed_entry(index: ParamIndex, name, device_data, stop_on_disabled):
+    pn = device_data.get("pn") if isinstance(device_data, dict) else None
+    steps = _plan_steps(index, pn) if index.plans is not None and pn is not None else None
 
-    for key in keys:
-        res = resolve_param(data, {"id": key}, case_insensitive=True)
+    step = steps.get(name) if steps is not None else None
+    if step is not None:
+        # same aliases present as when the step was learned, the scan would stop at it too
+        field, key, _ = step
+        res = (index.ids if field == "id" else index.pars).get(key)
+        if res and (field == "id" or res.get("status") != 0):
+            return field, res
+
+    skipped = False
+    for key in _sensor_keys(name):
+        res = index.ids.get(key)
         if res:
-            return res.get("val")
-        res = resolve_param(data, {"par": key}, case_insensitive=True)
+            found = "id", res
+            break
+        res = index.pars.get(key)
         if res:
             if res.get("status") != 0:
-                return res.get("val")
-    return None
+                found = "par", res
+                break
+            if stop_on_disabled:
+                return None
+            skipped = True
+    else:
+        return None
+    if steps is not None and not skipped:
+        # a plan step must give the same answer with and without stop_on_disabled
+        index.plans.learn(pn, name, (found[0], key, index.sections.get((found[0], key))))
+    return found
+
+
+def get_sensor_value_simple(
+        name: str,
+        data: Dict[str, Any],
+        device_data: Dict[str, Any]
+) -> Optional[str]:
+    found = _find_sensor_entry(name, data, device_data, stop_on_disabled=False)
+    if found is None:
+        return None
+    return found[1].get("val")
 
 
 def get_sensor_value_simple_entry(
@@ -124,20 +323,15 @@ def get_sensor_value_simple_entry(
     Ищет значение сенсора по ключам из SENSOR_KEYS_MAP[name].
     Возвращает кортеж (имя_поля, значение), где имя_поля — "id" или "par".
     """
-    keys = SENSOR_KEYS_MAP.get(name, [])
-    for key in keys:
-        res = resolve_param(data, {"id": key}, case_insensitive=True)
-        if res:
-            return res.get("id"), res.get("val"), res.get("unit", None)
-        res = resolve_param(data, {"par": key}, case_insensitive=True)
-        if res:
-            if res.get("status") == 0:
-                return None
-            return res.get("par"), res.get("val"), res.get("unit", None)
-    return None
+    found = _find_sensor_entry(name, data, device_data, stop_on_disabled=True)
+    if found is None:
+        return None
+    field, res = found
+    return res.get(field), res.get("val"), res.get("unit", None)
 
 
-async def set_inverter_output_priority(token: str, secret: str, device_data, value: str):
+async def set_inverter_output_priority(token: str, secret: str, device_data, value: str,
+                                       client: DessClient | None = None):
     match device_data['devcode']:
         case 2341:
             map_param_value = {
@@ -169,10 +363,11 @@ async def set_inverter_output_priority(token: str, secret: str, device_data, val
 
         case _:
             return
-    return await set_ctrl_device_param(token, secret, device_data, param_id, param_value)
+    return await set_ctrl_device_param(token, secret, device_data, param_id, param_value, client=client)
 
 
-async def get_inverter_output_priority(token: str, secret: str, ctrl_fields, device_data):
+async def get_inverter_output_priority(token: str, secret: str, ctrl_fields, device_data,
+                                       client: DessClient | None = None):
     map_param_value = {
         'UTILITY FIRST': 'Utility',
         'UTILITY': 'Utility',
@@ -191,12 +386,12 @@ async def get_inverter_output_priority(token: str, secret: str, ctrl_fields, dev
     if entry is None:
         return None
     param_id, _, _ = entry
-    result = await get_device_ctrl_value(token, secret, device_data, param_id)
+    result = await get_device_ctrl_value(token, secret, device_data, param_id, client=client)
     if result['val'].upper() not in map_param_value:
         return None
     return map_param_value[result['val'].upper()]
 
 
-async def get_direct_data(token: str, secret: str, device_data, cmd_name):
-    result = await send_device_direct_command(token, secret, device_data, get_command_hex(cmd_name))
+async def get_direct_data(token: str, secret: str, device_data, cmd_name, client: DessClient | None = None):
+    result = await send_device_direct_command(token, secret, device_data, get_command_hex(cmd_name), client=client)
     return decode_direct_response(cmd_name, result['dat'])
@@ -1,16 +1,69 @@
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+from types import MappingProxyType
+from typing import Any, Mapping
+
 from custom_components.dess_monitor.api.helpers import get_sensor_value_simple, safe_float, \
-    get_sensor_value_simple_entry
+    get_sensor_value_simple_entry, ParamIndex, active_param_index, current_param_index
+
+RESOLVED_KEY = "resolved"
+
+# name -> resolver, evaluated once per device update by resolve_all
+RESOLVERS = {}
+
+
+@dataclass(frozen=True)
+class ResolvedValues:
+    """Read-only record of the resolver values of one device payload, see resolve_all."""
+
+    values: Mapping[str, Any]
+
+    def get(self, name, default=None):
+        return self.values.get(name, default)
+
+    def as_dict(self) -> dict:
+        return dict(self.values)
+
 
+def memoized_resolver(fn):
+    """Register a resolver and memoize its result on the param index of the payload.
 
+    While resolve_all evaluates a fresh device payload, derived resolvers (e.g.
+    charging power from current and voltage) share one evaluation per update.
+    """
+    name = fn.__name__
+
+    @wraps(fn)
+    def wrapper(data, device_data):
+        index = current_param_index(data)
+        if index is None:
+            return fn(data, device_data)
+        if name not in index.resolved:
+            index.begin_resolver()
+            try:
+                index.resolved[name] = fn(data, device_data)
+            finally:
+                index.end_resolver(name)
+        index.note_resolver(name)
+        return index.resolved[name]
+
+    RESOLVERS[name] = wrapper
+    return wrapper
+
+
+@memoized_resolver
 def resolve_battery_charging_current(data, device_data):
     raw = get_sensor_value_simple("battery_charging_current", data, device_data)
     return max(safe_float(raw), 0.0)
 
 
+@memoized_resolver
 def resolve_battery_charging_voltage(data, device_data):
     return safe_float(get_sensor_value_simple("battery_charging_voltage", data, device_data))
 
 
+@memoized_resolver
 def resolve_battery_discharge_current(
         data,
         device_data,
@@ -37,10 +90,12 @@ def resolve_battery_discharge_current(
         return value
 
 
+@memoized_resolver
 def resolve_battery_voltage(data, device_data):
     return safe_float(get_sensor_value_simple("battery_voltage", data, device_data))
 
 
+@memoized_resolver
 def resolve_battery_charging_power(data, device_data):
     found = get_sensor_value_simple_entry("battery_active_power", data, device_data)
     if found:
@@ -57,6 +112,7 @@ def resolve_battery_charging_power(data, device_data):
     return current * voltage
 
 
+@memoized_resolver
 def resolve_battery_discharge_power(data, device_data):
     found = get_sensor_value_simple_entry("battery_active_power", data, device_data)
     if found:
@@ -71,18 +127,22 @@ def resolve_battery_discharge_power(data, device_data):
     return resolve_battery_discharge_current(data, device_data) * resolve_battery_voltage(data, device_data)
 
 
+@memoized_resolver
 def resolve_active_load_power(data, device_data):
     return safe_float(get_sensor_value_simple("active_load_power", data, device_data)) * 1000
 
 
+@memoized_resolver
 def resolve_active_load_percentage(data, device_data):
     return safe_float(get_sensor_value_simple("active_load_percentage", data, device_data))
 
 
+@memoized_resolver
 def resolve_output_priority(data, device_data):
     return data['device_extra']['output_priority']
 
 
+@memoized_resolver
 def resolve_charge_priority(data, device_data):
     mapper = {
         'solar priority': 'SOLAR_PRIORITY',
@@ -96,18 +156,22 @@ def resolve_charge_priority(data, device_data):
     return mapper.get(raw.lower(), None)
 
 
+@memoized_resolver
 def resolve_grid_in_power(data, device_data):
     return safe_float(get_sensor_value_simple("grid_in_power", data, device_data))
 
 
+@memoized_resolver
 def resolve_battery_capacity(data, device_data):
     return safe_float(get_sensor_value_simple("battery_capacity", data, device_data))
 
 
+@memoized_resolver
 def resolve_grid_frequency(data, device_data):
     return get_sensor_value_simple("grid_frequency", data, device_data)
 
 
+@memoized_resolver
 def resolve_pv_power(data, device_data):
     found = (get_sensor_value_simple_entry("pv_power", data, device_data))
 
@@ -122,6 +186,7 @@ def resolve_pv_power(data, device_data):
     return val
 
 
+@memoized_resolver
 def resolve_pv2_power(data, device_data):
     found = (get_sensor_value_simple_entry("pv2_power", data, device_data))
 
@@ -136,53 +201,111 @@ def resolve_pv2_power(data, device_data):
     return val
 
 
+@memoized_resolver
 def resolve_pv_voltage(data, device_data):
     return get_sensor_value_simple("pv_voltage", data, device_data)
 
 
+@memoized_resolver
 def resolve_pv2_voltage(data, device_data):
     return get_sensor_value_simple("pv2_voltage", data, device_data)
 
 
+@memoized_resolver
 def resolve_grid_input_voltage(data, device_data):
     return get_sensor_value_simple("grid_input_voltage", data, device_data)
 
 
+@memoized_resolver
 def resolve_grid_output_voltage(data, device_data):
     return get_sensor_value_simple("grid_output_voltage", data, device_data)
 
 
+@memoized_resolver
 def resolve_dc_module_temperature(data, device_data):
     return get_sensor_value_simple("dc_module_temperature", data, device_data)
 
 
+@memoized_resolver
 def resolve_inv_temperature(data, device_data):
     return get_sensor_value_simple("inv_temperature", data, device_data)
 
 
+@memoized_resolver
 def resolve_bt_utility_charge(data, device_data):
     return get_sensor_value_simple("bt_utility_charge", data, device_data)
 
 
+@memoized_resolver
 def resolve_bt_total_charge_current(data, device_data):
     return get_sensor_value_simple("bt_total_charge_current", data, device_data)
 
 
+@memoized_resolver
 def resolve_bt_cutoff_voltage(data, device_data):
     return get_sensor_value_simple("bt_cutoff_voltage", data, device_data)
 
 
+@memoized_resolver
 def resolve_sy_nominal_out_power(data, device_data):
     return get_sensor_value_simple("sy_nominal_out_power", data, device_data)
 
 
+@memoized_resolver
 def resolve_sy_rated_battery_voltage(data, device_data):
     return get_sensor_value_simple("sy_rated_battery_voltage", data, device_data)
 
 
+@memoized_resolver
 def resolve_bt_comeback_utility_voltage(data, device_data):
     return get_sensor_value_simple("bt_comeback_utility_voltage", data, device_data)
 
 
+@memoized_resolver
 def resolve_bt_comeback_battery_voltage(data, device_data):
     return get_sensor_value_simple("bt_comeback_battery_voltage", data, device_data)
+
+
+def resolve_sample_time(data) -> datetime | None:
+    """Collection time of the last_data sample (gts), None when it is missing or unparsable."""
+    gts = (data.get('last_data') or {}).get('gts')
+    if not gts:
+        return None
+    try:
+        return datetime.strptime(gts, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_all(data, device_data, index: ParamIndex | None = None) -> ResolvedValues:
+    """Evaluate every registered resolver of a device payload once.
+
+    Returns a read-only record of the resolved values, stored in the payload
+    under RESOLVED_KEY, so entities read their value instead of resolving it
+    again. It is a copy, the memo on the index can not be altered through it.
+    The lookups of every resolver are kept on `index` for resolver_capabilities.
+    """
+    if index is None:
+        index = ParamIndex(data)
+    with active_param_index(index):
+        for name, resolver in RESOLVERS.items():
+            try:
+                resolver(data, device_data)
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+                # leave it unresolved, the entity calling it reports the error as before
+                print(f"Error resolving {name}: {e}")
+    return ResolvedValues(MappingProxyType(dict(index.resolved)))
+
+
+def resolver_capabilities(index: ParamIndex) -> dict[str, bool]:
+    """Which registered resolvers could produce a value from the payload resolved with `index`."""
+    return {name: index.is_capable(name) for name in RESOLVERS}
+
+
+def resolved_value(resolver, data, device_data):
+    """Value of `resolver` from the record resolve_all stored in the payload, evaluated when missing."""
+    resolved = data.get(RESOLVED_KEY) if isinstance(data, dict) else None
+    name = getattr(resolver, "__name__", None)
+    if resolved is not None and name in RESOLVERS and name in resolved.values:
+        return resolved.values[name]
+    return resolver(data, device_data)
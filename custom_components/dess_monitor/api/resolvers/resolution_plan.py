@@ -0,0 +1,59 @@
+from typing import Dict, FrozenSet, Optional
+
+# (field, key, section): "id" or "par", the lower-cased alias that matched and
+# the top-level payload section (last_data, pars, energy_flow, ...) it was found in
+PlanStep = tuple[str, str, str]
+# (field, key) of every SENSOR_KEYS_MAP alias present in a payload
+AliasKeys = FrozenSet[tuple[str, str]]
+
+
+class ResolutionPlans:
+    """Learned SENSOR_KEYS_MAP lookups per device (pn) of one config entry.
+
+    Once a sensor name was resolved the winning alias is looked up directly.
+    The plan of a device is bound to the set of aliases its payload carried
+    when it was learned: with the same aliases present the full alias scan
+    stops at the same key, so the plan is checked once per payload (see
+    steps_for) instead of once per lookup, and restarts empty when the set
+    changes. Plans are per device: two devices of the same devcode may still
+    report different aliases (firmware, datalogger).
+    """
+
+    def __init__(self):
+        # pn -> (alias keys the steps were learned on, sensor name -> step)
+        self._plans: Dict[str, tuple[AliasKeys, Dict[str, PlanStep]]] = {}
+        self.dirty = False
+
+    def steps_for(self, pn, alias_keys: AliasKeys) -> Dict[str, PlanStep]:
+        """Steps of a device valid for a payload with `alias_keys`, learn() adds to them."""
+        plan = self._plans.get(str(pn))
+        if plan is None or plan[0] != alias_keys:
+            plan = (alias_keys, {})
+            self._plans[str(pn)] = plan
+            self.dirty = True
+        return plan[1]
+
+    def learn(self, pn, name, step: PlanStep):
+        plan = self._plans.get(str(pn))
+        if plan is not None and plan[1].get(name) != step:
+            plan[1][name] = step
+            self.dirty = True
+
+    def for_device(self, pn) -> Dict[str, PlanStep]:
+        plan = self._plans.get(str(pn))
+        return {} if plan is None else dict(plan[1])
+
+    def as_dict(self) -> dict:
+        return {
+            pn: {
+                "keys": sorted(list(key) for key in alias_keys),
+                "steps": {name: list(step) for name, step in steps.items()},
+            }
+            for pn, (alias_keys, steps) in self._plans.items()
+        }
+
+    def load(self, stored: dict | None):
+        for pn, plan in (stored or {}).items():
+            alias_keys = frozenset(tuple(key) for key in plan.get("keys", []))
+            steps = {name: tuple(step) for name, step in plan.get("steps", {}).items()}
+            self._plans.setdefault(pn, (alias_keys, steps))
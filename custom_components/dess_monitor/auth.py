@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from custom_components.dess_monitor.api import auth_user
+from custom_components.dess_monitor.api.client import DessClient
+from custom_components.dess_monitor.const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# log in again this long before the token expires
+REFRESH_MARGIN = 3600
+
+
+def auth_storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.auth"
+
+
+class AuthManager:
+    """Owns the DESS token of a config entry.
+
+    All coordinators of the entry share it. The token is refreshed shortly
+    before it expires, concurrent re-logins after an AuthInvalidateError are
+    coalesced into a single login, and the token is persisted so a restart
+    does not need a fresh login.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, client: DessClient):
+        self._config_entry = config_entry
+        self._client = client
+        self._store = Store(hass, STORAGE_VERSION, auth_storage_key(config_entry.entry_id))
+        self._lock = asyncio.Lock()
+        self.auth = None
+        self.issued_at = None
+
+    @property
+    def _username(self) -> str:
+        return self._config_entry.data["username"]
+
+    async def async_load(self):
+        stored = await self._store.async_load()
+        if not stored or stored.get("username") != self._username:
+            return
+        self.auth = stored["auth"]
+        self.issued_at = stored["issued_at"]
+        if self._needs_refresh():
+            self.auth = None
+            self.issued_at = None
+
+    def _needs_refresh(self) -> bool:
+        if self.auth is None or self.issued_at is None:
+            return True
+        expire = int(self.auth["expire"])
+        margin = min(REFRESH_MARGIN, expire // 2)
+        return time.time() >= self.issued_at + expire - margin
+
+    async def async_get_auth(self) -> dict:
+        """Return a valid token, logging in only when it is missing or about to expire."""
+        if self._needs_refresh():
+            async with self._lock:
+                # another caller may have logged in while we were waiting
+                if self._needs_refresh():
+                    await self._login()
+        return self.auth
+
+    async def async_invalidate(self, token: str | None) -> dict:
+        """Handle a rejected token (err 10).
+
+        Callers pass the token that was rejected; only the first of them logs in
+        again, the others get the token that login produced.
+        """
+        async with self._lock:
+            if self.auth is None or self.auth["token"] == token:
+                await self._login()
+        return self.auth
+
+    async def _login(self):
+        _LOGGER.debug("Logging in to the DESS cloud")
+        self.auth = await auth_user(
+            self._username,
+            self._config_entry.data["password_hash"],
+            client=self._client,
+        )
+        self.issued_at = int(time.time())
+        await self._store.async_save({
+            "username": self._username,
+            "auth": self.auth,
+            "issued_at": self.issued_at,
+        })
+
+    async def async_remove(self):
+        await self._store.async_remove()
@@ -10,7 +10,8 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.selector import selector
 
 from .api import auth_user, get_devices
-from .const import DOMAIN  # pylint:disable=unused-import
+from .const import DOMAIN, CONF_CONFIG_REFRESH_INTERVAL, DEFAULT_CONFIG_REFRESH_INTERVAL, CONF_DISCOVERY_INTERVAL, \
+    DEFAULT_DISCOVERY_INTERVAL  # pylint:disable=unused-import
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -223,6 +224,14 @@ class OptionsFlow(config_entries.OptionsFlow):
                              default=self._config_entry.options.get('raw_sensors', False)): bool,
                 vol.Optional("direct_request_protocol",
                              default=self._config_entry.options.get('direct_request_protocol', False)): bool,
+                vol.Optional(CONF_CONFIG_REFRESH_INTERVAL,
+                             default=self._config_entry.options.get(CONF_CONFIG_REFRESH_INTERVAL,
+                                                                    DEFAULT_CONFIG_REFRESH_INTERVAL)):
+                    vol.All(vol.Coerce(int), vol.Range(min=2, max=1440)),
+                vol.Optional(CONF_DISCOVERY_INTERVAL,
+                             default=self._config_entry.options.get(CONF_DISCOVERY_INTERVAL,
+                                                                    DEFAULT_DISCOVERY_INTERVAL)):
+                    vol.All(vol.Coerce(int), vol.Range(min=10, max=10080)),
             })
         )
 
@@ -1,3 +1,10 @@
 # This is the internal name of the integration, it should also match the directory
 # name for the integration.
 DOMAIN = "dess_monitor"
+
+# Options of the slow polling tiers, in minutes; the discovery tier only paces the
+# device list of the direct coordinator, the main one reads it whenever a device has an upload due
+CONF_CONFIG_REFRESH_INTERVAL = "config_refresh_interval"
+CONF_DISCOVERY_INTERVAL = "discovery_interval"
+DEFAULT_CONFIG_REFRESH_INTERVAL = 60
+DEFAULT_DISCOVERY_INTERVAL = 360
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import deque
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.dess_monitor.api import AuthInvalidateError
+from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators.command_queue import PRIORITY_BURST
+
+# limits of a burst requested by the start_burst service
+BURST_MIN_INTERVAL = 2
+BURST_MAX_INTERVAL = 30
+BURST_MAX_DURATION = 15 * 60
+BURST_MAX_COMMANDS = 300
+# samples kept per device, the last burst and the tail of the one before
+BURST_RING_SIZE = 300
+
+# dispatcher signals, formatted with the device pn
+SIGNAL_BURST_SAMPLE = f"{DOMAIN}_burst_sample_{{}}"
+SIGNAL_BURST_STATE = f"{DOMAIN}_burst_state_{{}}"
+
+
+class BurstSession:
+    """A running burst of one device: QPIGS every `interval` seconds within a command budget."""
+
+    def __init__(self, pn: str, interval: float, duration: float, max_commands: int):
+        self.pn = pn
+        self.interval = interval
+        self.ends_at = time.monotonic() + duration
+        self.max_commands = max_commands
+        self.sent = 0
+        self.failed = 0
+        self.task: asyncio.Task | None = None
+
+    @property
+    def commands_left(self) -> int:
+        return max(self.max_commands - self.sent, 0)
+
+    @property
+    def ends_in(self) -> float:
+        return max(self.ends_at - time.monotonic(), 0)
+
+    @property
+    def finished(self) -> bool:
+        return self.commands_left == 0 or self.ends_in == 0
+
+
+class BurstManager:
+    """Short high frequency QPIGS sampling on demand.
+
+    Burst commands go through the direct command queue between interactive
+    reads and the regular poll, which keeps running at its own rate. Samples
+    are not written to the coordinator data, they go to a per device ring
+    buffer and are announced with SIGNAL_BURST_SAMPLE, so the recorder only
+    sees what the burst sensor publishes.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, direct_coordinator):
+        self._hass = hass
+        self._config_entry = config_entry
+        self._direct_coordinator = direct_coordinator
+        self.samples: dict[str, deque] = {}
+        self._sessions: dict[str, BurstSession] = {}
+
+    def session(self, pn) -> BurstSession | None:
+        return self._sessions.get(str(pn))
+
+    def start(self, device, interval: float, duration: float, max_commands: int) -> BurstSession:
+        pn = str(device["pn"])
+        self.stop(pn)
+        session = BurstSession(
+            pn,
+            min(max(interval, BURST_MIN_INTERVAL), BURST_MAX_INTERVAL),
+            min(duration, BURST_MAX_DURATION),
+            min(max_commands, BURST_MAX_COMMANDS),
+        )
+        self._sessions[pn] = session
+        session.task = self._config_entry.async_create_background_task(
+            self._hass, self._run(session, device), f"dess_monitor burst {pn}"
+        )
+        async_dispatcher_send(self._hass, SIGNAL_BURST_STATE.format(pn))
+        return session
+
+    def stop(self, pn):
+        session = self._sessions.pop(str(pn), None)
+        if session is not None and session.task is not None:
+            session.task.cancel()
+            async_dispatcher_send(self._hass, SIGNAL_BURST_STATE.format(session.pn))
+
+    async def _run(self, session: BurstSession, device):
+        ring = self.samples.setdefault(session.pn, deque(maxlen=BURST_RING_SIZE))
+        try:
+            while not session.finished:
+                started = time.monotonic()
+                session.sent += 1
+                try:
+                    sample = await self._direct_coordinator.async_send_command(device, "QPIGS", PRIORITY_BURST)
+                except AuthInvalidateError:
+                    # the regular update renews the token
+                    sample = {"error": "token rejected"}
+                except Exception as e:
+                    sample = {"error": str(e) or type(e).__name__}
+                if "error" in sample:
+                    session.failed += 1
+                else:
+                    sample = {"time": time.time(), **sample}
+                    ring.append(sample)
+                    async_dispatcher_send(self._hass, SIGNAL_BURST_SAMPLE.format(session.pn), sample)
+                await asyncio.sleep(max(session.interval - (time.monotonic() - started), 0))
+        finally:
+            print(f"burst of {session.pn} done: {session.sent} commands, {session.failed} failed")
+            if self._sessions.get(session.pn) is session:
+                del self._sessions[session.pn]
+                async_dispatcher_send(self._hass, SIGNAL_BURST_STATE.format(session.pn))
@@ -0,0 +1,82 @@
+import math
+import statistics
+from collections import deque
+from datetime import datetime
+
+# poll this long after the expected upload so the cloud has stored the sample
+SCHEDULE_MARGIN = 10
+# retry delay while an expected upload is late
+OVERDUE_RETRY = 30
+# uploads closer than this are treated as jitter, not as a cadence
+MIN_PERIOD = 10
+HISTORY_SIZE = 16
+
+
+class UploadCadence:
+    """Learns the upload period and phase of one datalogger from its sample times.
+
+    The period is the median interval between distinct samples. The offset is
+    the smallest observed delay between the sample time (datalogger clock) and
+    the moment we fetched it (our clock), so it covers both the clock skew and
+    the minimal cloud latency.
+    """
+
+    def __init__(self):
+        self._intervals: deque[float] = deque(maxlen=HISTORY_SIZE)
+        self._delays: deque[float] = deque(maxlen=HISTORY_SIZE)
+        self._last_sample: float | None = None
+        self._last_attempt: float | None = None
+
+    def observe(self, sample_time: datetime | None, fetched_at: float) -> bool:
+        """Record a fetch and the sample it returned, return True when the sample is new."""
+        self._last_attempt = fetched_at
+        if sample_time is None:
+            return False
+        sample = sample_time.timestamp()
+        if self._last_sample is not None and sample <= self._last_sample:
+            return False
+        if self._last_sample is not None and sample - self._last_sample >= MIN_PERIOD:
+            self._intervals.append(sample - self._last_sample)
+        self._delays.append(fetched_at - sample)
+        self._last_sample = sample
+        return True
+
+    @property
+    def period(self) -> float | None:
+        if not self._intervals:
+            return None
+        return statistics.median(self._intervals)
+
+    @property
+    def offset(self) -> float | None:
+        if not self._delays:
+            return None
+        return min(self._delays)
+
+    def next_fetch_at(self) -> float | None:
+        """Time on our clock to fetch the next sample, None while the cadence is unknown."""
+        period = self.period
+        if period is None:
+            return None
+        expected = self._last_sample + period + self.offset + SCHEDULE_MARGIN
+        if self._last_attempt < expected:
+            return expected
+        if self._last_attempt - expected < period / 2:
+            # the upload is late, keep polling for it shortly
+            return self._last_attempt + OVERDUE_RETRY
+        # the datalogger skipped an upload, wait for the next slot
+        missed = math.floor((self._last_attempt - expected) / period) + 1
+        return expected + missed * period
+
+    def is_due(self, now: float) -> bool:
+        next_fetch = self.next_fetch_at()
+        return next_fetch is None or now >= next_fetch
+
+    def as_dict(self, now: float) -> dict:
+        next_fetch = self.next_fetch_at()
+        return {
+            'period_s': None if self.period is None else round(self.period, 1),
+            'offset_s': None if self.offset is None else round(self.offset, 1),
+            'next_fetch_in_s': None if next_fetch is None else round(next_fetch - now, 1),
+            'samples': len(self._delays),
+        }
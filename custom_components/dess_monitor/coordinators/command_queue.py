@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import async_timeout
+
+T = TypeVar("T")
+
+# lower runs first; interactive reads go ahead of bursts, bursts ahead of background polls
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BURST = 5
+PRIORITY_POLL = 10
+
+# time a direct update may spend on its poll commands, a margin below its 30 s interval
+SWEEP_BUDGET = 27
+# poll commands a collector runs one after another in a sweep (QPIGS, QPIGS2, QPIRI)
+SWEEP_COMMANDS = 3
+# bounds of the adaptive command timeout in seconds, the longest one still lets
+# every command of a sweep have its turn within the budget
+MAX_COMMAND_TIMEOUT = SWEEP_BUDGET / SWEEP_COMMANDS
+DEFAULT_COMMAND_TIMEOUT = MAX_COMMAND_TIMEOUT
+MIN_COMMAND_TIMEOUT = 4
+
+
+class CommandLatency:
+    """Smoothed round trip of a collector and the timeout derived from it.
+
+    Same estimator as the TCP retransmission timeout: the timeout is the
+    smoothed latency plus four times its mean deviation. A timed out command
+    doubles the timeout until the next answer.
+    """
+
+    def __init__(self):
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self.timeout: float = DEFAULT_COMMAND_TIMEOUT
+
+    def observe(self, latency: float):
+        if self.srtt is None:
+            self.srtt = latency
+            self.rttvar = latency / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - latency)
+            self.srtt = 0.875 * self.srtt + 0.125 * latency
+        self.timeout = min(max(self.srtt + 4 * self.rttvar, MIN_COMMAND_TIMEOUT), MAX_COMMAND_TIMEOUT)
+
+    def backoff(self):
+        self.timeout = min(self.timeout * 2, MAX_COMMAND_TIMEOUT)
+
+
+class CollectorQueue:
+    """Runs the direct commands of one collector one at a time, by priority then FIFO."""
+
+    def __init__(self):
+        self.latency = CommandLatency()
+        self._busy = False
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.sent = 0
+        self.timeouts = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def run(self, request: Callable[[], Awaitable[T]], priority: int, deadline: float | None = None) -> T:
+        """Run `request` when its turn comes.
+
+        `deadline` (event loop time) bounds the wait for the turn and the
+        command itself, a command cut short by it does not count as a slow
+        collector.
+        """
+        async with async_timeout.timeout_at(deadline):
+            await self._acquire(priority)
+        try:
+            start = time.monotonic()
+            timeout = self.latency.timeout
+            left = None if deadline is None else deadline - asyncio.get_running_loop().time()
+            cut_by_deadline = left is not None and left < timeout
+            if cut_by_deadline:
+                if left <= 0:
+                    raise TimeoutError
+                timeout = left
+            try:
+                async with async_timeout.timeout(timeout):
+                    result = await request()
+            except TimeoutError:
+                self.timeouts += 1
+                if not cut_by_deadline:
+                    self.latency.backoff()
+                raise
+            self.sent += 1
+            self.latency.observe(time.monotonic() - start)
+            return result
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int):
+        if not self._busy:
+            # waiters are only queued while busy, so none is skipped here
+            self._busy = True
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before the cancellation
+                self._release()
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # the slot passes to the waiter, the queue stays busy
+                waiter.set_result(None)
+                return
+        self._busy = False
+
+
+class DirectCommandQueue:
+    """Serializes direct commands per collector (device pn).
+
+    A datalogger handles one serial command at a time, overlapping commands
+    come back as NAK or null and waste a cloud round trip.
+    """
+
+    def __init__(self):
+        self._collectors: dict[str, CollectorQueue] = {}
+
+    def collector(self, pn) -> CollectorQueue:
+        return self._collectors.setdefault(str(pn), CollectorQueue())
+
+    async def run(self, pn, request: Callable[[], Awaitable[T]], priority: int = PRIORITY_POLL,
+                  deadline: float | None = None) -> T:
+        return await self.collector(pn).run(request, priority, deadline)
+
+    def as_dict(self, pn) -> dict:
+        collector = self._collectors.get(str(pn))
+        if collector is None:
+            return {}
+        latency = collector.latency
+        return {
+            'timeout_s': round(latency.timeout, 1),
+            'latency_s': None if latency.srtt is None else round(latency.srtt, 2),
+            'queued': collector.queued,
+            'sent': collector.sent,
+            'timeouts': collector.timeouts,
+        }
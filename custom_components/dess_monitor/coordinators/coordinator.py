@@ -1,32 +1,71 @@
 import logging
+import time
 from datetime import timedelta
+from functools import partial
 
 import async_timeout
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 
 from custom_components.dess_monitor.api import *
+from custom_components.dess_monitor.api.client import DessClient
 from custom_components.dess_monitor.api.helpers import *
+from custom_components.dess_monitor.api.resolvers.data_resolvers import resolve_sample_time, resolve_all, \
+    RESOLVED_KEY
+from custom_components.dess_monitor.api.resolvers.resolution_plan import ResolutionPlans
+from custom_components.dess_monitor.auth import AuthManager
+from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators.cadence import UploadCadence
+from custom_components.dess_monitor.coordinators.keyed_coordinator import DeviceKeyedCoordinator
+from custom_components.dess_monitor.coordinators.section_cache import SectionCache, build_section_schedule, \
+    SECTION_LIVE, SECTION_CONFIG
 
 _LOGGER = logging.getLogger(__name__)
 
+# last upload time of the datalogger as reported in the webQueryDeviceEs device list
+SAMPLE_MARKER_FIELD = "lts"
 
-async def safe_call(coro, default=None):
-    try:
-        return await coro
-    except Exception as e:
-        print(f"Error during {coro}: {e}")
-        return default
+DEFAULT_UPDATE_INTERVAL = 120
+# bounds of the update interval once the upload cadence of the devices is learned
+MIN_UPDATE_INTERVAL = 15
+MAX_UPDATE_INTERVAL = 600
 
+# how long an update waits for a device before serving its last good snapshot
+DEVICE_FETCH_TIMEOUT = 45
+# a device fetch still running after this long is abandoned
+DEVICE_TASK_MAX_AGE = 300
+# set on device data that is a last good snapshot served in place of a late fetch
+STALE_KEY = "stale"
 
-class MainCoordinator(DataUpdateCoordinator):
+RESOLUTION_PLANS_STORAGE_VERSION = 1
+RESOLUTION_PLANS_SAVE_DELAY = 60
+# former account wide plan files, replaced by one file per config entry
+LEGACY_RESOLUTION_PLANS_STORAGE_KEYS = (f"{DOMAIN}.resolution_plans", f"{DOMAIN}.device_resolution_plans")
+
+
+def resolution_plans_storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.resolution_plans.{entry_id}"
+
+
+async def async_remove_resolution_plans(hass: HomeAssistant, entry_id: str):
+    """Drop the learned plans of a removed entry."""
+    await Store(hass, RESOLUTION_PLANS_STORAGE_VERSION, resolution_plans_storage_key(entry_id)).async_remove()
+
+
+# Refresh tier of every section fetched by the coordinator
+MAIN_SECTION_TIERS = {
+    "last_data": SECTION_LIVE,
+    "energy_flow": SECTION_LIVE,
+    "pars": SECTION_CONFIG,
+    "ctrl_fields": SECTION_CONFIG,
+    "output_priority": SECTION_CONFIG,
+}
+
+
+class MainCoordinator(DeviceKeyedCoordinator):
     devices = []
-    auth = None
-    auth_issued_at = None
 
-    def __init__(self, hass: HomeAssistant, config_entry):
+    def __init__(self, hass: HomeAssistant, config_entry, client: DessClient, auth_manager: AuthManager):
         super().__init__(
             hass,
             _LOGGER,
@@ -34,12 +73,32 @@ class MainCoordinator(DataUpdateCoordinator):
             name="Main coordinator",
             config_entry=config_entry,
             # Polling interval. Will only be polled if there are subscribers.
-            update_interval=timedelta(seconds=120),
+            update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
             # Set always_update to `False` if the data returned from the
             # api can be compared via `__eq__` to avoid duplicate updates
             # being dispatched to listeners
             always_update=False,
         )
+        self.client = client
+        self.auth_manager = auth_manager
+        # per device duration of the last cloud calls in ms, reported in diagnostics
+        self.call_timings = {}
+        self.section_cache = SectionCache(build_section_schedule(MAIN_SECTION_TIERS, config_entry.options))
+        # pn -> (device list upload marker, last_data gts, marker follows the samples) of the last fetched sample
+        self._last_samples = {}
+        # pn -> learned upload period and phase of the datalogger
+        self.cadences: dict[str, UploadCadence] = {}
+        # per device fetch tasks, a slow device keeps running across updates
+        self._device_tasks: dict[str, asyncio.Task] = {}
+        self._last_good: dict[str, dict] = {}
+        self.device_updated_at: dict[str, float] = {}
+        # pn -> param index of the last good payload, kept out of the payload so it compares by value
+        self.param_indexes: dict[str, ParamIndex] = {}
+        # learned sensor key lookups of the devices of this entry
+        self.resolution_plans = ResolutionPlans()
+        self._plans_store = Store(
+            hass, RESOLUTION_PLANS_STORAGE_VERSION, resolution_plans_storage_key(config_entry.entry_id)
+        )
         # self.my_api = my_api
         # self._device: MyDevice | None = None
 
@@ -52,14 +111,15 @@ class MainCoordinator(DataUpdateCoordinator):
         This method will be called automatically during
         coordinator.async_config_entry_first_refresh.
         """
-        await self.create_auth()
+        await self.auth_manager.async_get_auth()
+        await self._async_load_resolution_plans()
 
-        self.devices = await self.get_active_devices()
+        await self.refresh_devices()
         print("coordinator setup devices count: ", len(self.devices))
 
         # token = self.auth['token']
         # secret = self.auth['secret']
-        # query_device_ctrl_fields = [get_device_ctrl_fields(token, secret, device) for device in self.devices]
+        # query_device_ctrl_fields = [get_device_ctrl_fields(token, secret, device, client=self.client) for device in self.devices]
         # query_device_ctrl_fields_results = await asyncio.gather(*query_device_ctrl_fields)
         # for i, device_field_data in enumerate(query_device_ctrl_fields_results):
         #     for k, field_data in device_field_data['field']:
@@ -67,25 +127,42 @@ class MainCoordinator(DataUpdateCoordinator):
         # await self.async_refresh()
         # await self._async_update_data()
 
-    async def create_auth(self):
-        username = self.config_entry.data["username"]
-        password_hash = self.config_entry.data["password_hash"]
-        auth = await auth_user(username, password_hash)
-        auth_issued_at = int(datetime.now().timestamp())
+    async def _async_load_resolution_plans(self):
+        self.resolution_plans.load(await self._plans_store.async_load())
+        for key in LEGACY_RESOLUTION_PLANS_STORAGE_KEYS:
+            await Store(self.hass, RESOLUTION_PLANS_STORAGE_VERSION, key).async_remove()
+
+    async def async_restore(self, snapshot: dict):
+        """Serve a persisted snapshot until the first refresh completes, replaces _async_setup."""
+        await self._async_load_resolution_plans()
+        self.devices = snapshot["devices"]
+        data_map = {}
+        for pn, payload in snapshot["main"].items():
+            device_payload = {**payload, STALE_KEY: True}
+            index = build_param_index(device_payload, self.resolution_plans)
+            device_payload[RESOLVED_KEY] = resolve_all(device_payload, device_payload["device"], index)
+            self.param_indexes[pn] = index
+            # the ctrl field schema rarely changes, refetch it on the config schedule only
+            self.section_cache.store(pn, "ctrl_fields", {"field": device_payload.get("ctrl_fields") or []})
+            # a device that is late on the first refresh keeps serving the snapshot
+            self._last_good[pn] = device_payload
+            data_map[pn] = device_payload
+        self.data = data_map
+        print("coordinator restored devices count: ", len(self.devices))
 
-        self.auth = auth
-        self.auth_issued_at = auth_issued_at
+    @property
+    def auth(self):
+        return self.auth_manager.auth
 
-    async def check_auth(self):
-        now = int(datetime.now().timestamp())
-        # print(self.auth)
-        if self.auth_issued_at is None or (
-            now - (self.auth_issued_at + (self.auth["expire"])) <= 3600
-        ):
-            await self.create_auth()
+    async def refresh_devices(self):
+        self.devices = await self.get_active_devices()
+
+    def invalidate_section(self, pn, section):
+        """Refetch a cached section of a device on the next update, e.g. after a write."""
+        self.section_cache.invalidate(pn, section)
 
     async def get_active_devices(self):
-        devices = await get_devices(self.auth["token"], self.auth["secret"])
+        devices = await get_devices(self.auth["token"], self.auth["secret"], client=self.client)
         active_devices = [device for device in devices if device["status"] != 1]
         selected_devices = (
             [
@@ -112,58 +189,235 @@ class MainCoordinator(DataUpdateCoordinator):
             async with async_timeout.timeout(120):
                 print("coordinator update data devices")
 
-                await self.check_auth()
-                self.devices = await self.get_active_devices()
-
-                token = self.auth["token"]
-                secret = self.auth["secret"]
-
-                async def build_device_data(device):
-                    pn = device["pn"]
-                    last_data = await safe_call(
-                        get_device_last_data(token, secret, device), default={}
-                    )
-                    energy_flow = await safe_call(
-                        get_device_energy_flow(token, secret, device), default={}
-                    )
-                    pars = await safe_call(
-                        get_device_pars(token, secret, device), default={}
-                    )
-                    ctrl_fields = await safe_call(
-                        get_device_ctrl_fields(token, secret, device),
-                        default={"field": []},
-                    )
-                    output_priority = await safe_call(
-                        get_inverter_output_priority(
-                            token, secret, ctrl_fields, device
-                        ),
-                        default={},
-                    )
-
-                    return pn, {
-                        "last_data": last_data,
-                        "energy_flow": energy_flow,
-                        "pars": pars,
-                        "device": device,
-                        "ctrl_fields": ctrl_fields.get("field", []),
-                        "device_extra": {
-                            "output_priority": output_priority,
-                        },
-                    }
-
-                tasks = [build_device_data(device) for device in self.devices]
-
-                device_data = await asyncio.gather(*tasks)
-
-                data_map = {pn: data for pn, data in device_data}
-
-                return data_map
-                # return
+                auth = await self.auth_manager.async_get_auth()
+                try:
+                    return await self._fetch_data(auth)
+                except AuthInvalidateError:
+                    auth = await self.auth_manager.async_invalidate(auth["token"])
+                    return await self._fetch_data(auth)
         except TimeoutError as err:
             # Raising ConfigEntryAuthFailed will cancel future updates
             # and start a config flow with SOURCE_REAUTH (async_step_reauth)
             raise err
-        except AuthInvalidateError:
-            await self.create_auth()
-            # raise ConfigEntryAuthFailed from err
-        # except ApiError as err:
+
+    def _live_due(self, pn, now) -> bool:
+        """True when a device may have uploaded a new sample since its live sections were fetched."""
+        cadence = self.cadences.get(pn)
+        return (
+            cadence is None
+            or cadence.is_due(now)
+            or not self.section_cache.get(pn, "last_data")
+            or not self.section_cache.get(pn, "energy_flow")
+        )
+
+    async def _fetch_data(self, auth):
+        # the device list is read on every update that fetches a live sample: the status and
+        # energyTotal sensors come from it, and its upload marker can spare the live calls
+        now = time.time()
+        if not self.devices or any(self._live_due(device["pn"], now) for device in self.devices):
+            await self.refresh_devices()
+
+        token = auth["token"]
+        secret = auth["secret"]
+
+        async def build_device_data(device):
+            pn = device["pn"]
+            timings = {}
+
+            async def section_call(name, request, default):
+                # slow sections are served from cache until their schedule is due
+                if not self.section_cache.is_due(pn, name):
+                    return self.section_cache.get(pn, name, default)
+                start = time.monotonic()
+                try:
+                    value = await request()
+                except AuthInvalidateError:
+                    raise
+                except Exception as e:
+                    print(f"Error during {name} of {pn}: {e}")
+                    if self.section_cache.schedule.get(name) is None:
+                        return default
+                    return self.section_cache.get(pn, name, default)
+                finally:
+                    timings[name] = round((time.monotonic() - start) * 1000)
+                self.section_cache.store(pn, name, value)
+                return value
+
+            async def fetch_ctrl_data():
+                # output priority is resolved from ctrl_fields, the only dependent call
+                fields = await section_call(
+                    "ctrl_fields",
+                    lambda: get_device_ctrl_fields(token, secret, device, client=self.client),
+                    {"field": []},
+                )
+                priority = await section_call(
+                    "output_priority",
+                    lambda: get_inverter_output_priority(
+                        token, secret, fields, device, client=self.client
+                    ),
+                    {},
+                )
+                return fields, priority
+
+            def fetch_last_data():
+                return section_call(
+                    "last_data",
+                    lambda: get_device_last_data(token, secret, device, client=self.client),
+                    {},
+                )
+
+            def fetch_energy_flow():
+                return section_call(
+                    "energy_flow",
+                    lambda: get_device_energy_flow(token, secret, device, client=self.client),
+                    {},
+                )
+
+            async def fetch_live_data():
+                # the datalogger uploads every few minutes, skip the heavy calls until it has
+                cadence = self.cadences.setdefault(pn, UploadCadence())
+                cached_last_data = self.section_cache.get(pn, "last_data")
+                cached_energy_flow = self.section_cache.get(pn, "energy_flow")
+                if not self._live_due(pn, time.time()):
+                    # the update was woken by another device, this one has no upload due yet
+                    return cached_last_data, cached_energy_flow
+                marker = device.get(SAMPLE_MARKER_FIELD)
+                prev_marker, prev_gts, marker_tracks = self._last_samples.get(pn, (None, None, False))
+                if marker_tracks and marker == prev_marker and cached_last_data and cached_energy_flow:
+                    # the upload is late, count the attempt so the cadence retries it shortly
+                    cadence.observe(resolve_sample_time({"last_data": cached_last_data}), time.time())
+                    return cached_last_data, cached_energy_flow
+                if marker_tracks and marker != prev_marker:
+                    last, energy = await asyncio.gather(fetch_last_data(), fetch_energy_flow())
+                else:
+                    # no usable marker in the device list, probe the sample time of last_data
+                    last = await fetch_last_data()
+                    if last.get("gts") is not None and last.get("gts") == prev_gts and cached_energy_flow:
+                        energy = cached_energy_flow
+                    else:
+                        energy = await fetch_energy_flow()
+                if last:
+                    gts = last.get("gts")
+                    if prev_gts is not None and gts is not None:
+                        # the marker is only trusted while it moves exactly when the sample does,
+                        # a device list without it (or with an unrelated one) keeps probing
+                        marker_tracks = marker is not None and (marker != prev_marker) == (gts != prev_gts)
+                    self._last_samples[pn] = (marker, gts, marker_tracks)
+                    cadence.observe(resolve_sample_time({"last_data": last}), time.time())
+                return last, energy
+
+            (last_data, energy_flow), pars, (ctrl_fields, output_priority) = await asyncio.gather(
+                fetch_live_data(),
+                section_call(
+                    "pars",
+                    lambda: get_device_pars(token, secret, device, client=self.client),
+                    {},
+                ),
+                fetch_ctrl_data(),
+            )
+            self.call_timings[pn] = timings
+
+            device_payload = {
+                "last_data": last_data,
+                "energy_flow": energy_flow,
+                "pars": pars,
+                "device": device,
+                "ctrl_fields": ctrl_fields.get("field", []),
+                "device_extra": {
+                    "output_priority": output_priority,
+                },
+            }
+            # one walk per update instead of one per sensor key lookup
+            index = build_param_index(device_payload, self.resolution_plans)
+            # every resolver once per update, entities read the resulting record
+            device_payload[RESOLVED_KEY] = resolve_all(device_payload, device, index)
+            return pn, device_payload, index
+
+        async def fetch_device(device):
+            async with async_timeout.timeout(DEVICE_TASK_MAX_AGE):
+                return await build_device_data(device)
+
+        tasks = {}
+        for device in self.devices:
+            pn = device["pn"]
+            task = self._device_tasks.get(pn)
+            if task is None or task.done():
+                task = self.config_entry.async_create_background_task(
+                    self.hass, fetch_device(device), f"dess_monitor fetch {pn}"
+                )
+                self._device_tasks[pn] = task
+            tasks[pn] = task
+
+        if tasks:
+            # the first refresh waits for every device, the entities are created from its data
+            await asyncio.wait(tasks.values(), timeout=DEVICE_FETCH_TIMEOUT if self.data is not None else None)
+
+        data_map = {}
+        auth_error = None
+        for pn, task in tasks.items():
+            if not task.done():
+                print(f"Device {pn} is late, serving its last good data")
+                task.add_done_callback(partial(self._publish_late_device, pn))
+                device_payload = self._stale_snapshot(pn)
+            elif task.cancelled() or task.exception() is not None:
+                self._device_tasks.pop(pn, None)
+                if task.cancelled():
+                    print(f"Update of {pn} was cancelled")
+                elif isinstance(task.exception(), AuthInvalidateError):
+                    auth_error = task.exception()
+                else:
+                    print(f"Error during update of {pn}: {task.exception()}")
+                device_payload = self._stale_snapshot(pn)
+            else:
+                self._device_tasks.pop(pn, None)
+                device_payload = self._store_last_good(*task.result())
+            if device_payload is not None:
+                data_map[pn] = device_payload
+        if auth_error is not None:
+            raise auth_error
+
+        self._schedule_next_update(data_map)
+        self._save_resolution_plans()
+
+        return data_map
+
+    def _save_resolution_plans(self):
+        if self.resolution_plans.dirty:
+            self.resolution_plans.dirty = False
+            self._plans_store.async_delay_save(self.resolution_plans.as_dict, RESOLUTION_PLANS_SAVE_DELAY)
+    def _store_last_good(self, pn, device_payload, index):
+        device_payload[STALE_KEY] = False
+        self._last_good[pn] = device_payload
+        self.param_indexes[pn] = index
+        self.device_updated_at[pn] = time.time()
+        return device_payload
+
+    def _stale_snapshot(self, pn):
+        last_good = self._last_good.get(pn)
+        if last_good is None:
+            return None
+        return {**last_good, STALE_KEY: True}
+
+    @callback
+    def _publish_late_device(self, pn, task):
+        """Publish a device whose fetch finished after the update that started it."""
+        if self._device_tasks.get(pn) is not task:
+            return
+        self._device_tasks.pop(pn)
+        if task.cancelled() or task.exception() is not None or self.data is None:
+            return
+        device_payload = self._store_last_good(*task.result())
+        self.async_set_updated_data({**self.data, pn: device_payload})
+
+    def _schedule_next_update(self, data_map):
+        """Wake up shortly after the next expected datalogger upload instead of a fixed interval."""
+        next_fetches = [
+            self.cadences[pn].next_fetch_at() if pn in self.cadences else None
+            for pn in data_map
+        ]
+        if not next_fetches or None in next_fetches:
+            interval = DEFAULT_UPDATE_INTERVAL
+        else:
+            interval = min(next_fetches) - time.time()
+            interval = min(max(interval, MIN_UPDATE_INTERVAL), MAX_UPDATE_INTERVAL)
+        self.update_interval = timedelta(seconds=interval)
@@ -1,26 +1,39 @@
 import logging
 from datetime import timedelta
 
-import async_timeout
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-)
 
 from custom_components.dess_monitor.api import *
+from custom_components.dess_monitor.api.client import DessClient
 from custom_components.dess_monitor.api.helpers import *
+from custom_components.dess_monitor.auth import AuthManager
+from custom_components.dess_monitor.coordinators.command_queue import DirectCommandQueue, PRIORITY_INTERACTIVE, \
+    PRIORITY_POLL, SWEEP_BUDGET
+from custom_components.dess_monitor.coordinators.keyed_coordinator import DeviceKeyedCoordinator
+from custom_components.dess_monitor.coordinators.section_cache import SectionCache, build_section_schedule, \
+    SECTION_LIVE, SECTION_CONFIG, SECTION_DISCOVERY, ACCOUNT_KEY, SectionBackoff
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class DirectCoordinator(DataUpdateCoordinator):
+# Refresh tier of every section fetched by the coordinator
+DIRECT_SECTION_TIERS = {
+    "devices": SECTION_DISCOVERY,
+    "qpigs": SECTION_LIVE,
+    "qpigs2": SECTION_LIVE,
+    "qpiri": SECTION_CONFIG,
+}
+DIRECT_POLL_SECTIONS = ("qpigs", "qpigs2", "qpiri")
+# a live section older than this is dropped instead of served as the last good value
+LAST_GOOD_MAX_AGE = 10 * 60
+
+
+class DirectCoordinator(DeviceKeyedCoordinator):
     """My custom coordinator."""
 
     devices = []
-    auth = None
-    auth_issued_at = None
 
-    def __init__(self, hass: HomeAssistant, config_entry):
+    def __init__(self, hass: HomeAssistant, config_entry, client: DessClient, auth_manager: AuthManager):
         """Initialize my coordinator."""
         super().__init__(
             hass,
@@ -35,6 +48,12 @@ class DirectCoordinator(DataUpdateCoordinator):
             # being dispatched to listeners
             always_update=False,
         )
+        self.client = client
+        self.auth_manager = auth_manager
+        self.section_cache = SectionCache(build_section_schedule(DIRECT_SECTION_TIERS, config_entry.options))
+        # every direct command of the entry goes through it, one at a time per collector
+        self.command_queue = DirectCommandQueue()
+        self.section_backoff = SectionBackoff()
         # self.my_api = my_api
         # self._device: MyDevice | None = None
 
@@ -47,9 +66,9 @@ class DirectCoordinator(DataUpdateCoordinator):
         This method will be called automatically during
         coordinator.async_config_entry_first_refresh.
         """
-        await self.create_auth()
+        await self.auth_manager.async_get_auth()
 
-        self.devices = await self.get_active_devices()
+        await self.refresh_devices()
         print("direct coordinator setup devices count: ", len(self.devices))
 
         # token = self.auth['token']
@@ -62,25 +81,55 @@ class DirectCoordinator(DataUpdateCoordinator):
         # await self.async_refresh()
         # await self._async_update_data()
 
-    async def create_auth(self):
-        username = self.config_entry.data["username"]
-        password_hash = self.config_entry.data["password_hash"]
-        auth = await auth_user(username, password_hash)
-        auth_issued_at = int(datetime.now().timestamp())
+    def restore(self, snapshot: dict):
+        """Serve a persisted snapshot until the first refresh completes, replaces _async_setup."""
+        self.devices = snapshot["devices"]
+        self.data = snapshot.get("direct")
 
-        self.auth = auth
-        self.auth_issued_at = auth_issued_at
+    @property
+    def auth(self):
+        return self.auth_manager.auth
 
-    async def check_auth(self):
-        now = int(datetime.now().timestamp())
-        # print(self.auth)
-        if self.auth_issued_at is None or (
-            now - (self.auth_issued_at + (self.auth["expire"])) <= 3600
-        ):
-            await self.create_auth()
+    async def refresh_devices(self):
+        self.devices = await self.get_active_devices()
+        self.section_cache.store(ACCOUNT_KEY, "devices", self.devices)
+
+    def last_good_section(self, pn, section) -> dict:
+        age = self.section_cache.age(pn, section)
+        if age is None:
+            return {}
+        if self.section_cache.schedule.get(section) is None and age > LAST_GOOD_MAX_AGE:
+            return {}
+        return self.section_cache.get(pn, section)
+
+    def section_status(self, pn) -> dict:
+        """Age of the last good value and backoff of every direct section of a device."""
+        status = {}
+        for section in DIRECT_POLL_SECTIONS:
+            age = self.section_cache.age(pn, section)
+            retry_in = self.section_backoff.retry_in(pn, section)
+            status[section] = {
+                'age_s': None if age is None else round(age),
+                'failures': self.section_backoff.failures(pn, section),
+                'retry_in_s': None if retry_in is None else round(retry_in),
+            }
+        return status
+
+    async def async_send_command(self, device, command: str, priority: int = PRIORITY_INTERACTIVE):
+        """Send a direct command outside of the poll, ahead of the queued poll commands."""
+        auth = await self.auth_manager.async_get_auth()
+        return await self.command_queue.run(
+            device["pn"],
+            lambda: get_direct_data(auth["token"], auth["secret"], device, command, client=self.client),
+            priority,
+        )
+
+    def invalidate_section(self, pn, section):
+        """Refetch a cached section of a device on the next update, e.g. after a write."""
+        self.section_cache.invalidate(pn, section)
 
     async def get_active_devices(self):
-        devices = await get_devices(self.auth["token"], self.auth["secret"])
+        devices = await get_devices(self.auth["token"], self.auth["secret"], client=self.client)
         active_devices = [device for device in devices if device["status"] != 1]
         devices_filter = self.config_entry.options.get("devices", [])
 
@@ -95,43 +144,72 @@ class DirectCoordinator(DataUpdateCoordinator):
         return selected_devices
 
     async def _async_update_data(self):
+        # Note: asyncio.TimeoutError and aiohttp.ClientError are already
+        # handled by the data update coordinator.
+        if (
+            self.config_entry.options.get("direct_request_protocol", False)
+            is not True
+        ):
+            return None
+        print("direct coordinator update data devices")
+
+        # no deadline over the whole update: login and the device list are bounded
+        # by the client timeout, the poll commands by the sweep deadline, so one
+        # slow collector falls back to its last good sections instead of failing
+        # the update of every device
+        deadline = self.hass.loop.time() + SWEEP_BUDGET
+        auth = await self.auth_manager.async_get_auth()
         try:
-            # Note: asyncio.TimeoutError and aiohttp.ClientError are already
-            # handled by the data update coordinator.
-            async with async_timeout.timeout(30):
-                if (
-                    self.config_entry.options.get("direct_request_protocol", False)
-                    is not True
-                ):
-                    return None
-                print("direct coordinator update data devices")
-
-                await self.check_auth()
-                self.devices = await self.get_active_devices()
-
-                token = self.auth["token"]
-                secret = self.auth["secret"]
-
-                async def fetch_device_data(device):
-                    qpigs = await get_direct_data(token, secret, device, "QPIGS")
-                    qpigs2 = await get_direct_data(token, secret, device, "QPIGS2")
-                    qpiri = await get_direct_data(token, secret, device, "QPIRI")
-                    return device["pn"], {
-                        "qpigs": qpigs,
-                        "qpigs2": qpigs2,
-                        "qpiri": qpiri,
-                    }
-
-                data_map = dict(
-                    await asyncio.gather(*map(fetch_device_data, self.devices))
-                )
-                return data_map
-                # return
-        except TimeoutError as err:
-            # Raising ConfigEntryAuthFailed will cancel future updates
-            # and start a config flow with SOURCE_REAUTH (async_step_reauth)
-            raise err
+            return await self._fetch_data(auth, deadline)
         except AuthInvalidateError:
-            await self.create_auth()
-            # raise ConfigEntryAuthFailed from err
-        # except ApiError as err:
+            auth = await self.auth_manager.async_invalidate(auth["token"])
+            return await self._fetch_data(auth, deadline)
+
+    async def _fetch_data(self, auth, deadline: float | None = None):
+        if self.section_cache.is_due(ACCOUNT_KEY, "devices"):
+            await self.refresh_devices()
+
+        token = auth["token"]
+        secret = auth["secret"]
+
+        async def fetch_section(device, section):
+            pn = device["pn"]
+            # slow sections are served from cache until their schedule is due,
+            # a failing one until its backoff expired
+            if not self.section_cache.is_due(pn, section) or self.section_backoff.is_blocked(pn, section):
+                return self.last_good_section(pn, section)
+            try:
+                value = await self.command_queue.run(
+                    pn,
+                    lambda: get_direct_data(token, secret, device, section.upper(), client=self.client),
+                    PRIORITY_POLL,
+                    deadline,
+                )
+            except AuthInvalidateError:
+                raise
+            except TimeoutError as e:
+                if deadline is not None and self.hass.loop.time() >= deadline:
+                    # the sweep ran out of time before this command, the collector is not at fault
+                    print(f"Direct {section} of {pn} skipped, the update ran out of time")
+                    return self.last_good_section(pn, section)
+                value = {"error": str(e) or type(e).__name__}
+            except Exception as e:
+                value = {"error": str(e) or type(e).__name__}
+            if "error" in value:
+                print(f"Direct {section} of {pn} failed: {value['error']}")
+                self.section_backoff.failed(pn, section)
+                return self.last_good_section(pn, section)
+            self.section_backoff.succeeded(pn, section)
+            self.section_cache.store(pn, section, value)
+            return value
+
+        async def fetch_device_data(device):
+            # the command queue runs them one after another, in this order;
+            # every section has its own slot, a failing one keeps its last good value
+            sections = await asyncio.gather(*(fetch_section(device, section) for section in DIRECT_POLL_SECTIONS))
+            return device["pn"], dict(zip(DIRECT_POLL_SECTIONS, sections))
+
+        data_map = dict(
+            await asyncio.gather(*map(fetch_device_data, self.devices))
+        )
+        return data_map
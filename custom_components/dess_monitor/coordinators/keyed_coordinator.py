@@ -0,0 +1,56 @@
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+
+class DeviceKeyedCoordinator(DataUpdateCoordinator):
+    """Coordinator whose data maps a device pn to that device's data.
+
+    Entities subscribe with a context of either `pn` or `(pn, section, ...)`.
+    An update only calls the listeners whose slice of data changed since the
+    listeners were last called. Listeners without a context, and every
+    listener after a change of `last_update_success`, are always called.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._published_data = None
+        self._published_success = None
+
+    @callback
+    def async_update_listeners(self) -> None:
+        previous = self._published_data
+        current = self.data
+        wake_all = (
+                previous is None
+                or current is None
+                or self.last_update_success != self._published_success
+        )
+        self._published_data = current
+        self._published_success = self.last_update_success
+
+        changed = {}
+        for update_callback, context in list(self._listeners.values()):
+            if wake_all or context is None or self._context_changed(context, previous, current, changed):
+                update_callback()
+
+    @callback
+    def async_publish_current(self) -> None:
+        """Call every listener with the current data, e.g. entities added after the last update."""
+        self._published_data = None
+        self.async_update_listeners()
+
+    @staticmethod
+    def _context_changed(context, previous, current, changed) -> bool:
+        if context not in changed:
+            if isinstance(context, tuple):
+                pn, sections = context[0], context[1:]
+                old = previous.get(pn) or {}
+                new = current.get(pn) or {}
+                changed[context] = old is not new and any(
+                    old.get(section) != new.get(section) for section in sections
+                )
+            else:
+                old = previous.get(context)
+                new = current.get(context)
+                changed[context] = old is not new and old != new
+        return changed[context]
@@ -0,0 +1,96 @@
+import time
+from typing import Any
+
+from custom_components.dess_monitor.const import CONF_CONFIG_REFRESH_INTERVAL, DEFAULT_CONFIG_REFRESH_INTERVAL, \
+    CONF_DISCOVERY_INTERVAL, DEFAULT_DISCOVERY_INTERVAL
+
+# Refresh tiers a data section can belong to
+SECTION_LIVE = "live"  # every coordinator update
+SECTION_CONFIG = "config"  # rated/configuration values, slow or after a write
+SECTION_DISCOVERY = "discovery"  # device list
+
+# key used for account wide sections such as the device list
+ACCOUNT_KEY = "*"
+
+
+def build_section_schedule(tiers: dict[str, str], options) -> dict[str, float | None]:
+    """Turn a {section: tier} table into {section: refresh interval in seconds}."""
+    intervals = {
+        SECTION_LIVE: None,
+        SECTION_CONFIG: options.get(CONF_CONFIG_REFRESH_INTERVAL, DEFAULT_CONFIG_REFRESH_INTERVAL) * 60,
+        SECTION_DISCOVERY: options.get(CONF_DISCOVERY_INTERVAL, DEFAULT_DISCOVERY_INTERVAL) * 60,
+    }
+    return {section: intervals[tier] for section, tier in tiers.items()}
+
+
+class SectionCache:
+    """Keeps slow data sections between their scheduled refreshes.
+
+    `schedule` maps a section name to its refresh interval in seconds. Sections
+    with no interval are due on every update.
+    """
+
+    def __init__(self, schedule: dict[str, float | None]):
+        self.schedule = schedule
+        self._entries: dict[tuple[Any, str], tuple[float, Any]] = {}
+
+    def is_due(self, key, section) -> bool:
+        interval = self.schedule.get(section)
+        entry = self._entries.get((key, section))
+        return interval is None or entry is None or time.monotonic() - entry[0] >= interval
+
+    def get(self, key, section, default=None):
+        entry = self._entries.get((key, section))
+        return default if entry is None else entry[1]
+
+    def store(self, key, section, value):
+        self._entries[(key, section)] = (time.monotonic(), value)
+
+    def age(self, key, section) -> float | None:
+        entry = self._entries.get((key, section))
+        return None if entry is None else time.monotonic() - entry[0]
+
+    def invalidate(self, key=None, section=None):
+        """Force a refresh of matching sections on the next update."""
+        for entry_key in list(self._entries):
+            if (key is None or entry_key[0] == key) and (section is None or entry_key[1] == section):
+                del self._entries[entry_key]
+
+
+# retry delay of a failing section, doubled for every consecutive failure
+BACKOFF_BASE = 15
+BACKOFF_MAX = 15 * 60
+
+
+class SectionBackoff:
+    """Per section retry delays after failed fetches.
+
+    A section that fails is not fetched again until its delay expired, so one
+    flaky query neither erases nor re-triggers the other sections of an update.
+    """
+
+    def __init__(self, base: float = BACKOFF_BASE, maximum: float = BACKOFF_MAX):
+        self.base = base
+        self.maximum = maximum
+        # (key, section) -> (consecutive failures, monotonic time of the next attempt)
+        self._failures: dict[tuple[Any, str], tuple[int, float]] = {}
+
+    def is_blocked(self, key, section) -> bool:
+        entry = self._failures.get((key, section))
+        return entry is not None and time.monotonic() < entry[1]
+
+    def failed(self, key, section):
+        count = self.failures(key, section) + 1
+        delay = min(self.base * 2 ** (count - 1), self.maximum)
+        self._failures[(key, section)] = (count, time.monotonic() + delay)
+
+    def succeeded(self, key, section):
+        self._failures.pop((key, section), None)
+
+    def failures(self, key, section) -> int:
+        entry = self._failures.get((key, section))
+        return 0 if entry is None else entry[0]
+
+    def retry_in(self, key, section) -> float | None:
+        entry = self._failures.get((key, section))
+        return None if entry is None else max(entry[1] - time.monotonic(), 0)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.dess_monitor.api import get_device_ctrl_value, AuthInvalidateError
+from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator
+from custom_components.dess_monitor.coordinators.keyed_coordinator import DeviceKeyedCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# ctrl values are read one device setting per cloud call, so keep the sweep gentle
+SWEEP_CONCURRENCY = 2
+SWEEP_REQUEST_DELAY = 0.2
+# give the datalogger time to apply a written setting before reading it back
+WRITE_SETTLE_DELAY = 5
+
+
+class SettingsCoordinator(DeviceKeyedCoordinator):
+    """Reads the ctrl values of all devices in one rate-limited sweep.
+
+    Data is a map of device pn to {param_id: queryDeviceCtrlValue response}.
+    Number and select setting entities read from it instead of polling
+    get_device_ctrl_value on their own.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry, main_coordinator: MainCoordinator):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Settings coordinator",
+            config_entry=config_entry,
+            update_interval=timedelta(minutes=10),
+            always_update=False,
+        )
+        self.main_coordinator = main_coordinator
+        self._sweep_semaphore = asyncio.Semaphore(SWEEP_CONCURRENCY)
+
+    @property
+    def auth(self):
+        return self.main_coordinator.auth
+
+    @property
+    def client(self):
+        return self.main_coordinator.client
+
+    def tracked_fields(self, pn) -> list:
+        """Ctrl fields that have a setting entity: numbers always, selects with dynamic_settings."""
+        device_data = (self.main_coordinator.data or {}).get(pn)
+        if device_data is None:
+            return []
+        with_selects = self.config_entry.options.get('dynamic_settings', False) is True
+        return [
+            field
+            for field in device_data.get('ctrl_fields') or []
+            if 'item' not in field or with_selects
+        ]
+
+    async def _request_value(self, auth, device, param_id):
+        response = await get_device_ctrl_value(
+            auth['token'],
+            auth['secret'],
+            device,
+            param_id,
+            client=self.client,
+        )
+        if response.get('err') == 10:
+            raise AuthInvalidateError
+        return response
+
+    async def _read_value(self, device, param_id):
+        """Ctrl value response of a setting, None when it could not be read."""
+        auth_manager = self.main_coordinator.auth_manager
+        async with self._sweep_semaphore:
+            try:
+                auth = await auth_manager.async_get_auth()
+                try:
+                    response = await self._request_value(auth, device, param_id)
+                except AuthInvalidateError:
+                    # the login is shared with the other coordinators, only the first caller logs in again
+                    auth = await auth_manager.async_invalidate(auth['token'])
+                    response = await self._request_value(auth, device, param_id)
+            except Exception as e:
+                print(f"Error reading ctrl value {param_id} of {device['pn']}: {e}")
+                return None
+            finally:
+                await asyncio.sleep(SWEEP_REQUEST_DELAY)
+        if 'err' in response:
+            # an error answer says nothing about the setting, it must not replace a good value
+            print(f"Error reading ctrl value {param_id} of {device['pn']}: {response.get('desc', response['err'])}")
+            return None
+        return response
+
+    async def _read_device(self, device):
+        pn = device['pn']
+        previous = (self.data or {}).get(pn, {})
+        param_ids = [field['id'] for field in self.tracked_fields(pn)]
+        responses = await asyncio.gather(*[self._read_value(device, param_id) for param_id in param_ids])
+        values = {}
+        for param_id, response in zip(param_ids, responses):
+            if response is None:
+                # failed or error answer, keep serving the last known value
+                if param_id in previous:
+                    values[param_id] = previous[param_id]
+                continue
+            values[param_id] = response
+        return pn, values
+
+    async def _async_update_data(self):
+        await self.main_coordinator.auth_manager.async_get_auth()
+        print("settings coordinator sweep devices")
+        results = await asyncio.gather(*map(self._read_device, self.main_coordinator.devices))
+        return dict(results)
+
+    async def async_refresh_param(self, device, param_id):
+        """Re-read a single setting after it was written."""
+        await asyncio.sleep(WRITE_SETTLE_DELAY)
+        response = await self._read_value(device, param_id)
+        if response is None:
+            return
+        data = dict(self.data or {})
+        data[device['pn']] = {**data.get(device['pn'], {}), param_id: response}
+        self.async_set_updated_data(data)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from custom_components.dess_monitor.api.resolvers.data_resolvers import RESOLVED_KEY
+from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators.coordinator import MAX_UPDATE_INTERVAL
+
+STORAGE_VERSION = 1
+# write the snapshot at most this often, and on shutdown
+SNAPSHOT_SAVE_DELAY = 10 * 60
+# an older snapshot is not restored, the entities wait for a fresh refresh instead;
+# a few of the longest main coordinator update intervals, enough for a restart
+SNAPSHOT_MAX_AGE = 3 * MAX_UPDATE_INTERVAL
+# derived from the payload on every update, rebuilt after a restore
+DERIVED_KEYS = (RESOLVED_KEY,)
+
+
+def snapshot_storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.snapshot"
+
+
+class CoordinatorSnapshot:
+    """Last good coordinator data of a config entry, persisted across restarts.
+
+    Holds the device list, the per device cloud payloads (including the ctrl
+    field schemas) and the direct protocol data. On startup the coordinators
+    are seeded from it, so the entities come up before the first cloud
+    refresh. A snapshot taken with other options or for another account is
+    ignored, the device list may differ, and so is one older than
+    SNAPSHOT_MAX_AGE, it would show long gone values as current.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, main_coordinator, direct_coordinator):
+        self._config_entry = config_entry
+        self._main_coordinator = main_coordinator
+        self._direct_coordinator = direct_coordinator
+        self._store = Store(hass, STORAGE_VERSION, snapshot_storage_key(config_entry.entry_id))
+        self._save_pending = False
+
+    @property
+    def _username(self) -> str:
+        return self._config_entry.data["username"]
+
+    async def async_load(self) -> dict | None:
+        stored = await self._store.async_load()
+        if (
+                not stored
+                or stored.get("username") != self._username
+                or stored.get("options") != dict(self._config_entry.options)
+                or not stored.get("devices")
+        ):
+            return None
+        age = time.time() - stored.get("saved_at", 0)
+        if not 0 <= age <= SNAPSHOT_MAX_AGE:
+            print(f"snapshot is {round(age)} s old, starting cold")
+            return None
+        return stored
+
+    @callback
+    def async_schedule_save(self):
+        """Coordinator listener, persist the data once the save delay passed."""
+        if self._save_pending or not self._main_coordinator.last_update_success:
+            return
+        if not self._main_coordinator.data:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._save_pending = False
+        return {
+            "username": self._username,
+            "options": dict(self._config_entry.options),
+            "saved_at": time.time(),
+            "devices": self._main_coordinator.devices,
+            "main": {
+                pn: {key: value for key, value in payload.items() if key not in DERIVED_KEYS}
+                for pn, payload in (self._main_coordinator.data or {}).items()
+            },
+            "direct": self._direct_coordinator.data,
+        }
+
+    async def async_remove(self):
+        await self._store.async_remove()
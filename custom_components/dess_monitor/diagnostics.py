@@ -1,3 +1,4 @@
+import time
 from typing import Any
 
 from homeassistant.components.diagnostics import async_redact_data
@@ -5,6 +6,8 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceEntry
 
+from custom_components.dess_monitor.api.resolvers.data_resolvers import ResolvedValues
+
 
 async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
     """Return diagnostics for a config entry."""
@@ -24,13 +27,28 @@ async def async_get_device_diagnostics(
         hass: HomeAssistant, entry: ConfigEntry, device: DeviceEntry,
 ) -> dict[str, Any]:
     """Return diagnostics for a device entry."""
+    cadence = entry.runtime_data.coordinator.cadences.get(device.model)
+    updated_at = entry.runtime_data.coordinator.device_updated_at.get(device.model)
     return {
         "device": {
             'devcode': device.hw_version,
-            'data': async_redact_data(entry.runtime_data.coordinator.data[device.model], [
+            'data': async_redact_data({
+                key: value.as_dict() if isinstance(value, ResolvedValues) else value
+                for key, value in entry.runtime_data.coordinator.data[device.model].items()
+            }, [
                 'devalias', 'pn', 'sn', 'collalias', 'usr'
             ]),
             'direct_data': (entry.runtime_data.direct_coordinator.data or {}) \
-                .get(device.model, {})
+                .get(device.model, {}),
+            'direct_sections': entry.runtime_data.direct_coordinator.section_status(device.model),
+            'direct_command_queue': entry.runtime_data.direct_coordinator.command_queue.as_dict(device.model),
+            'call_timings_ms': entry.runtime_data.coordinator.call_timings.get(device.model, {}),
+            'upload_cadence': cadence.as_dict(time.time()) if cadence is not None else None,
+            'last_update_age_s': round(time.time() - updated_at) if updated_at is not None else None,
+            'resolution_plan': entry.runtime_data.coordinator.resolution_plans.for_device(device.model),
+            'state_writes': next(
+                (item.state_writes for item in entry.runtime_data.items if item.inverter_id == device.model),
+                None,
+            ),
         }
     }
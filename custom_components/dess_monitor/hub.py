@@ -2,21 +2,30 @@ from __future__ import annotations
 
 from homeassistant.core import HomeAssistant
 
-from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator
+from custom_components.dess_monitor.api.client import DessClient
+from custom_components.dess_monitor.auth import AuthManager
+from custom_components.dess_monitor.coordinators.burst import BurstManager
+from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator, STALE_KEY
 from custom_components.dess_monitor.coordinators.direct_coordinator import DirectCoordinator
+from custom_components.dess_monitor.coordinators.settings_coordinator import SettingsCoordinator
 
 
 class Hub:
     manufacturer = "DESS Monitor"
 
     def __init__(self, hass: HomeAssistant, username: str, coordinator: MainCoordinator = None,
-                 direct_coordinator1: DirectCoordinator = None) -> None:
-        self.auth = None
+                 direct_coordinator1: DirectCoordinator = None, client: DessClient = None,
+                 auth: AuthManager = None) -> None:
+        self.auth = auth
+        self.client = client
         self._username = username
         self._hass = hass
         self._name = username
         self.coordinator = coordinator
         self.direct_coordinator = direct_coordinator1
+        self.settings_coordinator: SettingsCoordinator | None = None
+        # on demand QPIGS sampling, only with the direct request protocol
+        self.burst: BurstManager | None = None
         self._id = username.lower()
         print('init hub', username)
         self.items = []
@@ -33,6 +42,17 @@ class Hub:
             inverter_device = InverterDevice(f"{device['pn']}", f"{device['devalias']}", device, self)
             self.items.append(inverter_device)
 
+    def invalidate_config_sections(self, pn):
+        """Make the coordinators refetch the configuration sections of a device after a write."""
+        for section in ("pars", "output_priority"):
+            self.coordinator.invalidate_section(pn, section)
+        if self.direct_coordinator is not None:
+            self.direct_coordinator.invalidate_section(pn, "qpiri")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+
 
 class InverterDevice:
 
@@ -43,6 +63,8 @@ class InverterDevice:
         self.name = name
         self.firmware_version = f"0.0.1"
         self.model = "DESS Device"
+        # state writes of the sensors of this device, see ChangeAwareStateMixin
+        self.state_writes = {'emitted': 0, 'suppressed': 0}
 
     @property
     def inverter_id(self) -> str:
@@ -53,3 +75,9 @@ class InverterDevice:
         if self.hub.coordinator.data is not None and self.inverter_id not in self.hub.coordinator.data:
             return False
         return True
+
+    @property
+    def stale(self) -> bool:
+        """True while the coordinator serves the last good data of a late device."""
+        data = (self.hub.coordinator.data or {}).get(self.inverter_id)
+        return data is not None and data.get(STALE_KEY, False)
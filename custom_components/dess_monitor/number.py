@@ -1,16 +1,17 @@
-from datetime import timedelta, datetime
+from datetime import timedelta
 
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.dess_monitor import MainCoordinator, HubConfigEntry
-from custom_components.dess_monitor.api import set_ctrl_device_param, get_device_ctrl_value
+from custom_components.dess_monitor.api import set_ctrl_device_param
 from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators.settings_coordinator import SettingsCoordinator
 from custom_components.dess_monitor.hub import InverterDevice
 from custom_components.dess_monitor.util import resolve_number_with_unit
 
@@ -38,7 +39,7 @@ async def async_setup_entry(
             continue
         async_add_entities(list(
             map(
-                lambda field_data: InverterDynamicSettingNumber(item, coordinator, field_data),
+                lambda field_data: InverterDynamicSettingNumber(item, hub.settings_coordinator, field_data),
                 filter(lambda field: 'item' not in field, fields)
             )
         )
@@ -56,7 +57,7 @@ class NumberBase(CoordinatorEntity, NumberEntity):
 
     def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=inverter_device.inverter_id)
         self._inverter_device = inverter_device
 
     # To link this entity to the cover device, this property must return an
@@ -102,14 +103,12 @@ class NumberBase(CoordinatorEntity, NumberEntity):
 
 class InverterDynamicSettingNumber(NumberBase):
     _attr_native_value = None
-    should_poll = True
     _attr_entity_category = EntityCategory.CONFIG
 
     # _attr_entity_category = EntityCategory.CONFIG
 
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator, field_data):
+    def __init__(self, inverter_device: InverterDevice, coordinator: SettingsCoordinator, field_data):
         super().__init__(inverter_device, coordinator)
-        self._last_updated = None
         self._service_param_id = field_data['id']
         # "hint": "25.0~31.5V 48.0~61.0V"
         # self._id
@@ -121,35 +120,21 @@ class InverterDynamicSettingNumber(NumberBase):
         self._attr_native_step = 0.1
         self._attr_mode = NumberMode.BOX
 
-    # async def async_added_to_hass(self) -> None:
-    #     """Handle entity which will be added."""
-    #
-    #     if (last_sensor_data := await self.async_get_last_extra_data()) is not None:
-    #         # print('last_sensor_data', last_sensor_data.as_dict())
-    #         self._attr_current_option = (last_sensor_data.as_dict())['native_value']
-    #     else:
-    #         self._attr_current_option = None
-    #     # await self.async_update()
-    #     await super().async_added_to_hass()
-
-    async def async_update(self):
-        now = int(datetime.now().timestamp())
-        if self._last_updated is not None and now - self._last_updated > 300:
-            pass
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        response = (self.coordinator.data or {}).get(self._inverter_device.inverter_id, {}).get(
+            self._service_param_id)
+        if response is None:
+            return
+        if 'err' not in response:
+            self._attr_native_value = resolve_number_with_unit(response['val'])
+            self.async_write_ha_state()
         else:
-            if self._last_updated is None:
-                pass
-        if self.coordinator.auth['token'] is not None:
-            response = await get_device_ctrl_value(self.coordinator.auth['token'],
-                                                   self.coordinator.auth['secret'],
-                                                   self._inverter_device.device_data,
-                                                   self._service_param_id)
-            if 'err' not in response:
-                self._attr_native_value = resolve_number_with_unit(response['val'])
-                self._last_updated = now
-                self.async_write_ha_state()
-            else:
-                print('get_device_ctrl_value', self._inverter_device.name, self._service_param_id, response)
+            print('get_device_ctrl_value', self._inverter_device.name, self._service_param_id, response)
 
     async def async_set_native_value(self, value: float) -> None:
         """Update the current value."""
@@ -161,13 +146,18 @@ class InverterDynamicSettingNumber(NumberBase):
             self.coordinator.auth['secret'],
             self._inverter_device.device_data,
             param_id,
-            param_value
+            param_value,
+            client=self.coordinator.client
         )
 
         self._attr_native_value = param_value
         self.async_write_ha_state()
-        # await self.coordinator.async_request_refresh()
-
+        self._inverter_device.hub.invalidate_config_sections(self._inverter_device.inverter_id)
+        self.coordinator.config_entry.async_create_background_task(
+            self.hass,
+            self.coordinator.async_refresh_param(self._inverter_device.device_data, param_id),
+            f"dess_monitor read back {param_id}",
+        )
 
 
 class BatteryCapacityNumber(NumberEntity, RestoreEntity):
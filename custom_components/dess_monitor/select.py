@@ -8,10 +8,11 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.dess_monitor import MainCoordinator, HubConfigEntry
-from custom_components.dess_monitor.api import set_ctrl_device_param, get_device_ctrl_value
+from custom_components.dess_monitor.api import set_ctrl_device_param
 from custom_components.dess_monitor.api.helpers import set_inverter_output_priority
-from custom_components.dess_monitor.api.resolvers.data_resolvers import resolve_output_priority
+from custom_components.dess_monitor.api.resolvers.data_resolvers import resolve_output_priority, resolved_value
 from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators.settings_coordinator import SettingsCoordinator
 from custom_components.dess_monitor.hub import InverterDevice
 from custom_components.dess_monitor.util import resolve_number_with_unit
 
@@ -43,7 +44,7 @@ async def async_setup_entry(
             print("Setting up dynamic_settings")
             async_add_entities(list(
                 map(
-                    lambda field_data: InverterDynamicSettingSelect(item, coordinator, field_data),
+                    lambda field_data: InverterDynamicSettingSelect(item, hub.settings_coordinator, field_data),
                     filter(lambda field: 'item' in field, fields)
                 )
             )
@@ -57,7 +58,7 @@ class SelectBase(CoordinatorEntity, SelectEntity):
 
     def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=inverter_device.inverter_id)
         self._inverter_device = inverter_device
 
     # To link this entity to the cover device, this property must return an
@@ -113,13 +114,13 @@ class InverterOutputPrioritySelect(SelectBase):
         if coordinator.data is not None:
             data = coordinator.data[self._inverter_device.inverter_id]
             device_data = self._inverter_device.device_data
-            self._attr_current_option = resolve_output_priority(data, device_data)
+            self._attr_current_option = resolved_value(resolve_output_priority, data, device_data)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         data = self.coordinator.data[self._inverter_device.inverter_id]
         device_data = self._inverter_device.device_data
-        self._attr_current_option = resolve_output_priority(data, device_data)
+        self._attr_current_option = resolved_value(resolve_output_priority, data, device_data)
         self.async_write_ha_state()
 
     async def async_select_option(self, option: str):
@@ -129,9 +130,11 @@ class InverterOutputPrioritySelect(SelectBase):
                 self.coordinator.auth['token'],
                 self.coordinator.auth['secret'],
                 self._inverter_device.device_data,
-                option
+                option,
+                client=self.coordinator.client
             )
             self._attr_current_option = option
+            self.coordinator.invalidate_section(self._inverter_device.inverter_id, "output_priority")
             await self.coordinator.async_request_refresh()
 
 
@@ -139,10 +142,9 @@ class InverterDynamicSettingSelect(SelectBase):
     _attr_current_option = None
     _last_updated = None
     _disabled_param = False
-    should_poll = True
     _attr_entity_category = EntityCategory.CONFIG
 
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator, field_data):
+    def __init__(self, inverter_device: InverterDevice, coordinator: SettingsCoordinator, field_data):
         super().__init__(inverter_device, coordinator)
         self._field_data = field_data
         self._service_param_id = field_data['id']
@@ -156,49 +158,36 @@ class InverterDynamicSettingSelect(SelectBase):
         )
         self._attr_options_keys = list(map(lambda x: x['key'], field_data['item']))
 
-    # async def async_added_to_hass(self) -> None:
-    #     """Handle entity which will be added."""
-    #
-    #     if (last_sensor_data := await self.async_get_last_extra_data()) is not None:
-    #         # print('last_sensor_data', last_sensor_data.as_dict())
-    #         self._attr_current_option = (last_sensor_data.as_dict())['native_value']
-    #     else:
-    #         self._attr_current_option = None
-    #     # await self.async_update()
-    #     await super().async_added_to_hass()
-
-    async def async_update(self, force=False):
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        response = (self.coordinator.data or {}).get(self._inverter_device.inverter_id, {}).get(
+            self._service_param_id)
+        if response is None:
+            return
         now = int(datetime.now().timestamp())
-        if self._last_updated is not None and now - self._last_updated > 300:
-            pass
-        else:
-            if self._last_updated is None:
-                pass
-
-        if self.coordinator.auth['token'] is not None:
-            response = await get_device_ctrl_value(self.coordinator.auth['token'],
-                                                   self.coordinator.auth['secret'],
-                                                   self._inverter_device.device_data,
-                                                   self._service_param_id)
-
-            if 'err' not in response:
-                val = response['val'] if 'unit' not in self._field_data else str(
-                    resolve_number_with_unit(response['val']))
-                mapped_list = list(map(lambda x: x.lower(), self._attr_options))
-                try:
-                    index = mapped_list.index(val.lower())
-                    real_val = self._attr_options[index]
-                    self._attr_current_option = real_val
-                    self._last_updated = now
-                    self.async_write_ha_state()
-                except ValueError:
-                    if self._last_updated is None:
-                        self._disabled_param = True
-                    self._last_updated = now
-            else:
+
+        if 'err' not in response:
+            val = response['val'] if 'unit' not in self._field_data else str(
+                resolve_number_with_unit(response['val']))
+            mapped_list = list(map(lambda x: x.lower(), self._attr_options))
+            try:
+                index = mapped_list.index(val.lower())
+                real_val = self._attr_options[index]
+                self._attr_current_option = real_val
+                self._last_updated = now
+            except ValueError:
                 if self._last_updated is None:
                     self._disabled_param = True
-                # print('get_device_ctrl_value', self._inverter_device.name, self._service_param_id, response)
+                self._last_updated = now
+        else:
+            if self._last_updated is None:
+                self._disabled_param = True
+            # print('get_device_ctrl_value', self._inverter_device.name, self._service_param_id, response)
+        self.async_write_ha_state()
 
     @property
     def available(self) -> bool:
@@ -219,9 +208,15 @@ class InverterDynamicSettingSelect(SelectBase):
                 self.coordinator.auth['secret'],
                 self._inverter_device.device_data,
                 param_id,
-                param_value
+                param_value,
+                client=self.coordinator.client
             )
 
             self._attr_current_option = option
             self.async_write_ha_state()
-            # await self.coordinator.async_request_refresh()
+            self._inverter_device.hub.invalidate_config_sections(self._inverter_device.inverter_id)
+            self.coordinator.config_entry.async_create_background_task(
+                self.hass,
+                self.coordinator.async_refresh_param(self._inverter_device.device_data, param_id),
+                f"dess_monitor read back {param_id}",
+            )
@@ -1,9 +1,11 @@
 """Platform for sensor integration."""
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from custom_components.dess_monitor.sensors.direct_sensor import DIRECT_SENSORS, generate_qpiri_sensors
+from custom_components.dess_monitor.api.resolvers.data_resolvers import RESOLVERS, resolver_capabilities
+from custom_components.dess_monitor.sensors.burst_sensor import DirectBurstSensor
+from custom_components.dess_monitor.sensors.direct_sensor import create_direct_sensors, generate_qpiri_sensors
 from . import HubConfigEntry
 from .sensors.direct_energy_sensors import DirectInverterOutputEnergySensor, DirectPV2EnergySensor, \
     DirectPVEnergySensor, DirectBatteryInEnergySensor, DirectBatteryOutEnergySensor, DirectBatteryStateOfChargeSensor
@@ -20,9 +22,16 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in HA."""
     hub = config_entry.runtime_data
     new_devices = []
+    # static sensors whose resolver found no data yet, added once their data appears
+    pending = []
 
     for item in hub.items:
-        new_devices.extend(create_static_sensors(item, hub.coordinator))
+        supported, unsupported = split_by_capability(
+            create_static_sensors(item, hub.coordinator),
+            device_capabilities(hub.coordinator, item),
+        )
+        new_devices.extend(supported)
+        pending.extend((item, sensor) for sensor in unsupported)
 
         if should_add_dynamic_sensors(config_entry, hub, item):
             new_devices.extend(create_dynamic_sensors(item, hub.coordinator))
@@ -37,61 +46,67 @@ async def async_setup_entry(
                 DirectBatteryInEnergySensor(item, hub.direct_coordinator),
                 DirectBatteryOutEnergySensor(item, hub.direct_coordinator),
                 DirectBatteryStateOfChargeSensor(item, hub.direct_coordinator, hass),
+                DirectBurstSensor(item, hub.direct_coordinator, hub.burst),
             ])
 
     if new_devices:
         async_add_entities(new_devices)
 
+    if pending:
+        @callback
+        def add_appeared_sensors():
+            appeared = []
+            for item, sensor in list(pending):
+                capable = device_capabilities(hub.coordinator, item)
+                if capable is not None and sensor_resolver_name(sensor) in capable:
+                    pending.remove((item, sensor))
+                    appeared.append(sensor)
+            if appeared:
+                async_add_entities(appeared)
+
+        config_entry.async_on_unload(hub.coordinator.async_add_listener(add_appeared_sensors))
+
+
+# devcode -> resolvers that produced a value, used for devices without data yet
+DEVCODE_CAPABILITIES: dict[str, set[str]] = {}
+
+
+def device_capabilities(coordinator, item) -> set[str] | None:
+    """Resolvers that can produce a value for the device, None when nothing is known yet."""
+    devcode = str(item.device_data.get('devcode'))
+    index = coordinator.param_indexes.get(item.inverter_id)
+    if index is None:
+        return DEVCODE_CAPABILITIES.get(devcode)
+    capable = {name for name, ok in resolver_capabilities(index).items() if ok}
+    DEVCODE_CAPABILITIES.setdefault(devcode, set()).update(capable)
+    return capable
+
+
+def sensor_resolver_name(sensor) -> str | None:
+    name = getattr(getattr(sensor, '_resolve_fn', None), '__name__', None)
+    return name if name in RESOLVERS else None
+
+
+def split_by_capability(sensors, capable: set[str] | None):
+    """Split sensors into the ones that can resolve a value and the ones that can't (yet)."""
+    if capable is None:
+        return sensors, []
+    supported, unsupported = [], []
+    for sensor in sensors:
+        name = sensor_resolver_name(sensor)
+        if name is None or name in capable:
+            supported.append(sensor)
+        else:
+            unsupported.append(sensor)
+    return supported, unsupported
+
 
 def create_static_sensors(item, coordinator):
     """Return list of static sensors for an item."""
-    sensor_classes = [
-        # Grid sensors
-        GridInputVoltageSensor,
-        GridInputFrequencySensor,
-        GridInputPowerSensor,
-
-        # PV sensors
-        PVPowerSensor,
-        PV2PowerSensor,
-        PVPowerTotalSensor,  # deprecated
-        PVEnergySensor,
-        PV2EnergySensor,
-        PVVoltageSensor,
-        PV2VoltageSensor,
-
-        # Battery sensors
-        BatteryVoltageSensor,
-        BatteryChargeSensor,
-        BatteryChargePowerSensor,
-        BatteryDischargeSensor,
-        BatteryDischargePowerSensor,
-        BatteryInEnergySensor,
-        BatteryOutEnergySensor,
-        BatteryCapacitySensor,
-
-        # Inverter sensors
-        InverterStatusSensor,
-        InverterOutputPrioritySensor,
-        InverterOutputVoltageSensor,
-        InverterOutputPowerSensor,
-        InverterOutEnergySensor,
-        InverterInEnergySensor,
-        InverterDCTemperatureSensor,
-        InverterInvTemperatureSensor,
-        InverterLoadSensor,
-
-        # Inverter config sensors
-        InverterChargePrioritySensor,
-        InverterConfigBTUtilityChargeSensor,
-        InverterConfigBTTotalChargeSensor,
-        InverterConfigBTCutoffSensor,
-        InverterNominalOutPowerSensor,
-        InverterRatedBatteryVoltageSensor,
-        InverterComebackUtilityVoltageSensor,
-        InverterComebackBatteryVoltageSensor,
+    return [
+        *(ValueResolvingSensor(item, coordinator, description) for description in SENSOR_DESCRIPTIONS),
+        *(FunctionBasedEnergySensor(item, coordinator, description) for description in ENERGY_SENSOR_DESCRIPTIONS),
     ]
-    return [sensor_cls(item, coordinator) for sensor_cls in sensor_classes]
 
 
 def should_add_dynamic_sensors(config_entry, hub, item):
@@ -135,9 +150,3 @@ def should_add_direct_sensors(config_entry, hub, item):
             and hub.direct_coordinator.data is not None
             and item.inverter_id in hub.direct_coordinator.data
     )
-
-
-def create_direct_sensors(item, coordinator):
-    """Return direct protocol-based sensors for an item."""
-    direct_sensor_classes = DIRECT_SENSORS
-    return [sensor_cls(item, coordinator) for sensor_cls in direct_sensor_classes]
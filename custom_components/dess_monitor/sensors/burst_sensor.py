@@ -0,0 +1,96 @@
+import time
+from itertools import islice
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from custom_components.dess_monitor.coordinators.burst import BurstManager, SIGNAL_BURST_SAMPLE, SIGNAL_BURST_STATE
+from custom_components.dess_monitor.coordinators.direct_coordinator import DirectCoordinator
+from custom_components.dess_monitor.hub import InverterDevice
+from custom_components.dess_monitor.sensors.direct_sensor import DirectSensorBase
+
+BURST_IDLE = "idle"
+BURST_ACTIVE = "active"
+# QPIGS fields published per sample in the attributes
+BURST_ATTRIBUTE_FIELDS = (
+    "grid_voltage",
+    "ac_output_voltage",
+    "output_active_power",
+    "output_apparent_power",
+    "battery_voltage",
+    "battery_charging_current",
+    "battery_discharge_current",
+    "pv_charging_power",
+)
+BURST_ATTRIBUTE_SAMPLES = 60
+# during a burst the attributes are written at most this often, the full
+# stream is SIGNAL_BURST_SAMPLE
+BURST_ATTRIBUTE_INTERVAL = 10
+
+
+class DirectBurstSensor(DirectSensorBase):
+    """State of the QPIGS burst of a device, its recent samples as attributes."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [BURST_IDLE, BURST_ACTIVE]
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # the ring buffer changes with every sample, keep it out of the recorder
+    _unrecorded_attributes = frozenset({"samples", "commands_left", "ends_in_s", "failed"})
+
+    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator, burst_manager: BurstManager):
+        super().__init__(inverter_device, coordinator)
+        self._burst_manager = burst_manager
+        self._last_publish = 0.0
+        self._attr_unique_id = f"{self._inverter_device.inverter_id}_direct_burst"
+        self._attr_name = f"{self._inverter_device.name} Direct Burst"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        pn = self._inverter_device.inverter_id
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_BURST_STATE.format(pn), self._handle_burst_state)
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_BURST_SAMPLE.format(pn), self._handle_burst_sample)
+        )
+
+    @property
+    def native_value(self):
+        return BURST_IDLE if self._burst_manager.session(self._inverter_device.inverter_id) is None else BURST_ACTIVE
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        pn = self._inverter_device.inverter_id
+        session = self._burst_manager.session(pn)
+        ring = self._burst_manager.samples.get(pn, ())
+        recent = islice(ring, max(len(ring) - BURST_ATTRIBUTE_SAMPLES, 0), None)
+        return {
+            "interval_s": None if session is None else session.interval,
+            "commands_left": None if session is None else session.commands_left,
+            "ends_in_s": None if session is None else round(session.ends_in),
+            "failed": None if session is None else session.failed,
+            "samples": [
+                {"time": round(sample["time"], 1), **{key: sample.get(key) for key in BURST_ATTRIBUTE_FIELDS}}
+                for sample in recent
+            ],
+        }
+
+    @callback
+    def _handle_burst_state(self) -> None:
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_burst_sample(self, sample) -> None:
+        if time.monotonic() - self._last_publish >= BURST_ATTRIBUTE_INTERVAL:
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # only the availability follows the coordinator
+        self._handle_burst_sample(None)
+
+    def async_write_ha_state(self) -> None:
+        self._last_publish = time.monotonic()
+        super().async_write_ha_state()
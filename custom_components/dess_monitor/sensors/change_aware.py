@@ -0,0 +1,90 @@
+import time
+from datetime import timedelta
+
+from homeassistant.const import UnitOfPower, UnitOfElectricPotential, UnitOfElectricCurrent, UnitOfFrequency, \
+    UnitOfTemperature, UnitOfApparentPower
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+
+# smallest change of a native value worth a state write
+DEADBAND_BY_UNIT = {
+    UnitOfPower.WATT: 5,
+    UnitOfPower.KILO_WATT: 0.005,
+    UnitOfApparentPower.VOLT_AMPERE: 5,
+    UnitOfElectricPotential.VOLT: 0.1,
+    UnitOfElectricCurrent.AMPERE: 0.1,
+    UnitOfFrequency.HERTZ: 0.05,
+    UnitOfTemperature.CELSIUS: 0.5,
+}
+# a value held back by the deadband reaches Home Assistant after at most this long
+MAX_SILENCE = 15 * 60
+# how often the entities look for such a value, the coordinator does not call
+# the entities of a device whose data did not change
+HEARTBEAT_INTERVAL = timedelta(minutes=5)
+
+
+class ChangeAwareStateMixin:
+    """Skip coordinator updates that would not change what Home Assistant shows.
+
+    Coordinator update handlers write through `_async_write_state_if_changed`.
+    The write goes through when the availability changed, the value changed by
+    more than the deadband of the entity (`_state_deadband`, by default taken
+    from the unit) and is still different at display precision, or when
+    nothing was written for MAX_SILENCE seconds. A timer writes a value the
+    deadband held back once MAX_SILENCE passed, also when no further
+    coordinator update reaches the entity. Emitted and suppressed writes
+    are counted on the inverter device. Writes started by Home Assistant itself
+    (registry, name or precision changes) use `async_write_ha_state` and are
+    never suppressed.
+    """
+
+    _state_deadband: float | None = None
+    _last_written = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(self.hass, self._async_state_heartbeat, HEARTBEAT_INTERVAL)
+        )
+
+    @callback
+    def _async_state_heartbeat(self, now=None) -> None:
+        if self._last_written is None:
+            return
+        (last_state, last_at) = self._last_written
+        if time.monotonic() - last_at >= MAX_SILENCE and (self.available, self.native_value) != last_state:
+            self._async_write_state_if_changed()
+
+    @callback
+    def _async_write_state_if_changed(self) -> None:
+        state = (self.available, self.native_value)
+        now = time.monotonic()
+        if self._last_written is not None:
+            (last_state, last_at) = self._last_written
+            if now - last_at < MAX_SILENCE and not self._state_changed(last_state, state):
+                self._count_state_write('suppressed')
+                return
+        self.async_write_ha_state()
+        self._last_written = (state, now)
+        self._count_state_write('emitted')
+
+    def _state_changed(self, last_state, state) -> bool:
+        (last_available, last_value), (available, value) = last_state, state
+        if available != last_available:
+            return True
+        if not isinstance(value, (int, float)) or not isinstance(last_value, (int, float)):
+            return value != last_value
+        deadband = self._state_deadband
+        if deadband is None:
+            deadband = DEADBAND_BY_UNIT.get(self.native_unit_of_measurement, 0)
+        if abs(value - last_value) < deadband:
+            return False
+        precision = self.suggested_display_precision
+        if precision is not None and round(value, precision) == round(last_value, precision):
+            return False
+        return value != last_value
+
+    def _count_state_write(self, kind):
+        inverter_device = getattr(self, '_inverter_device', None)
+        if inverter_device is not None:
+            inverter_device.state_writes[kind] += 1
@@ -77,7 +77,7 @@ class DirectEnergySensorBase(RestoreSensor, DirectTypedSensorBase):
         # Обновляем предыдущее значение мощности и время
         self._prev_power = current_value
         self._prev_ts = now
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -93,7 +93,7 @@ class DirectEnergySensorBase(RestoreSensor, DirectTypedSensorBase):
             self.update_energy_value(power)
 
         # Обновляем state (даже если power оказался None, рисуем текущее значение накопленной энергии)
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
 
 class DirectPVEnergySensor(DirectEnergySensorBase):
@@ -133,7 +133,7 @@ class DirectPV2EnergySensor(DirectEnergySensorBase):
 
         if power is not None:
             self.update_energy_value(power)
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
 
 class DirectInverterOutputEnergySensor(DirectEnergySensorBase):
@@ -166,6 +166,7 @@ class DirectOutputApparentEnergySensor(DirectEnergySensorBase):
 
 class DirectBatteryInEnergySensor(DirectEnergySensorBase):
     """Энергия по мощности зарядки батареи (battery_charging_current * battery_voltage)."""
+    extra_data_sections = ("qpiri",)
 
     def __init__(self, inverter_device, coordinator):
         super().__init__(
@@ -196,7 +197,7 @@ class DirectBatteryInEnergySensor(DirectEnergySensorBase):
             self.update_energy_value(power)
 
         # Обновляем state (накопленную энергию), даже если power оказался None
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
 
 class DirectBatteryOutEnergySensor(DirectEnergySensorBase):
@@ -230,10 +231,11 @@ class DirectBatteryOutEnergySensor(DirectEnergySensorBase):
             self.update_energy_value(power)
 
         # Обновляем state (накопленную энергию), даже если power оказался None
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
 
 class DirectBatteryStateOfChargeSensor(RestoreSensor, DirectTypedSensorBase):
+    extra_data_sections = ("qpiri",)
     _attr_device_class = SensorDeviceClass.BATTERY
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_suggested_display_precision = 1
@@ -331,14 +333,14 @@ class DirectBatteryStateOfChargeSensor(RestoreSensor, DirectTypedSensorBase):
         if self._battery_capacity_wh is None or self._battery_capacity_wh <= 0:
             # Не считаем, если емкость не задана
             self._attr_native_value = None
-            self.async_write_ha_state()
+            self._async_write_state_if_changed()
             return
 
         bulk_voltage = self.get_bulk_charging_voltage()
         floating_voltage = self.get_floating_charging_voltage()
         if bulk_voltage is None:
             self._attr_native_value = None
-            self.async_write_ha_state()
+            self._async_write_state_if_changed()
             return
 
         now = datetime.now()
@@ -368,7 +370,7 @@ class DirectBatteryStateOfChargeSensor(RestoreSensor, DirectTypedSensorBase):
         soc_percent = max(0.0, min(100.0, soc_percent))
 
         self._attr_native_value = soc_percent
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -386,4 +388,4 @@ class DirectBatteryStateOfChargeSensor(RestoreSensor, DirectTypedSensorBase):
             self.update_soc(power, current_voltage)
         except (KeyError, ValueError, TypeError):
             self._attr_native_value = None
-            self.async_write_ha_state()
+            self._async_write_state_if_changed()
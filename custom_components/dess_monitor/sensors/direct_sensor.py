@@ -1,4 +1,9 @@
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorEntityDescription
 from homeassistant.const import UnitOfElectricPotential, UnitOfPower, UnitOfTemperature, EntityCategory, \
     UnitOfElectricCurrent, UnitOfFrequency, UnitOfApparentPower
 from homeassistant.core import callback
@@ -10,13 +15,14 @@ from custom_components.dess_monitor.api.commands.direct_commands import Parallel
     OutputSourcePriority, ACInputVoltageRange, BatteryType
 from custom_components.dess_monitor.const import DOMAIN
 from custom_components.dess_monitor.hub import InverterDevice
+from custom_components.dess_monitor.sensors.change_aware import ChangeAwareStateMixin
 
 
-class DirectSensorBase(CoordinatorEntity, SensorEntity):
+class DirectSensorBase(ChangeAwareStateMixin, CoordinatorEntity, SensorEntity):
 
     def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=inverter_device.inverter_id)
         self._inverter_device = inverter_device
 
     @property
@@ -47,6 +53,9 @@ class DirectSensorBase(CoordinatorEntity, SensorEntity):
 class DirectTypedSensorBase(DirectSensorBase):
     """Абстрактный базовый класс для сенсоров, получающих значение по ключу."""
 
+    # другие секции, которые читает сенсор помимо data_section
+    extra_data_sections: tuple[str, ...] = ()
+
     def __init__(
             self,
             inverter_device: InverterDevice,
@@ -59,6 +68,8 @@ class DirectTypedSensorBase(DirectSensorBase):
         super().__init__(inverter_device, coordinator)
         self.data_section = data_section
         self.data_key = data_key
+        # only woken up when one of the sections it reads changed
+        self.coordinator_context = (self._inverter_device.inverter_id, data_section, *self.extra_data_sections)
 
         suffix = sensor_suffix or data_key
         name_part = name_suffix or data_key.replace('_', ' ').title()
@@ -79,386 +90,180 @@ class DirectTypedSensorBase(DirectSensorBase):
         else:
             self._attr_native_value = None
 
-        self.async_write_ha_state()
-
-
-class DirectWattSensorBase(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.POWER
-    _attr_unit_of_measurement = UnitOfPower.WATT
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_suggested_display_precision = 0
-    _sensor_option_display_precision = 0
-
-
-class DirectTemperatureSensorBase(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.TEMPERATURE
-    _attr_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_suggested_display_precision = 0
-    _sensor_option_display_precision = 0
-
-
-class DirectVoltageSensorBase(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.VOLTAGE
-    _attr_unit_of_measurement = UnitOfElectricPotential.VOLT
-    _attr_native_unit_of_measurement = UnitOfElectricPotential.VOLT
-    _attr_suggested_display_precision = 1
-    _sensor_option_display_precision = 1
-
-
-class DirectCurrentSensorBase(DirectTypedSensorBase):
-    """Базовый сенсор силы тока (A) для direct-протокола."""
-
-    device_class = SensorDeviceClass.CURRENT
-    _attr_unit_of_measurement = UnitOfElectricCurrent.AMPERE
-    _attr_native_unit_of_measurement = UnitOfElectricCurrent.AMPERE
-    _attr_suggested_display_precision = 0
-    _sensor_option_display_precision = 0
-
-
-class DirectApparentPowerSensorBase(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.APPARENT_POWER
-    _attr_unit_of_measurement = UnitOfApparentPower.VOLT_AMPERE
-    _attr_native_unit_of_measurement = UnitOfApparentPower.VOLT_AMPERE
-    _attr_suggested_display_precision = 0
-    _sensor_option_display_precision = 0
-
-
-class DirectBatteryCapacitySensorBase(DirectTypedSensorBase):
-    _attr_unit_of_measurement = "Ah"
-    _attr_native_unit_of_measurement = "Ah"
-    _attr_suggested_display_precision = 0
-    _sensor_option_display_precision = 0
-
+        self._async_write_state_if_changed()
 
-class DirectFrequencySensorBase(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.FREQUENCY
-    _attr_unit_of_measurement = UnitOfFrequency.HERTZ
-    _attr_native_unit_of_measurement = UnitOfFrequency.HERTZ
-    _attr_suggested_display_precision = 1
-    _sensor_option_display_precision = 1
 
+@dataclass(frozen=True, kw_only=True)
+class DirectSensorEntityDescription(SensorEntityDescription):
+    """Описание сенсора direct-протокола, key — суффикс unique_id.
 
-class DirectEnumSensorBase(DirectTypedSensorBase):
-    """Базовый класс для сенсоров с перечислимым значением (ENUM)."""
-
-    enum_class = None  # Подкласс обязан переопределить
-    device_class = SensorDeviceClass.ENUM
-    _attr_device_class = SensorDeviceClass.ENUM
-
-    @property
-    def options(self) -> list[str]:
-        return [e.name for e in self.enum_class] if self.enum_class else []
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        section = self.data.get(self.data_section, {})
-        raw_value = section.get(self.data_key)
-
-        if raw_value is not None:
-            try:
-                self._attr_native_value = raw_value
-            except ValueError:
-                self._attr_native_value = None
-        else:
-            self._attr_native_value = None
-
-        self.async_write_ha_state()
+    slots=True не используется: метакласс FrozenOrThawed у EntityDescription его не поддерживает.
+    """
 
+    data_section: str
+    data_key: str
+    name_suffix: str = ""
+    # вычисляет значение из данных устройства вместо чтения data_key
+    value_fn: Callable[[dict], Any] | None = None
 
-class BatteryTypeSensor(DirectEnumSensorBase):
-    enum_class = BatteryType
 
+_WATT = dict(device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+             suggested_display_precision=0)
+_TEMPERATURE = dict(device_class=SensorDeviceClass.TEMPERATURE, native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+                    suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC)
+_VOLTAGE = dict(device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+                suggested_display_precision=1)
+_CURRENT = dict(device_class=SensorDeviceClass.CURRENT, native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+                suggested_display_precision=0)
+_APPARENT_POWER = dict(device_class=SensorDeviceClass.APPARENT_POWER,
+                       native_unit_of_measurement=UnitOfApparentPower.VOLT_AMPERE, suggested_display_precision=0)
+_BATTERY_CAPACITY = dict(native_unit_of_measurement="Ah", suggested_display_precision=0)
+_FREQUENCY = dict(device_class=SensorDeviceClass.FREQUENCY, native_unit_of_measurement=UnitOfFrequency.HERTZ,
+                  suggested_display_precision=1)
+_PERCENT = dict(native_unit_of_measurement="%", suggested_display_precision=0)
+_DIAGNOSTIC = dict(entity_category=EntityCategory.DIAGNOSTIC)
 
-class ACInputVoltageRangeSensor(DirectEnumSensorBase):
-    enum_class = ACInputVoltageRange
 
+def _enum(enum_class: type[Enum]) -> dict:
+    return dict(device_class=SensorDeviceClass.ENUM, options=[e.name for e in enum_class])
 
-class OutputSourcePrioritySensor(DirectEnumSensorBase):
-    enum_class = OutputSourcePriority
 
+def _pv2_power(data):
+    qpigs2 = data["qpigs2"]
+    return float(qpigs2["pv_current"]) * float(qpigs2["pv_voltage"])
 
-class ChargerSourcePrioritySensor(DirectEnumSensorBase):
-    enum_class = ChargerSourcePriority
 
+class DirectDescribedSensor(DirectTypedSensorBase):
+    """Сенсор direct-протокола, полностью заданный DirectSensorEntityDescription."""
 
-class ParallelModeSensor(DirectEnumSensorBase):
-    enum_class = ParallelMode
+    entity_description: DirectSensorEntityDescription
 
-
-class DirectPVPowerSensor(DirectWattSensorBase):
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
+    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator,
+                 description: DirectSensorEntityDescription):
         super().__init__(
             inverter_device,
             coordinator,
-            data_section="qpigs",
-            data_key="pv_charging_power",
-            sensor_suffix="pv_power",
-            name_suffix="PV Power"
-        )
-
-
-class DirectPV2PowerSensor(DirectWattSensorBase):  # можно и от DirectSensorBase, если не нужен unit/class
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            data_section="unused",  # не используется, можно передать любой
-            data_key="unused",
-            sensor_suffix="pv2_power",
-            name_suffix="PV2 Power"
+            description.data_section,
+            description.data_key,
+            description.key,
+            description.name_suffix,
         )
+        self.entity_description = description
+        self._attr_unit_of_measurement = description.native_unit_of_measurement
+        self._sensor_option_display_precision = description.suggested_display_precision
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        try:
-            qpigs2 = self.data["qpigs2"]
-            self._attr_native_value = float(qpigs2["pv_current"]) * float(qpigs2["pv_voltage"])
-        except (KeyError, ValueError, TypeError):
-            self._attr_native_value = None
-
-        self.async_write_ha_state()
-
-
-class DirectPVVoltageSensor(DirectVoltageSensorBase):
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            data_section="qpigs",
-            data_key="pv_input_voltage",
-            sensor_suffix="pv_voltage",
-            name_suffix="PV Voltage"
-        )
-
-
-class DirectPV2VoltageSensor(DirectVoltageSensorBase):
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            data_section="qpigs2",
-            data_key="pv_voltage",
-            sensor_suffix="pv2_voltage",
-            name_suffix="PV2 Voltage"
-        )
-
-
-class DirectPV2CurrentSensor(DirectCurrentSensorBase):
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            data_section="qpigs2",
-            data_key="pv_current",
-            sensor_suffix="pv2_current",
-            name_suffix="PV2 Current"
-        )
-
-
-class DirectBatteryVoltageSensor(DirectVoltageSensorBase):
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            data_section="qpigs",
-            data_key="battery_voltage",
-            sensor_suffix="battery",
-            name_suffix="Battery Voltage"
-        )
-
-
-class DirectInverterOutputPowerSensor(DirectWattSensorBase):
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            data_section="qpigs",
-            data_key="output_active_power",
-            sensor_suffix="inverter_out_power",
-            name_suffix="Inverter Out Power"
-        )
-
-
-class DirectInverterTemperatureSensor(DirectTemperatureSensorBase):
-    def __init__(self, inverter_device: InverterDevice, coordinator: DirectCoordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            data_section="qpigs",
-            data_key="inverter_heat_sink_temperature",
-            sensor_suffix="inverter_temperature",
-            name_suffix="Inverter Temperature"
-        )
-
-
-class DirectGridVoltageSensor(DirectVoltageSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "grid_voltage", "grid_voltage", "Grid Voltage")
-
-
-class DirectGridFrequencySensor(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.FREQUENCY
-    _attr_unit_of_measurement = "Hz"
-    _attr_native_unit_of_measurement = "Hz"
-    _attr_suggested_display_precision = 1
-    _sensor_option_display_precision = 1
-
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "grid_frequency", "grid_freq", "Grid Frequency")
-
-
-class DirectACOutputVoltageSensor(DirectVoltageSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "ac_output_voltage", "ac_output_voltage",
-                         "AC Output Voltage")
-
-
-class DirectACOutputFrequencySensor(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.FREQUENCY
-    _attr_unit_of_measurement = "Hz"
-    _attr_native_unit_of_measurement = "Hz"
-    _attr_suggested_display_precision = 1
-    _sensor_option_display_precision = 1
-
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "ac_output_frequency", "ac_output_freq",
-                         "AC Output Frequency")
-
-
-class DirectOutputApparentPowerSensor(DirectWattSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "output_apparent_power", "output_apparent_power",
-                         "Apparent Power")
-
-
-class DirectLoadPercentSensor(DirectTypedSensorBase):
-    device_class = SensorDeviceClass.POWER_FACTOR
-    _attr_unit_of_measurement = "%"
-    _attr_native_unit_of_measurement = "%"
-    _attr_suggested_display_precision = 0
-    _sensor_option_display_precision = 0
-
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "load_percent", "load_percent", "Load Percent")
-
-
-class DirectBusVoltageSensor(DirectVoltageSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "bus_voltage", "bus_voltage", "Bus Voltage")
-
-
-class DirectBatteryChargingCurrentSensor(DirectCurrentSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "battery_charging_current", "battery_charging_current",
-                         "Battery Charging Current")
-
-
-class DirectBatteryDischargeCurrentSensor(DirectCurrentSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "battery_discharge_current",
-                         "battery_discharge_current", "Battery Discharge Current")
-
-
-class DirectBatteryCapacitySensor(DirectTypedSensorBase):
-    _attr_unit_of_measurement = "%"
-    _attr_native_unit_of_measurement = "%"
-    _attr_suggested_display_precision = 0
-    _sensor_option_display_precision = 0
-
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "battery_capacity", "battery_capacity",
-                         "Battery Capacity")
-
-
-class DirectPVInputCurrentSensor(DirectCurrentSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "pv_input_current", "pv_input_current",
-                         "PV Input Current")
-
-
-class DirectSCCBatteryVoltageSensor(DirectVoltageSensorBase):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "qpigs", "scc_battery_voltage", "scc_batt_voltage",
-                         "SCC Battery Voltage")
-
-
-class DirectDiagnosticSensorBase(DirectTypedSensorBase):
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-
-
-QPIRI_SENSOR_MAPPING = {
-    "rated_grid_voltage": (DirectVoltageSensorBase, "Rated Grid Voltage", EntityCategory.DIAGNOSTIC),
-    "rated_input_current": (DirectCurrentSensorBase, "Rated Input Current", EntityCategory.DIAGNOSTIC),
-    "rated_ac_output_voltage": (DirectVoltageSensorBase, "Rated AC Output Voltage", EntityCategory.DIAGNOSTIC),
-    "rated_output_frequency": (DirectFrequencySensorBase, "Rated Output Frequency", EntityCategory.DIAGNOSTIC),
-    "rated_output_current": (DirectCurrentSensorBase, "Rated Output Current", EntityCategory.DIAGNOSTIC),
-    "rated_output_apparent_power": (DirectApparentPowerSensorBase, "Rated Output Apparent Power", EntityCategory.DIAGNOSTIC),
-    "rated_output_active_power": (DirectWattSensorBase, "Rated Output Active Power", EntityCategory.DIAGNOSTIC),
-    "rated_battery_voltage": (DirectVoltageSensorBase, "Rated Battery Voltage", EntityCategory.DIAGNOSTIC),
-    "low_battery_to_ac_bypass_voltage": (DirectVoltageSensorBase, "Low Battery to AC Bypass Voltage", None),
-    "shut_down_battery_voltage": (DirectVoltageSensorBase, "Shut Down Battery Voltage", None),
-    "bulk_charging_voltage": (DirectVoltageSensorBase, "Bulk Charging Voltage", None),
-    "float_charging_voltage": (DirectVoltageSensorBase, "Float Charging Voltage", None),
-    "battery_type": (BatteryTypeSensor, "Battery Type", EntityCategory.DIAGNOSTIC),
-    "max_utility_charging_current": (DirectCurrentSensorBase, "Max Utility Charging Current", None),
-    "max_charging_current": (DirectCurrentSensorBase, "Max Charging Current", None),
-    "ac_input_voltage_range": (ACInputVoltageRangeSensor, "AC Input Voltage Range", None),
-    "output_source_priority": (OutputSourcePrioritySensor, "Output Source Priority", None),
-    "charger_source_priority": (ChargerSourcePrioritySensor, "Charger Source Priority", None),
-    "parallel_max_number": (DirectDiagnosticSensorBase, "Parallel Max Number", EntityCategory.DIAGNOSTIC),
-    "reserved_uu": (DirectDiagnosticSensorBase, "Reserved UU", EntityCategory.DIAGNOSTIC),
-    "reserved_v": (DirectDiagnosticSensorBase, "Reserved V", EntityCategory.DIAGNOSTIC),
-    "parallel_mode": (ParallelModeSensor, "Parallel Mode", EntityCategory.DIAGNOSTIC),
-    "high_battery_voltage_to_battery_mode": (DirectVoltageSensorBase, "High Battery Voltage to Battery Mode", None),
-    "solar_work_condition_in_parallel": (DirectDiagnosticSensorBase, "Solar Work Condition In Parallel", EntityCategory.DIAGNOSTIC),
-    "solar_max_charging_power_auto_adjust": (DirectDiagnosticSensorBase, "Solar Max Charging Power Auto Adjust", EntityCategory.DIAGNOSTIC),
-    "rated_battery_capacity": (DirectBatteryCapacitySensorBase, "Rated Battery Capacity", EntityCategory.DIAGNOSTIC),
-    "reserved_b": (DirectDiagnosticSensorBase, "Reserved B", EntityCategory.DIAGNOSTIC),
-    "reserved_ccc": (DirectDiagnosticSensorBase, "Reserved CCC", EntityCategory.DIAGNOSTIC),
-}
+        description = self.entity_description
+        if description.value_fn is not None:
+            try:
+                self._attr_native_value = description.value_fn(self.data)
+            except (KeyError, ValueError, TypeError):
+                self._attr_native_value = None
+        elif description.device_class == SensorDeviceClass.ENUM:
+            # значение перечисления передаётся как есть
+            self._attr_native_value = self.data.get(self.data_section, {}).get(self.data_key)
+        else:
+            super()._handle_coordinator_update()
+            return
+
+        self._async_write_state_if_changed()
+
+
+DIRECT_SENSOR_DESCRIPTIONS: tuple[DirectSensorEntityDescription, ...] = (
+    DirectSensorEntityDescription(key="pv_power", data_section="qpigs", data_key="pv_charging_power",
+                                  name_suffix="PV Power", **_WATT),
+    DirectSensorEntityDescription(key="pv2_power", data_section="qpigs2", data_key="unused",
+                                  name_suffix="PV2 Power", value_fn=_pv2_power, **_WATT),
+    DirectSensorEntityDescription(key="pv_voltage", data_section="qpigs", data_key="pv_input_voltage",
+                                  name_suffix="PV Voltage", **_VOLTAGE),
+    DirectSensorEntityDescription(key="pv2_voltage", data_section="qpigs2", data_key="pv_voltage",
+                                  name_suffix="PV2 Voltage", **_VOLTAGE),
+    DirectSensorEntityDescription(key="pv_input_current", data_section="qpigs", data_key="pv_input_current",
+                                  name_suffix="PV Input Current", **_CURRENT),
+    DirectSensorEntityDescription(key="pv2_current", data_section="qpigs2", data_key="pv_current",
+                                  name_suffix="PV2 Current", **_CURRENT),
+    DirectSensorEntityDescription(key="battery", data_section="qpigs", data_key="battery_voltage",
+                                  name_suffix="Battery Voltage", **_VOLTAGE),
+    DirectSensorEntityDescription(key="battery_charging_current", data_section="qpigs",
+                                  data_key="battery_charging_current", name_suffix="Battery Charging Current",
+                                  **_CURRENT),
+    DirectSensorEntityDescription(key="battery_discharge_current", data_section="qpigs",
+                                  data_key="battery_discharge_current", name_suffix="Battery Discharge Current",
+                                  **_CURRENT),
+    DirectSensorEntityDescription(key="battery_capacity", data_section="qpigs", data_key="battery_capacity",
+                                  name_suffix="Battery Capacity", **_PERCENT),
+    DirectSensorEntityDescription(key="inverter_out_power", data_section="qpigs", data_key="output_active_power",
+                                  name_suffix="Inverter Out Power", **_WATT),
+    DirectSensorEntityDescription(key="inverter_temperature", data_section="qpigs",
+                                  data_key="inverter_heat_sink_temperature", name_suffix="Inverter Temperature",
+                                  **_TEMPERATURE),
+    DirectSensorEntityDescription(key="grid_voltage", data_section="qpigs", data_key="grid_voltage",
+                                  name_suffix="Grid Voltage", **_VOLTAGE),
+    DirectSensorEntityDescription(key="grid_freq", data_section="qpigs", data_key="grid_frequency",
+                                  name_suffix="Grid Frequency", **_FREQUENCY),
+    DirectSensorEntityDescription(key="ac_output_voltage", data_section="qpigs", data_key="ac_output_voltage",
+                                  name_suffix="AC Output Voltage", **_VOLTAGE),
+    DirectSensorEntityDescription(key="ac_output_freq", data_section="qpigs", data_key="ac_output_frequency",
+                                  name_suffix="AC Output Frequency", **_FREQUENCY),
+    DirectSensorEntityDescription(key="output_apparent_power", data_section="qpigs",
+                                  data_key="output_apparent_power", name_suffix="Apparent Power", **_WATT),
+    DirectSensorEntityDescription(key="load_percent", data_section="qpigs", data_key="load_percent",
+                                  name_suffix="Load Percent", device_class=SensorDeviceClass.POWER_FACTOR,
+                                  **_PERCENT),
+    DirectSensorEntityDescription(key="bus_voltage", data_section="qpigs", data_key="bus_voltage",
+                                  name_suffix="Bus Voltage", **_VOLTAGE),
+    DirectSensorEntityDescription(key="scc_batt_voltage", data_section="qpigs", data_key="scc_battery_voltage",
+                                  name_suffix="SCC Battery Voltage", **_VOLTAGE),
+)
+
+
+def _qpiri(data_key: str, preset: dict, name_suffix: str, entity_category=None) -> DirectSensorEntityDescription:
+    if entity_category is not None:
+        preset = {**preset, "entity_category": entity_category}
+    return DirectSensorEntityDescription(key=data_key, data_section="qpiri", data_key=data_key,
+                                         name_suffix=name_suffix, **preset)
+
+
+QPIRI_SENSOR_DESCRIPTIONS: tuple[DirectSensorEntityDescription, ...] = (
+    _qpiri("rated_grid_voltage", _VOLTAGE, "Rated Grid Voltage", EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_input_current", _CURRENT, "Rated Input Current", EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_ac_output_voltage", _VOLTAGE, "Rated AC Output Voltage", EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_output_frequency", _FREQUENCY, "Rated Output Frequency", EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_output_current", _CURRENT, "Rated Output Current", EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_output_apparent_power", _APPARENT_POWER, "Rated Output Apparent Power", EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_output_active_power", _WATT, "Rated Output Active Power", EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_battery_voltage", _VOLTAGE, "Rated Battery Voltage", EntityCategory.DIAGNOSTIC),
+    _qpiri("low_battery_to_ac_bypass_voltage", _VOLTAGE, "Low Battery to AC Bypass Voltage"),
+    _qpiri("shut_down_battery_voltage", _VOLTAGE, "Shut Down Battery Voltage"),
+    _qpiri("bulk_charging_voltage", _VOLTAGE, "Bulk Charging Voltage"),
+    _qpiri("float_charging_voltage", _VOLTAGE, "Float Charging Voltage"),
+    _qpiri("battery_type", _enum(BatteryType), "Battery Type", EntityCategory.DIAGNOSTIC),
+    _qpiri("max_utility_charging_current", _CURRENT, "Max Utility Charging Current"),
+    _qpiri("max_charging_current", _CURRENT, "Max Charging Current"),
+    _qpiri("ac_input_voltage_range", _enum(ACInputVoltageRange), "AC Input Voltage Range"),
+    _qpiri("output_source_priority", _enum(OutputSourcePriority), "Output Source Priority"),
+    _qpiri("charger_source_priority", _enum(ChargerSourcePriority), "Charger Source Priority"),
+    _qpiri("parallel_max_number", _DIAGNOSTIC, "Parallel Max Number", EntityCategory.DIAGNOSTIC),
+    _qpiri("reserved_uu", _DIAGNOSTIC, "Reserved UU", EntityCategory.DIAGNOSTIC),
+    _qpiri("reserved_v", _DIAGNOSTIC, "Reserved V", EntityCategory.DIAGNOSTIC),
+    _qpiri("parallel_mode", _enum(ParallelMode), "Parallel Mode", EntityCategory.DIAGNOSTIC),
+    _qpiri("high_battery_voltage_to_battery_mode", _VOLTAGE, "High Battery Voltage to Battery Mode"),
+    _qpiri("solar_work_condition_in_parallel", _DIAGNOSTIC, "Solar Work Condition In Parallel",
+           EntityCategory.DIAGNOSTIC),
+    _qpiri("solar_max_charging_power_auto_adjust", _DIAGNOSTIC, "Solar Max Charging Power Auto Adjust",
+           EntityCategory.DIAGNOSTIC),
+    _qpiri("rated_battery_capacity", _BATTERY_CAPACITY, "Rated Battery Capacity", EntityCategory.DIAGNOSTIC),
+    _qpiri("reserved_b", _DIAGNOSTIC, "Reserved B", EntityCategory.DIAGNOSTIC),
+    _qpiri("reserved_ccc", _DIAGNOSTIC, "Reserved CCC", EntityCategory.DIAGNOSTIC),
+)
 
 
 def generate_qpiri_sensors(inverter_device, coordinator):
-    sensors = []
-
-    for data_key, (sensor_class, name_suffix, entity_category) in QPIRI_SENSOR_MAPPING.items():
-        sensor = sensor_class(
-            inverter_device=inverter_device,
-            coordinator=coordinator,
-            data_section="qpiri",
-            data_key=data_key,
-            name_suffix=name_suffix,
-        )
+    return [DirectDescribedSensor(inverter_device, coordinator, description)
+            for description in QPIRI_SENSOR_DESCRIPTIONS]
+
 
-        if entity_category is not None:
-            sensor._attr_entity_category = entity_category
-
-        sensors.append(sensor)
-
-    return sensors
-
-
-DIRECT_SENSORS = [
-    DirectPVPowerSensor,
-    DirectPV2PowerSensor,
-    DirectPVVoltageSensor,
-    DirectPV2VoltageSensor,
-    DirectPVInputCurrentSensor,
-    DirectPV2CurrentSensor,
-    DirectBatteryVoltageSensor,
-    DirectBatteryChargingCurrentSensor,
-    DirectBatteryDischargeCurrentSensor,
-    DirectBatteryCapacitySensor,
-    DirectInverterOutputPowerSensor,
-    DirectInverterTemperatureSensor,
-    DirectGridVoltageSensor,
-    DirectGridFrequencySensor,
-    DirectACOutputVoltageSensor,
-    DirectACOutputFrequencySensor,
-    DirectOutputApparentPowerSensor,
-    DirectLoadPercentSensor,
-    DirectBusVoltageSensor,
-    DirectSCCBatteryVoltageSensor,
-]
+def create_direct_sensors(inverter_device, coordinator):
+    return [DirectDescribedSensor(inverter_device, coordinator, description)
+            for description in DIRECT_SENSOR_DESCRIPTIONS]
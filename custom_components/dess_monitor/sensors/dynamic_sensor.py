@@ -5,6 +5,7 @@ from homeassistant.const import EntityCategory, UnitOfPower, UnitOfElectricPoten
     UnitOfElectricCurrent, PERCENTAGE
 from homeassistant.core import callback
 
+from custom_components.dess_monitor.api.helpers import ParamIndex
 from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator
 from custom_components.dess_monitor.hub import InverterDevice
 from custom_components.dess_monitor.sensors.init_sensors import SensorBase
@@ -16,6 +17,47 @@ class DessSensorSource(Enum):
     ENERGY_FLOW = 'energy_flow'
 
 
+def _parse_raw_value(val):
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_prefix(s):
+    return s.split("_", 1)[0] + "_"
+
+
+def _build_raw_values(data, sensor_source: 'DessSensorSource') -> dict:
+    values = {}
+    match sensor_source:
+        case DessSensorSource.PARS_ES:
+            for x in (data.get('pars') or {}).get('parameter', []):
+                values.setdefault(x['par'], _parse_raw_value(x['val']))
+        case DessSensorSource.SP_LAST_DATA:
+            for key, params in ((data.get('last_data') or {}).get('pars') or {}).items():
+                for x in params:
+                    # a raw sensor only looks into the group of its own id prefix
+                    if isinstance(x.get('id'), str) and _get_prefix(x['id']) == key:
+                        values.setdefault(x['id'], _parse_raw_value(x['val']))
+    return values
+
+
+def get_raw_values(data, sensor_source: 'DessSensorSource', index: ParamIndex | None = None) -> dict:
+    """Par id -> parsed value of a payload section, built once per update for all raw sensors.
+
+    The table is cached on the param index of the payload, without one it is built every call.
+    """
+    if index is None:
+        return _build_raw_values(data, sensor_source)
+    tables = index.tables
+    table_key = f"raw_{sensor_source.value}"
+    values = tables.get(table_key)
+    if values is None:
+        values = tables[table_key] = _build_raw_values(data, sensor_source)
+    return values
+
+
 class InverterDynamicSensor(SensorBase):
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
@@ -59,20 +101,6 @@ class InverterDynamicSensor(SensorBase):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        data = self.data
-
-        def get_prefix(s):
-            return s.split("_", 1)[0] + "_"
-
-        match self._sensor_source:
-            case DessSensorSource.PARS_ES:
-                self._attr_native_value = float(
-                    next((x for x in data['pars']['parameter'] if x['par'] == self._sensor_par_id), {'val': '0'})['val']
-                )
-            case DessSensorSource.SP_LAST_DATA:
-                key = get_prefix(self._sensor_par_id)
-                self._attr_native_value = float(
-                    next((x for x in data['last_data']['pars'][key] if x['id'] == self._sensor_par_id), {'val': '0'})[
-                        'val']
-                )
-        self.async_write_ha_state()
+        index = self.coordinator.param_indexes.get(self._inverter_device.inverter_id)
+        self._attr_native_value = get_raw_values(self.data, self._sensor_source, index).get(self._sensor_par_id, 0.0)
+        self._async_write_state_if_changed()
@@ -9,7 +9,7 @@ from homeassistant.util import slugify
 from custom_components.dess_monitor.api.resolvers.data_resolvers import *
 from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator
 from custom_components.dess_monitor.hub import InverterDevice
-from custom_components.dess_monitor.sensors.init_sensors import SensorBase
+from custom_components.dess_monitor.sensors.init_sensors import SensorBase, DessSensorEntityDescription
 
 
 class MyEnergySensor(RestoreSensor, SensorBase):
@@ -25,6 +25,9 @@ class MyEnergySensor(RestoreSensor, SensorBase):
         super().__init__(inverter_device, coordinator)
         self._prev_value = None
         self._prev_value_timestamp = datetime.now()
+        self._prev_sample_time = None
+        # whether _prev_value_timestamp is a datalogger sample time or our clock
+        self._prev_on_sample_clock = False
         self._is_restored_value = False
 
     async def async_added_to_hass(self) -> None:
@@ -39,64 +42,63 @@ class MyEnergySensor(RestoreSensor, SensorBase):
     def available(self) -> bool:
         return self._inverter_device.online and self._inverter_device.hub.online and self._is_restored_value
 
-    def update_energy_value(self, current_value: float):
-        now = datetime.now()
-        elapsed_seconds = int(now.timestamp() - self._prev_value_timestamp.timestamp())
-        if self._prev_value is not None:
-            self._attr_native_value += (elapsed_seconds / 3600) * (self._prev_value + current_value) / 2
+    def update_energy_value(self, current_value: float, sample_time: datetime | None = None):
+        on_sample_clock = sample_time is not None
+        if on_sample_clock:
+            # integrate over the datalogger sample times, a sample is only counted once
+            if self._prev_sample_time is not None and sample_time <= self._prev_sample_time:
+                return
+            now = sample_time
+            self._prev_sample_time = sample_time
+        else:
+            now = datetime.now()
+        # the datalogger clock and ours differ by its skew and time zone, an interval
+        # spanning both is not integrated, the next one starts from this reading
+        if (
+                self._prev_value is not None
+                and self._prev_value_timestamp is not None
+                and self._prev_on_sample_clock == on_sample_clock
+        ):
+            elapsed_seconds = int(now.timestamp() - self._prev_value_timestamp.timestamp())
+            if elapsed_seconds > 0:
+                self._attr_native_value += (elapsed_seconds / 3600) * (self._prev_value + current_value) / 2
         self._prev_value = current_value
         self._prev_value_timestamp = now
-        self.async_write_ha_state()
+        self._prev_on_sample_clock = on_sample_clock
+        self._async_write_state_if_changed()
+
+ENERGY_SENSOR_DESCRIPTIONS: tuple[DessSensorEntityDescription, ...] = (
+    DessSensorEntityDescription(key="pv_in_energy", name_suffix="PV In Energy", resolve_fn=resolve_pv_power),
+    DessSensorEntityDescription(key="pv2_in_energy", name_suffix="PV2 In Energy", resolve_fn=resolve_pv2_power),
+    DessSensorEntityDescription(key="battery_in_energy", name_suffix="Battery In Energy",
+                                resolve_fn=resolve_battery_charging_power),
+    DessSensorEntityDescription(key="battery_out_energy", name_suffix="Battery Out Energy",
+                                resolve_fn=resolve_battery_discharge_power),
+    DessSensorEntityDescription(key="inverter_out_energy", name_suffix="Inverter Out Energy",
+                                resolve_fn=resolve_active_load_power),
+    DessSensorEntityDescription(key="inverter_in_energy", name_suffix="Inverter In Energy",
+                                resolve_fn=resolve_grid_in_power),
+)
 
 
 class FunctionBasedEnergySensor(MyEnergySensor):
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator, unique_suffix: str,
-                 name_suffix: str, resolve_function):
+    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator,
+                 description: DessSensorEntityDescription):
         super().__init__(inverter_device, coordinator)
-        self._attr_unique_id = f"{self._inverter_device.inverter_id}_{unique_suffix}"
-        self._attr_name = f"{self._inverter_device.name} {name_suffix}"
-        self._resolve_function = resolve_function
+        self.entity_description = description
+        self._attr_unique_id = f"{self._inverter_device.inverter_id}_{description.key}"
+        self._attr_name = f"{self._inverter_device.name} {description.name_suffix}"
+        self._resolve_fn = description.resolve_fn
 
     @callback
     def _handle_coordinator_update(self) -> None:
+        if self._inverter_device.stale:
+            # a restored or late snapshot, integrating over its sample would span the gap
+            return
         data = self.data
         device_data = self._inverter_device.device_data
-        current_value = self._resolve_function(data, device_data)
-        self.update_energy_value(current_value)
-
-
-class PVEnergySensor(FunctionBasedEnergySensor):
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
-        super().__init__(inverter_device, coordinator, "pv_in_energy", "PV In Energy", resolve_pv_power)
-
-
-class PV2EnergySensor(FunctionBasedEnergySensor):
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
-        super().__init__(inverter_device, coordinator, "pv2_in_energy", "PV2 In Energy", resolve_pv2_power)
-
-
-class BatteryInEnergySensor(FunctionBasedEnergySensor):
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
-        super().__init__(inverter_device, coordinator, "battery_in_energy", "Battery In Energy",
-                         resolve_battery_charging_power)
-
-
-class BatteryOutEnergySensor(FunctionBasedEnergySensor):
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
-        super().__init__(inverter_device, coordinator, "battery_out_energy", "Battery Out Energy",
-                         resolve_battery_discharge_power)
-
-
-class InverterOutEnergySensor(FunctionBasedEnergySensor):
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
-        super().__init__(inverter_device, coordinator, "inverter_out_energy", "Inverter Out Energy",
-                         resolve_active_load_power)
-
-
-class InverterInEnergySensor(FunctionBasedEnergySensor):
-    def __init__(self, inverter_device: InverterDevice, coordinator: MainCoordinator):
-        super().__init__(inverter_device, coordinator, "inverter_in_energy", "Inverter In Energy",
-                         resolve_grid_in_power)
+        current_value = resolved_value(self._resolve_fn, data, device_data)
+        self.update_energy_value(current_value, resolve_sample_time(data))
 
 
 # class TypedSensorBase(SensorBase):
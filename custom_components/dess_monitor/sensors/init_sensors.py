@@ -1,4 +1,9 @@
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass, \
+    SensorEntityDescription
 from homeassistant.const import UnitOfElectricPotential, UnitOfPower, PERCENTAGE, UnitOfFrequency, \
     UnitOfElectricCurrent, EntityCategory, UnitOfTemperature, UnitOfEnergy
 from homeassistant.core import callback
@@ -9,15 +14,17 @@ from custom_components.dess_monitor.api.resolvers.data_resolvers import *
 from custom_components.dess_monitor.const import DOMAIN
 from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator
 from custom_components.dess_monitor.hub import InverterDevice
+from custom_components.dess_monitor.sensors.change_aware import ChangeAwareStateMixin
 
 
-class SensorBase(CoordinatorEntity, SensorEntity):
+class SensorBase(ChangeAwareStateMixin, CoordinatorEntity, SensorEntity):
     def __init__(
             self,
             inverter_device: InverterDevice,
             coordinator: MainCoordinator
     ):
-        super().__init__(coordinator)
+        # only woken up when the data of this device changed
+        super().__init__(coordinator, context=inverter_device.inverter_id)
         self._inverter_device = inverter_device
 
     @property
@@ -45,237 +52,222 @@ class SensorBase(CoordinatorEntity, SensorEntity):
         return self.coordinator.data[self._inverter_device.inverter_id]
 
 
+@dataclass(frozen=True, kw_only=True)
+class DessSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor whose value is resolved from the main coordinator data.
+
+    `key` is the unique id suffix. slots=True is left out on purpose, the
+    FrozenOrThawed metaclass of EntityDescription does not support it.
+    """
+
+    name_suffix: str
+    resolve_fn: Callable[[dict, dict], Any]
+
+
+def _resolve_energy_total(data, _):
+    return data['device']['energyTotal']
+
+
+_STATUS_OPTIONS = ['NORMAL', 'OFFLINE', 'FAULT', 'STANDBY', 'WARNING']
+
+
+def _resolve_status(data, _):
+    return _STATUS_OPTIONS[data['device']['status']]
+
+
+SENSOR_DESCRIPTIONS: tuple[DessSensorEntityDescription, ...] = (
+    # Grid sensors
+    DessSensorEntityDescription(
+        key="grid_in_voltage", name_suffix="Grid In Voltage", resolve_fn=resolve_grid_input_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=0,
+    ),
+    DessSensorEntityDescription(
+        key="grid_in_frequency", name_suffix="Grid In Frequency", resolve_fn=resolve_grid_frequency,
+        device_class=SensorDeviceClass.FREQUENCY, native_unit_of_measurement=UnitOfFrequency.HERTZ,
+        suggested_display_precision=2, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="grid_in_power", name_suffix="Grid In Power", resolve_fn=resolve_grid_in_power,
+        device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0,
+    ),
+
+    # PV sensors
+    DessSensorEntityDescription(
+        key="pv_power", name_suffix="PV Power", resolve_fn=resolve_pv_power,
+        device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0,
+    ),
+    DessSensorEntityDescription(
+        key="pv2_power", name_suffix="PV2 Power", resolve_fn=resolve_pv2_power,
+        device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0,
+    ),
+    # deprecated
+    DessSensorEntityDescription(
+        key="pv_total_energy", name_suffix="PV Total Energy", resolve_fn=_resolve_energy_total,
+        device_class=SensorDeviceClass.ENERGY, native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        suggested_display_precision=3, state_class=SensorStateClass.TOTAL,
+    ),
+    DessSensorEntityDescription(
+        key="pv_voltage", name_suffix="PV Voltage", resolve_fn=resolve_pv_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=0,
+    ),
+    DessSensorEntityDescription(
+        key="pv2_voltage", name_suffix="PV2 Voltage", resolve_fn=resolve_pv2_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=0,
+    ),
+
+    # Battery sensors
+    DessSensorEntityDescription(
+        key="battery", name_suffix="Battery Voltage", resolve_fn=resolve_battery_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=1,
+    ),
+    DessSensorEntityDescription(
+        key="battery_charge_current", name_suffix="Battery Charge Current",
+        resolve_fn=resolve_battery_charging_current,
+        device_class=SensorDeviceClass.CURRENT, native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        suggested_display_precision=1,
+    ),
+    DessSensorEntityDescription(
+        key="battery_charge_power", name_suffix="Battery Charge Power", resolve_fn=resolve_battery_charging_power,
+        device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0,
+    ),
+    DessSensorEntityDescription(
+        key="battery_discharge_current", name_suffix="Battery Discharge Current",
+        resolve_fn=resolve_battery_discharge_current,
+        device_class=SensorDeviceClass.CURRENT, native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        suggested_display_precision=1,
+    ),
+    DessSensorEntityDescription(
+        key="battery_discharge_power", name_suffix="Battery Discharge Power",
+        resolve_fn=resolve_battery_discharge_power,
+        device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0,
+    ),
+    DessSensorEntityDescription(
+        key="battery_capacity", name_suffix="Battery Capacity", resolve_fn=resolve_battery_capacity,
+        device_class=SensorDeviceClass.BATTERY, native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=0,
+    ),
+
+    # Inverter sensors
+    DessSensorEntityDescription(
+        key="status", name_suffix="Status", resolve_fn=_resolve_status,
+        device_class=SensorDeviceClass.ENUM, suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="output_priority", name_suffix="Output Priority", resolve_fn=resolve_output_priority,
+        device_class=SensorDeviceClass.ENUM, suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="inverter_out_voltage", name_suffix="Inverter Out Voltage", resolve_fn=resolve_grid_output_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=0,
+    ),
+    DessSensorEntityDescription(
+        key="inverter_out_power", name_suffix="Inverter Out Power", resolve_fn=resolve_active_load_power,
+        device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0,
+    ),
+    DessSensorEntityDescription(
+        key="inverter_dc_temperature", name_suffix="Inverter DC Temperature",
+        resolve_fn=resolve_dc_module_temperature,
+        device_class=SensorDeviceClass.TEMPERATURE, native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="inverter_inv_temperature", name_suffix="Inverter INV Temperature", resolve_fn=resolve_inv_temperature,
+        device_class=SensorDeviceClass.TEMPERATURE, native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="inverter_load", name_suffix="Inverter Load", resolve_fn=resolve_active_load_percentage,
+        device_class=SensorDeviceClass.POWER_FACTOR, native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=0,
+    ),
+
+    # Inverter config sensors
+    DessSensorEntityDescription(
+        key="charge_priority", name_suffix="Charge Priority", resolve_fn=resolve_charge_priority,
+        device_class=SensorDeviceClass.ENUM, suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="config_bt_utility_charge_current", name_suffix="Battery Utility Charge Current",
+        resolve_fn=resolve_bt_utility_charge,
+        device_class=SensorDeviceClass.CURRENT, native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="config_bt_total_charge_current", name_suffix="Battery Total Charge Current",
+        resolve_fn=resolve_bt_total_charge_current,
+        device_class=SensorDeviceClass.CURRENT, native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="config_bt_cutoff_voltage", name_suffix="Battery Cutoff Voltage", resolve_fn=resolve_bt_cutoff_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="nominal_out_power", name_suffix="Nominal Out Power", resolve_fn=resolve_sy_nominal_out_power,
+        device_class=SensorDeviceClass.POWER, native_unit_of_measurement=UnitOfPower.WATT,
+        suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="rated_battery_voltage", name_suffix="Rated Battery Voltage",
+        resolve_fn=resolve_sy_rated_battery_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=0, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="comeback_utility_voltage", name_suffix="Comeback Utility",
+        resolve_fn=resolve_bt_comeback_utility_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=1, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    DessSensorEntityDescription(
+        key="comeback_battery_voltage", name_suffix="Comeback Battery",
+        resolve_fn=resolve_bt_comeback_battery_voltage,
+        device_class=SensorDeviceClass.VOLTAGE, native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        suggested_display_precision=1, entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+)
+
+
 class ValueResolvingSensor(SensorBase):
+    entity_description: DessSensorEntityDescription
+
     def __init__(
             self,
             inverter_device: InverterDevice,
             coordinator: MainCoordinator,
-            name_suffix: str,
-            unique_suffix: str,
-            resolve_fn,
-            device_class: SensorDeviceClass,
-            unit,
-            precision: int = 0,
-            entity_category=None,
-            state_class=None
+            description: DessSensorEntityDescription,
     ):
         super().__init__(
             inverter_device=inverter_device,
             coordinator=coordinator
         )
-        self._attr_name = f"{inverter_device.name} {name_suffix}"
-        self._attr_unique_id = f"{inverter_device.inverter_id}_{unique_suffix}"
-        self._resolve_fn = resolve_fn
-        self._attr_device_class = device_class
-        self._attr_native_unit_of_measurement = unit
-        self._attr_unit_of_measurement = unit
-        self._attr_suggested_display_precision = precision
-        self._sensor_option_display_precision = precision
-
-        if entity_category is not None:
-            self._attr_entity_category = entity_category
-
-        if state_class is not None:
-            self._attr_state_class = state_class
+        self.entity_description = description
+        self._attr_name = f"{inverter_device.name} {description.name_suffix}"
+        self._attr_unique_id = f"{inverter_device.inverter_id}_{description.key}"
+        self._resolve_fn = description.resolve_fn
+        self._attr_unit_of_measurement = description.native_unit_of_measurement
+        self._sensor_option_display_precision = description.suggested_display_precision
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        self._attr_native_value = self._resolve_fn(
+        self._attr_native_value = resolved_value(
+            self._resolve_fn,
             self.data,
             self._inverter_device.device_data
         )
-        self.async_write_ha_state()
-
-
-class BatteryVoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Voltage", "battery", resolve_battery_voltage,
-                         SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT, 1)
-
-
-class PVPowerSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "PV Power", "pv_power", resolve_pv_power,
-                         SensorDeviceClass.POWER, UnitOfPower.WATT)
-
-
-class PVVoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "PV Voltage", "pv_voltage", resolve_pv_voltage,
-                         SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT)
-
-
-class PV2PowerSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "PV2 Power", "pv2_power", resolve_pv2_power,
-                         SensorDeviceClass.POWER, UnitOfPower.WATT)
-
-
-class PV2VoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "PV2 Voltage", "pv2_voltage", resolve_pv2_voltage,
-                         SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT)
-
-
-class GridInputVoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Grid In Voltage", "grid_in_voltage", resolve_grid_input_voltage,
-                         SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT)
-
-
-class InverterOutputVoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Inverter Out Voltage", "inverter_out_voltage",
-                         resolve_grid_output_voltage, SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT)
-
-
-class InverterOutputPowerSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Inverter Out Power", "inverter_out_power",
-                         resolve_active_load_power, SensorDeviceClass.POWER, UnitOfPower.WATT)
-
-
-class InverterLoadSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Inverter Load", "inverter_load", resolve_active_load_percentage,
-                         SensorDeviceClass.POWER_FACTOR, PERCENTAGE)
-
-
-class BatteryCapacitySensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Capacity", "battery_capacity", resolve_battery_capacity,
-                         SensorDeviceClass.BATTERY, PERCENTAGE)
-
-
-class GridInputPowerSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Grid In Power", "grid_in_power", resolve_grid_in_power,
-                         SensorDeviceClass.POWER, UnitOfPower.WATT)
-
-
-class GridInputFrequencySensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Grid In Frequency", "grid_in_frequency", resolve_grid_frequency,
-                         SensorDeviceClass.FREQUENCY, UnitOfFrequency.HERTZ, 2, EntityCategory.DIAGNOSTIC)
-
-
-class BatteryChargeSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Charge Current", "battery_charge_current",
-                         resolve_battery_charging_current, SensorDeviceClass.CURRENT, UnitOfElectricCurrent.AMPERE, 1)
-
-
-class BatteryDischargeSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Discharge Current", "battery_discharge_current",
-                         resolve_battery_discharge_current, SensorDeviceClass.CURRENT, UnitOfElectricCurrent.AMPERE, 1)
-
-
-class BatteryChargePowerSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Charge Power", "battery_charge_power",
-                         resolve_battery_charging_power, SensorDeviceClass.POWER, UnitOfPower.WATT)
-
-
-class BatteryDischargePowerSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Discharge Power", "battery_discharge_power",
-                         resolve_battery_discharge_power, SensorDeviceClass.POWER, UnitOfPower.WATT)
-
-
-class InverterDCTemperatureSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Inverter DC Temperature", "inverter_dc_temperature",
-                         resolve_dc_module_temperature, SensorDeviceClass.TEMPERATURE, UnitOfTemperature.CELSIUS, 0,
-                         EntityCategory.DIAGNOSTIC)
-
-
-class InverterInvTemperatureSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Inverter INV Temperature", "inverter_inv_temperature",
-                         resolve_inv_temperature, SensorDeviceClass.TEMPERATURE, UnitOfTemperature.CELSIUS, 0,
-                         EntityCategory.DIAGNOSTIC)
-
-
-class PVPowerTotalSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "PV Total Energy", "pv_total_energy",
-                         lambda data, _: data['device']['energyTotal'], SensorDeviceClass.ENERGY,
-                         UnitOfEnergy.KILO_WATT_HOUR, 3, None, SensorStateClass.TOTAL)
-
-
-class InverterStatusSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        options = ['NORMAL', 'OFFLINE', 'FAULT', 'STANDBY', 'WARNING']
-        super().__init__(inverter_device, coordinator, "Status", "status",
-                         lambda data, _: options[data['device']['status']], SensorDeviceClass.ENUM, None,
-                         entity_category=EntityCategory.DIAGNOSTIC)
-
-
-class InverterOutputPrioritySensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Output Priority", "output_priority", resolve_output_priority,
-                         SensorDeviceClass.ENUM, None, entity_category=EntityCategory.DIAGNOSTIC)
-
-
-class InverterChargePrioritySensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Charge Priority", "charge_priority", resolve_charge_priority,
-                         SensorDeviceClass.ENUM, None, entity_category=EntityCategory.DIAGNOSTIC)
-
-
-class InverterConfigBTUtilityChargeSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Utility Charge Current",
-                         "config_bt_utility_charge_current", resolve_bt_utility_charge, SensorDeviceClass.CURRENT,
-                         UnitOfElectricCurrent.AMPERE, entity_category=EntityCategory.DIAGNOSTIC)
-
-
-class InverterConfigBTTotalChargeSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Total Charge Current", "config_bt_total_charge_current",
-                         resolve_bt_total_charge_current, SensorDeviceClass.CURRENT, UnitOfElectricCurrent.AMPERE,
-                         entity_category=EntityCategory.DIAGNOSTIC)
-
-
-class InverterConfigBTCutoffSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Battery Cutoff Voltage", "config_bt_cutoff_voltage",
-                         resolve_bt_cutoff_voltage, SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT,
-                         entity_category=EntityCategory.DIAGNOSTIC)
-
-
-class InverterNominalOutPowerSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Nominal Out Power", "nominal_out_power",
-                         resolve_sy_nominal_out_power, SensorDeviceClass.POWER, UnitOfPower.WATT, 0,
-                         EntityCategory.DIAGNOSTIC)
-
-
-class InverterRatedBatteryVoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Rated Battery Voltage", "rated_battery_voltage",
-                         resolve_sy_rated_battery_voltage, SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT, 0,
-                         EntityCategory.DIAGNOSTIC)
-
-
-class InverterComebackUtilityVoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(inverter_device, coordinator, "Comeback Utility", "comeback_utility_voltage",
-                         resolve_bt_comeback_utility_voltage, SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT,
-                         1, EntityCategory.DIAGNOSTIC)
-
-
-class InverterComebackBatteryVoltageSensor(ValueResolvingSensor):
-    def __init__(self, inverter_device, coordinator):
-        super().__init__(
-            inverter_device,
-            coordinator,
-            "Comeback Battery",
-            "comeback_battery_voltage",
-            resolve_bt_comeback_battery_voltage,
-            SensorDeviceClass.VOLTAGE,
-            UnitOfElectricPotential.VOLT,
-            1,
-            EntityCategory.DIAGNOSTIC
-        )
+        self._async_write_state_if_changed()
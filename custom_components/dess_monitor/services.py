@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+
+from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators.burst import BURST_MIN_INTERVAL, BURST_MAX_INTERVAL, \
+    BURST_MAX_DURATION, BURST_MAX_COMMANDS
+
+SERVICE_START_BURST = "start_burst"
+SERVICE_STOP_BURST = "stop_burst"
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_INTERVAL = "interval"
+ATTR_DURATION = "duration"
+ATTR_MAX_COMMANDS = "max_commands"
+
+START_BURST_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_INTERVAL, default=3): vol.All(
+        vol.Coerce(float), vol.Range(min=BURST_MIN_INTERVAL, max=BURST_MAX_INTERVAL)
+    ),
+    vol.Optional(ATTR_DURATION, default=180): vol.All(vol.Coerce(int), vol.Range(min=10, max=BURST_MAX_DURATION)),
+    vol.Optional(ATTR_MAX_COMMANDS, default=100): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=BURST_MAX_COMMANDS)
+    ),
+})
+STOP_BURST_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+})
+
+
+def _resolve_devices(hass: HomeAssistant, device_ids):
+    """Yield (hub, inverter device) for every selected device registry entry."""
+    registry = dr.async_get(hass)
+    for device_id in device_ids:
+        device = registry.async_get(device_id)
+        pn = next((value for domain, value in device.identifiers if domain == DOMAIN), None) if device else None
+        if pn is None:
+            raise ServiceValidationError(f"{device_id} is not a DESS Monitor device")
+        for entry_id in device.config_entries:
+            entry = hass.config_entries.async_get_entry(entry_id)
+            if entry is None or entry.domain != DOMAIN or entry.state is not ConfigEntryState.LOADED:
+                continue
+            hub = entry.runtime_data
+            item = next((item for item in hub.items if item.inverter_id == pn), None)
+            if item is not None:
+                yield hub, item
+                break
+        else:
+            raise ServiceValidationError(f"Device {pn} is not loaded")
+
+
+def async_setup_services(hass: HomeAssistant):
+    async def start_burst(call: ServiceCall):
+        for hub, item in list(_resolve_devices(hass, call.data[ATTR_DEVICE_ID])):
+            if hub.burst is None:
+                raise ServiceValidationError(
+                    f"Burst mode of {item.inverter_id} needs the direct request protocol option"
+                )
+            hub.burst.start(
+                item.device_data,
+                call.data[ATTR_INTERVAL],
+                call.data[ATTR_DURATION],
+                call.data[ATTR_MAX_COMMANDS],
+            )
+
+    async def stop_burst(call: ServiceCall):
+        for hub, item in _resolve_devices(hass, call.data[ATTR_DEVICE_ID]):
+            if hub.burst is not None:
+                hub.burst.stop(item.inverter_id)
+
+    hass.services.async_register(DOMAIN, SERVICE_START_BURST, start_burst, schema=START_BURST_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_BURST, stop_burst, schema=STOP_BURST_SCHEMA)
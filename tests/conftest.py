@@ -0,0 +1,38 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# the integration is imported as custom_components.dess_monitor, like Home Assistant does
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+DEVCODES_DIR = Path(__file__).resolve().parent / "devcodes"
+DEVCODES = ("2341", "2376", "2428")
+
+
+def load_device_payload(devcode: str) -> dict:
+    """Main coordinator payload of a devcode built from the captured cloud responses."""
+
+    def load(name):
+        path = DEVCODES_DIR / devcode / name
+        if not path.exists():
+            return {}
+        with open(path) as f:
+            return json.load(f)["dat"]
+
+    return {
+        "last_data": load("querySPDeviceLastData.json"),
+        "energy_flow": load("webQueryDeviceEnergyFlowEs.json"),
+        "pars": load("queryDeviceParsEs.json"),
+        "device": {"devcode": int(devcode), "pn": f"TEST{devcode}"},
+        "ctrl_fields": load("queryDeviceCtrlField.json").get("field", []),
+        "device_extra": {"output_priority": "SBU"},
+    }
+
+
+@pytest.fixture(params=DEVCODES)
+def device_payload(request) -> dict:
+    return load_device_payload(request.param)
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+from custom_components.dess_monitor.coordinators.cadence import MIN_PERIOD, OVERDUE_RETRY, SCHEDULE_MARGIN, \
+    UploadCadence
+
+START = 1_700_000_000.0
+PERIOD = 300
+
+
+def sample(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def learned(delays=(25, 20, 40)) -> UploadCadence:
+    """Cadence that saw one upload every PERIOD seconds, fetched `delay` seconds after each."""
+    cadence = UploadCadence()
+    for i, delay in enumerate(delays):
+        assert cadence.observe(sample(START + i * PERIOD), START + i * PERIOD + delay)
+    return cadence
+
+
+def test_unknown_cadence_is_always_due():
+    cadence = UploadCadence()
+    assert cadence.next_fetch_at() is None
+    assert cadence.is_due(START)
+
+    cadence.observe(sample(START), START + 20)
+    assert cadence.period is None
+    assert cadence.offset == 20
+    assert cadence.is_due(START + 21)
+    assert cadence.as_dict(START + 21) == {'period_s': None, 'offset_s': 20, 'next_fetch_in_s': None, 'samples': 1}
+
+
+def test_period_is_the_median_interval():
+    cadence = UploadCadence()
+    for timestamp in (START, START + 300, START + 600, START + 1500, START + 1800):
+        cadence.observe(sample(timestamp), timestamp + 20)
+    # intervals 300, 300, 900 (a missed upload), 300
+    assert cadence.period == 300
+
+
+def test_repeated_and_jitter_samples_are_ignored():
+    cadence = UploadCadence()
+    assert cadence.observe(sample(START), START + 20)
+    assert not cadence.observe(sample(START), START + 50)
+    assert not cadence.observe(None, START + 60)
+    assert cadence.observe(sample(START + MIN_PERIOD - 1), START + 70)
+    assert cadence.period is None
+    assert cadence.observe(sample(START + PERIOD), START + PERIOD + 20)
+    assert cadence.period == PERIOD - MIN_PERIOD + 1
+
+
+def test_offset_is_the_smallest_delay():
+    assert learned().offset == 20
+
+
+def test_next_fetch_follows_the_last_sample():
+    cadence = learned()
+    last_sample = START + 2 * PERIOD
+    expected = last_sample + PERIOD + 20 + SCHEDULE_MARGIN
+    assert cadence.next_fetch_at() == expected
+    assert not cadence.is_due(expected - 1)
+    assert cadence.is_due(expected)
+    assert cadence.as_dict(expected - 100)['next_fetch_in_s'] == 100
+
+
+def test_late_upload_is_retried_shortly():
+    cadence = learned()
+    expected = cadence.next_fetch_at()
+    # fetched on time, the datalogger has not uploaded yet
+    cadence.observe(sample(START + 2 * PERIOD), expected + 5)
+    assert cadence.next_fetch_at() == expected + 5 + OVERDUE_RETRY
+
+
+def test_missed_upload_waits_for_the_next_slot():
+    cadence = learned()
+    expected = cadence.next_fetch_at()
+    cadence.observe(sample(START + 2 * PERIOD), expected + PERIOD * 0.6)
+    assert cadence.next_fetch_at() == expected + PERIOD
+
+    cadence.observe(sample(START + 2 * PERIOD), expected + PERIOD * 2.5)
+    assert cadence.next_fetch_at() == expected + 3 * PERIOD
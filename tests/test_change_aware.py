@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from homeassistant.const import UnitOfPower
+
+from custom_components.dess_monitor.sensors import change_aware
+from custom_components.dess_monitor.sensors.change_aware import HEARTBEAT_INTERVAL, MAX_SILENCE, \
+    ChangeAwareStateMixin
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Entity:
+    async def async_added_to_hass(self):
+        self.added = True
+
+
+class Sensor(ChangeAwareStateMixin, Entity):
+    native_unit_of_measurement = UnitOfPower.WATT
+    suggested_display_precision = 0
+
+    def __init__(self):
+        self.hass = None
+        self.available = True
+        self.native_value = 1000
+        self.writes = []
+        self.on_remove = []
+
+    def async_write_ha_state(self):
+        self.writes.append(self.native_value)
+
+    def async_on_remove(self, func):
+        self.on_remove.append(func)
+
+    def handle_coordinator_update(self, value):
+        self.native_value = value
+        self._async_write_state_if_changed()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(change_aware, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    timers = []
+
+    def track_time_interval(hass, action, interval):
+        timers.append((action, interval))
+        return lambda: None
+
+    monkeypatch.setattr(change_aware, "async_track_time_interval", track_time_interval)
+    return timers
+
+
+def test_deadband_suppresses_small_changes(clock):
+    sensor = Sensor()
+    sensor.handle_coordinator_update(1000)
+    sensor.handle_coordinator_update(1003)
+    sensor.handle_coordinator_update(1010)
+    assert sensor.writes == [1000, 1010]
+
+
+def test_held_back_value_is_written_without_coordinator_updates(clock, timers):
+    sensor = Sensor()
+    asyncio.run(sensor.async_added_to_hass())
+    assert sensor.added
+    [(heartbeat, interval)] = timers
+    assert interval == HEARTBEAT_INTERVAL
+    assert len(sensor.on_remove) == 1
+
+    sensor.handle_coordinator_update(1000)
+    # the last change is inside the deadband, then the device data stays the same
+    # and the coordinator does not call the entity any more
+    sensor.handle_coordinator_update(1003)
+    assert sensor.writes == [1000]
+
+    clock.now += MAX_SILENCE - 1
+    heartbeat()
+    assert sensor.writes == [1000]
+
+    clock.now += 1
+    heartbeat()
+    assert sensor.writes == [1000, 1003]
+
+
+def test_heartbeat_does_not_rewrite_an_unchanged_state(clock, timers):
+    sensor = Sensor()
+    asyncio.run(sensor.async_added_to_hass())
+    [(heartbeat, _)] = timers
+    heartbeat()
+    assert sensor.writes == []
+
+    sensor.handle_coordinator_update(1000)
+    clock.now += 2 * MAX_SILENCE
+    heartbeat()
+    assert sensor.writes == [1000]
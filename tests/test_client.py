@@ -0,0 +1,57 @@
+import asyncio
+
+from custom_components.dess_monitor.api.client import ACCEPT_ENCODING, DessClient
+
+
+class Response:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return {"err": 0}
+
+
+class Session:
+    """Session handed in by Home Assistant."""
+
+    closed = False
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append((url, headers))
+        return Response()
+
+    async def close(self):
+        self.closed = True
+
+
+def test_handed_in_session_is_used_and_not_closed():
+    async def scenario():
+        session = Session()
+        client = DessClient(session)
+        assert await client.get_json("https://example.invalid/api", {"X-Test": "1"}) == {"err": 0}
+        await client.close()
+        assert await client.get_json("https://example.invalid/api") == {"err": 0}
+        return session
+
+    session = asyncio.run(scenario())
+    assert not session.closed
+    assert session.requests[0] == (
+        "https://example.invalid/api", {"Accept-Encoding": ACCEPT_ENCODING, "X-Test": "1"}
+    )
+    assert len(session.requests) == 2
+
+
+def test_own_session_is_closed():
+    async def scenario():
+        async with DessClient() as client:
+            session = await client._get_session()
+            assert await client._get_session() is session
+        return session
+
+    assert asyncio.run(scenario()).closed
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from custom_components.dess_monitor.coordinators.command_queue import MAX_COMMAND_TIMEOUT, MIN_COMMAND_TIMEOUT, \
+    PRIORITY_BURST, PRIORITY_INTERACTIVE, PRIORITY_POLL, SWEEP_BUDGET, SWEEP_COMMANDS, CommandLatency, \
+    DirectCommandQueue
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Device:
+    """Datalogger stub recording the commands in the order they ran."""
+
+    def __init__(self):
+        self.log = []
+        self.active = 0
+        self.max_active = 0
+
+    def request(self, name, delay=0.01):
+        async def send():
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            try:
+                await asyncio.sleep(delay)
+                self.log.append(name)
+                return name
+            finally:
+                self.active -= 1
+
+        return send
+
+
+async def start_blocked(queue, device, pn="pn"):
+    """Occupy the collector so the following commands have to queue."""
+    task = asyncio.create_task(queue.run(pn, device.request("first", 0.05)))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_commands_of_a_collector_run_one_at_a_time():
+    async def scenario():
+        queue = DirectCommandQueue()
+        device = Device()
+        results = await asyncio.gather(*(queue.run("pn", device.request(i)) for i in range(5)))
+        return device, results
+
+    device, results = run(scenario())
+    assert results == [0, 1, 2, 3, 4]
+    assert device.max_active == 1
+
+
+def test_collectors_run_in_parallel():
+    async def scenario():
+        queue = DirectCommandQueue()
+        device = Device()
+        await asyncio.gather(*(queue.run(pn, device.request(pn, 0.05)) for pn in ("a", "b", "c")))
+        return device
+
+    assert run(scenario()).max_active == 3
+
+
+def test_waiters_run_by_priority_then_fifo():
+    async def scenario():
+        queue = DirectCommandQueue()
+        device = Device()
+        first = await start_blocked(queue, device)
+        waiting = [
+            queue.run("pn", device.request("poll 1"), PRIORITY_POLL),
+            queue.run("pn", device.request("burst"), PRIORITY_BURST),
+            queue.run("pn", device.request("poll 2"), PRIORITY_POLL),
+            queue.run("pn", device.request("interactive"), PRIORITY_INTERACTIVE),
+        ]
+        await asyncio.gather(first, *waiting)
+        return device.log
+
+    assert run(scenario()) == ["first", "interactive", "burst", "poll 1", "poll 2"]
+
+
+def test_cancelled_waiter_does_not_hold_the_collector():
+    async def scenario():
+        queue = DirectCommandQueue()
+        device = Device()
+        first = await start_blocked(queue, device)
+        cancelled = asyncio.create_task(queue.run("pn", device.request("cancelled"), PRIORITY_INTERACTIVE))
+        following = asyncio.create_task(queue.run("pn", device.request("following")))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(first, following)
+        assert queue.as_dict("pn")["queued"] == 0
+        # the collector is free again
+        await asyncio.wait_for(queue.run("pn", device.request("last")), 1)
+        return device.log
+
+    assert run(scenario()) == ["first", "following", "last"]
+
+
+def test_failed_command_releases_the_collector():
+    async def scenario():
+        queue = DirectCommandQueue()
+
+        async def fail():
+            raise ValueError
+
+        with pytest.raises(ValueError):
+            await queue.run("pn", fail)
+        return await asyncio.wait_for(queue.run("pn", Device().request("next")), 1)
+
+    assert run(scenario()) == "next"
+
+
+def test_timeout_bounds_follow_the_sweep_budget():
+    assert MAX_COMMAND_TIMEOUT * SWEEP_COMMANDS <= SWEEP_BUDGET
+    assert MIN_COMMAND_TIMEOUT < MAX_COMMAND_TIMEOUT
+
+
+def test_latency_estimator():
+    latency = CommandLatency()
+    assert latency.timeout == MAX_COMMAND_TIMEOUT
+
+    for _ in range(20):
+        latency.observe(0.5)
+    assert latency.srtt == pytest.approx(0.5, abs=0.01)
+    assert latency.timeout == MIN_COMMAND_TIMEOUT
+
+    latency.backoff()
+    assert latency.timeout == 2 * MIN_COMMAND_TIMEOUT
+    for _ in range(5):
+        latency.backoff()
+    assert latency.timeout == MAX_COMMAND_TIMEOUT
+
+    for _ in range(5):
+        latency.observe(60)
+    assert latency.timeout == MAX_COMMAND_TIMEOUT
+
+
+def test_deadline_cuts_a_command_without_backoff():
+    async def scenario():
+        queue = DirectCommandQueue()
+        loop = asyncio.get_running_loop()
+        for _ in range(20):
+            queue.collector("pn").latency.observe(0.5)
+        with pytest.raises(TimeoutError):
+            await queue.run("pn", Device().request("slow", 1), deadline=loop.time() + 0.05)
+        return queue.collector("pn")
+
+    collector = run(scenario())
+    assert collector.timeouts == 1
+    # the deadline, not the collector, was too short
+    assert collector.latency.timeout == MIN_COMMAND_TIMEOUT
+
+
+def test_deadline_bounds_the_wait_for_the_turn():
+    async def scenario():
+        queue = DirectCommandQueue()
+        device = Device()
+        loop = asyncio.get_running_loop()
+        blocker = asyncio.create_task(queue.run("pn", device.request("blocker", 0.2)))
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await queue.run("pn", device.request("late"), deadline=loop.time() + 0.05)
+        await blocker
+        # the expired waiter left the queue, the next command runs right away
+        await asyncio.wait_for(queue.run("pn", device.request("next")), 1)
+        return device.log
+
+    assert run(scenario()) == ["blocker", "next"]
+
+
+def test_expired_deadline_does_not_send():
+    async def scenario():
+        queue = DirectCommandQueue()
+        device = Device()
+        loop = asyncio.get_running_loop()
+        with pytest.raises(TimeoutError):
+            await queue.run("pn", device.request("expired"), deadline=loop.time() - 1)
+        return device.log
+
+    assert run(scenario()) == []
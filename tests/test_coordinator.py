@@ -0,0 +1,162 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+from types import MappingProxyType, SimpleNamespace
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.dess_monitor.const import DOMAIN
+from custom_components.dess_monitor.coordinators import coordinator as coordinator_module
+from custom_components.dess_monitor.coordinators import direct_coordinator as direct_coordinator_module
+from custom_components.dess_monitor.coordinators.coordinator import MainCoordinator
+from custom_components.dess_monitor.coordinators.direct_coordinator import DirectCoordinator
+from custom_components.dess_monitor.coordinators.section_cache import ACCOUNT_KEY
+
+START = 1_700_000_000.0
+PERIOD = 300
+# upload phase of each datalogger, the two devices upload half a period apart
+PHASES = {"A": 0, "B": PERIOD / 2}
+AUTH = {"token": "token", "secret": "secret"}
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = START
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeCloud:
+    """Cloud API whose dataloggers upload a sample every PERIOD seconds at their phase."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = Counter()
+
+    def sample_time(self, pn):
+        phase = PHASES[pn]
+        return (self.clock.now - phase) // PERIOD * PERIOD + phase
+
+    async def get_devices(self, token, secret, params=None, client=None):
+        self.calls["devices"] += 1
+        return [{"pn": pn, "devcode": 2341, "devaddr": 1, "sn": pn, "uid": pn, "status": 0} for pn in PHASES]
+
+    async def get_device_last_data(self, token, secret, device, client=None):
+        pn = device["pn"]
+        self.calls[("last_data", pn)] += 1
+        gts = datetime.fromtimestamp(self.sample_time(pn)).strftime("%Y-%m-%d %H:%M:%S")
+        return {"gts": gts, "pars": {}}
+
+    async def get_device_energy_flow(self, token, secret, device, client=None):
+        self.calls[("energy_flow", device["pn"])] += 1
+        return {"bt_status": []}
+
+    async def get_device_pars(self, token, secret, device, client=None):
+        return {"parameter": []}
+
+    async def get_device_ctrl_fields(self, token, secret, device, client=None):
+        return {"field": []}
+
+    async def get_inverter_output_priority(self, token, secret, ctrl_fields, device, client=None):
+        return {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(coordinator_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cloud(monkeypatch, clock):
+    cloud = FakeCloud(clock)
+    for name in ("get_devices", "get_device_last_data", "get_device_energy_flow", "get_device_pars",
+                 "get_device_ctrl_fields", "get_inverter_output_priority"):
+        monkeypatch.setattr(coordinator_module, name, getattr(cloud, name))
+    return cloud
+
+
+def config_entry() -> ConfigEntry:
+    return ConfigEntry(
+        data={},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source="user",
+        subentries_data=None,
+        title="test",
+        unique_id=None,
+        version=1,
+    )
+
+
+def test_out_of_phase_device_is_not_fetched_on_another_devices_wake(tmp_path, clock, cloud):
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        coordinator = MainCoordinator(hass, config_entry(), None, SimpleNamespace(auth=AUTH))
+        wakes = []
+        try:
+            for _ in range(40):
+                before = cloud.calls.copy()
+                coordinator.data = await coordinator._fetch_data(AUTH)
+                wakes.append({pn for pn in PHASES if cloud.calls[("last_data", pn)] > before[("last_data", pn)]})
+                clock.now += coordinator.update_interval.total_seconds()
+        finally:
+            await hass.async_stop(force=True)
+        return coordinator, wakes
+
+    coordinator, wakes = asyncio.run(scenario())
+    assert all(coordinator.cadences[pn].period == PERIOD for pn in PHASES)
+
+    # once the cadences are learned, each wake is due for one device only
+    learned = wakes[10:]
+    assert learned.count({"A"}) >= 5
+    assert learned.count({"B"}) >= 5
+    assert {"A", "B"} not in learned
+    # never more live calls than uploads, and one device list per wake
+    elapsed = clock.now - START
+    for pn in PHASES:
+        assert cloud.calls[("last_data", pn)] <= elapsed / PERIOD + 3
+        assert cloud.calls[("energy_flow", pn)] <= cloud.calls[("last_data", pn)]
+    assert cloud.calls["devices"] <= len(wakes)
+
+
+def test_sections_cut_by_the_sweep_deadline_are_not_backed_off(tmp_path, monkeypatch):
+    device = {"pn": "A", "devcode": 2341, "devaddr": 1, "sn": "A", "status": 0}
+
+    async def get_direct_data(token, secret, device_data, command, client=None):
+        if command == "QPIRI":
+            return {"error": "NAK response received. Command not accepted."}
+        await asyncio.sleep(1)
+        return {"grid_voltage": 230.0}
+
+    monkeypatch.setattr(direct_coordinator_module, "get_direct_data", get_direct_data)
+    # the failing command first, so it answers before the deadline
+    monkeypatch.setattr(direct_coordinator_module, "DIRECT_POLL_SECTIONS", ("qpiri", "qpigs", "qpigs2"))
+
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        coordinator = DirectCoordinator(hass, config_entry(), None, SimpleNamespace(auth=AUTH))
+        coordinator.devices = [device]
+        coordinator.section_cache.store(ACCOUNT_KEY, "devices", coordinator.devices)
+        try:
+            # QPIRI answers at once with an error, QPIGS runs into the deadline and QPIGS2 never gets its turn
+            cut = await coordinator._fetch_data(AUTH, hass.loop.time() + 0.1)
+        finally:
+            await hass.async_stop(force=True)
+        return coordinator, cut
+
+    coordinator, cut = asyncio.run(scenario())
+    assert cut == {"A": {"qpiri": {}, "qpigs": {}, "qpigs2": {}}}
+    backoff = coordinator.section_backoff
+    assert backoff.failures("A", "qpiri") == 1
+    assert backoff.failures("A", "qpigs") == 0
+    assert backoff.failures("A", "qpigs2") == 0
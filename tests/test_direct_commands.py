@@ -0,0 +1,191 @@
+import pytest
+
+from custom_components.dess_monitor.api.commands.direct_commands import build_command_frame, crc_xmodem, \
+    decode_direct_response, direct_commands, get_command_hex, get_command_name_by_hex, get_response_decoder, \
+    pi30_crc
+
+# QPIGS answer captured from a device, as sendCmdToDevice returns it
+CAPTURED_QPIGS = (
+    "28 32 33 31 2E 38 20 35 30 2E 30 20 32 33 31 2E 38 20 35 30 2E 30 20 30 31 31 35 20 30 30 31 36 20 30 30 32 "
+    "20 34 30 38 20 32 37 2E 30 30 20 30 31 32 20 30 39 35 20 30 30 33 30 20 30 30 30 30 20 30 30 30 2E 30 20 30 "
+    "30 2E 30 30 20 30 30 30 30 30 20 30 30 30 31 30 31 30 31 20 30 30 20 30 30 20 30 30 30 30 31 20 30 31 30 9E "
+    "CA 0D"
+)
+
+# payloads of the answers of the supported commands
+SAMPLE_RESPONSES = {
+    "QPIGS": "231.8 50.0 231.8 50.0 0115 0016 002 408 27.00 012 095 0030 0000 000.0 00.00 00000 00010101 00 00 "
+             "00001 010",
+    "QPIGS2": "03.1 245.6 00123",
+    "QPIRI": "230.0 21.7 230.0 50.0 21.7 5000 5000 48.0 46.0 42.0 56.4 54.0 2 30 060 0 2 3 9 01 0 0 54.0 0 1 100",
+    "QMOD": "B",
+    "QMN": "VMII-NXPW5KW",
+    "QID": "92932004102443",
+    "QSID": "92932004102443",
+    "QFLAG": "EbkuvxzDajy",
+    "QVFW": "VERFW:00072.70",
+    "QBEQI": "1 030 030 080 021 55.40 224 030 000",
+    "QPGS1": "1 92932004102443 B 00 000.0 00.00 230.0 50.00 0115 0016 002 51.2 000 095 000.0 000 00230 00016 002 "
+             "10100010 2 1 060 120 030 00.0 003",
+}
+
+# request frames of the former hard-coded table; its QPIGS2 entry "... 32 2B 8A 0D" had a wrong CRC,
+# devices expect "... 32 68 2D 0D"
+LEGACY_COMMAND_FRAMES = {
+    "QPIGS": "51 50 49 47 53 B7 A9 0D",
+    "QPIGS2": "51 50 49 47 53 32 68 2D 0D",
+    "QPIRI": "51 50 49 52 49 F8 54 0D",
+    "QMOD": "51 4D 4F 44 49 C1 0D",
+    "QPIWS": "51 50 49 57 53 B4 DA 0D",
+    "QVFW": "51 56 46 57 62 99 0D",
+    "QMCHGCR": "51 4D 43 48 47 43 52 D8 55 0D",
+    "QMUCHGCR": "51 4D 55 43 48 47 43 52 26 34 0D",
+    "QFLAG": "51 46 4C 41 47 98 74 0D",
+    "QSID": "51 53 49 44 BB 05 0D",
+    "QID": "51 49 44 D6 EA 0D",
+    "QMN": "51 4D 4E BB 64 0D",
+}
+
+
+def response_frame(ascii_str: str) -> str:
+    """Answer frame as a hex string: '(' + payload + CRC + CR."""
+    frame = b"(" + ascii_str.encode("ascii")
+    frame += pi30_crc(frame) + b"\r"
+    return " ".join(f"{byte:02X}" for byte in frame)
+
+
+def crc_xmodem_bitwise(data) -> int:
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1) & 0xFFFF
+    return crc
+
+
+@pytest.mark.parametrize("data", [b"", b"QPIGS", b"QPGS1", bytes(range(256))])
+def test_crc_xmodem(data):
+    assert crc_xmodem(data) == crc_xmodem_bitwise(data)
+
+
+def test_pi30_crc_escapes_reserved_bytes():
+    escaped = {0x28: 0x29, 0x0D: 0x0E, 0x0A: 0x0B}
+    found = set()
+    for value in range(4096):
+        data = value.to_bytes(2, "big")
+        crc = crc_xmodem(data)
+        high, low = pi30_crc(data)
+        assert high == escaped.get(crc >> 8, crc >> 8)
+        assert low == escaped.get(crc & 0xFF, crc & 0xFF)
+        found.update(byte for byte in (crc >> 8, crc & 0xFF) if byte in escaped)
+    assert found == set(escaped)
+
+
+def test_captured_qpigs():
+    record = decode_direct_response("QPIGS", CAPTURED_QPIGS)
+    assert record["grid_voltage"] == 231.8
+    assert record["output_apparent_power"] == 115
+    assert record["battery_voltage"] == 27.0
+    assert record["battery_capacity"] == 95
+    assert record["device_status_bits_b7_b0"] == "00010101"
+    assert record["load_on"] is True
+    assert record["sbu_priority_version"] is False
+    assert record["switch_on"] is True
+    assert record["eeprom_version"] == "00"
+
+
+@pytest.mark.parametrize("command", SAMPLE_RESPONSES)
+def test_sample_responses_decode(command):
+    record = decode_direct_response(command, response_frame(SAMPLE_RESPONSES[command]))
+    assert record
+    assert "error" not in record
+    assert "Raw" not in record
+
+
+def test_qpigs2():
+    record = decode_direct_response("QPIGS2", response_frame(SAMPLE_RESPONSES["QPIGS2"]))
+    assert record == {"pv_current": 3.1, "pv_voltage": 245.6, "pv_daily_energy": 123.0}
+
+
+def test_qpiri_enums():
+    record = decode_direct_response("QPIRI", response_frame(SAMPLE_RESPONSES["QPIRI"]))
+    assert record["rated_output_active_power"] == 5000
+    assert record["bulk_charging_voltage"] == 56.4
+    assert record["battery_type"] == "UserDefined"
+    assert record["ac_input_voltage_range"] == "Appliance"
+    assert record["output_source_priority"] == "SBU"
+    assert record["charger_source_priority"] == "OnlySolar"
+    assert record["parallel_mode"] == "Master"
+    assert record["rated_battery_capacity"] == 100.0
+
+
+def test_qpiri_unknown_enum_value_is_kept():
+    fields = SAMPLE_RESPONSES["QPIRI"].split()
+    fields[12] = "9"
+    record = decode_direct_response("QPIRI", response_frame(" ".join(fields)))
+    assert record["battery_type"] == "9"
+    assert record["max_utility_charging_current"] == 30
+
+
+def test_qmod():
+    assert decode_direct_response("QMOD", response_frame("B")) == {"operating_mode": "Battery"}
+    assert decode_direct_response("QMOD", response_frame("X")) == {"operating_mode": "Unknown"}
+
+
+def test_qbeqi():
+    record = decode_direct_response("QBEQI", response_frame(SAMPLE_RESPONSES["QBEQI"]))
+    assert record["equalization_function"] == 1
+    assert record["equalization_time"] == 30
+    assert record["reserved_1"] == "55.40"
+    assert record["elapsed_time"] == 0
+
+
+def test_qpgs():
+    assert get_response_decoder("QPGS1") is get_response_decoder("qpgs0")
+    assert get_response_decoder("QPGS") is None
+    assert get_response_decoder("QPIGS3") is None
+
+    record = decode_direct_response("QPGS1", response_frame(SAMPLE_RESPONSES["QPGS1"]))
+    assert record["serial_number"] == "92932004102443"
+    assert record["work_mode"] == "Battery"
+    assert record["battery_voltage"] == 51.2
+    assert record["inverter_status_bits"] == "10100010"
+    assert record["scc_ok"] is True
+    assert record["ac_charging_on"] is False
+    assert record["line_loss"] is False
+    assert record["charger_source_priority"] == "SolarFirst"
+    assert record["battery_discharge_current"] == 3
+
+
+def test_text_responses():
+    assert decode_direct_response("QVFW", response_frame("VERFW:00072.70")) == {"Firmware Version": "00072.70"}
+    assert decode_direct_response("QMN", response_frame("VMII-NXPW5KW")) == {"Model": "VMII-NXPW5KW"}
+    assert decode_direct_response("QPIWS", response_frame("0000")) == {"Raw": "0000"}
+
+
+def test_invalid_responses():
+    assert "error" in decode_direct_response("QPIGS", "null")
+    assert "error" in decode_direct_response("QPIGS", "not hex")
+    assert "error" in decode_direct_response("QPIGS", response_frame("NAK"))
+
+    corrupted = CAPTURED_QPIGS.replace("32 33 31", "32 33 32", 1)
+    assert "CRC" in decode_direct_response("QPIGS", corrupted)["error"]
+
+
+@pytest.mark.parametrize("command", LEGACY_COMMAND_FRAMES)
+def test_command_frames_match_legacy_table(command):
+    assert get_command_hex(command) == LEGACY_COMMAND_FRAMES[command]
+    assert direct_commands[command] == LEGACY_COMMAND_FRAMES[command]
+
+
+@pytest.mark.parametrize("command", ["QPIGS", "QPGS0", "QPGS12", "QBEQI", "QPIWS"])
+def test_command_name_round_trip(command):
+    assert build_command_frame(command.lower()) == build_command_frame(command)
+    assert get_command_name_by_hex(get_command_hex(command)) == command
+
+
+def test_unknown_command_hex():
+    assert get_command_name_by_hex("51 50 49 47 53 00 00 0D") == "Unknown HEX command"
+    assert get_command_name_by_hex("zz") == "Unknown HEX command"
+    with pytest.raises(ValueError):
+        build_command_frame("  ")
@@ -0,0 +1,153 @@
+import struct
+
+import pytest
+
+from custom_components.dess_monitor.api.commands.direct_modbus_commands import REGISTER_DEFINITIONS, \
+    ModbusReadPlanner, build_combined_modbus_query, build_modbus_request, calculate_crc16, \
+    human_readable_requests, iter_modbus_frames, parse_modbus_response, parse_modbus_response_by_slave, \
+    plan_register_reads, wanted_register_blocks
+
+# answer of a device to human_readable_requests
+RAW_RESPONSE = bytes.fromhex("""
+    01 03 04 00 00 00 00 FA 33 01 03 04 00 00 00 09 3A 35 01 03 02 73 00 9D 74
+    01 03 02 00 03 F8 45 01 03 1A 39 32 42 33 32 35 30 31 31 30 30 34 36 36 00
+    00 00 00 00 00 00 00 00 00 12 51 9C C5 01 03 02 00 03 F8 45 01 03 02 00 00
+    B8 44 01 03 02 00 00 B8 44 01 03 02 13 89 74 D2 01 03 04 00 00 00 24 FA 28
+    01 03 02 13 89 74 D2 01 03 0A 02 2E 00 00 00 00 00 64 00 1C 10 CB 01 03 08
+    00 6F 00 00 00 00 00 1D CA D8 01 03 02 00 00 B8 44 01 03 02 00 00 B8 44
+    01 03 06 08 FB 00 24 00 1C 84 2B 01 03 10 08 FB 00 05 00 16 00 72 00 01 11
+    FF 00 00 00 00 65 A6 01 03 06 11 F3 00 02 00 7C 86 00 01 03 10 00 00 00 02
+    00 02 00 00 00 00 00 02 08 FC 13 88 5E 65 01 03 1E 00 02 02 76 00 03 00 00
+    00 00 00 00 00 03 02 2E 02 2E 00 00 04 B0 02 58 00 00 01 FE 01 F4 A5 47 01
+    03 06 01 E0 00 32 00 5F 40 85 01 03 0C 00 14 00 00 02 48 00 3C 00 78 00 1E
+    CB 49 01 03 10 00 01 00 03 00 01 00 00 00 00 00 01 00 01 00 01 89 A6 01 03
+    04 00 00 00 00 FA 33 01 03 04 00 00 00 01 3B F3 01 03 12 07 E9 00 01 00 1D
+    00 04 00 39 00 0A 00 7A 00 00 06 02 EA 44
+""")
+
+
+def crc16_bitwise(data) -> int:
+    """Bit by bit Modbus CRC16, the implementation the table replaced."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 0x0001 else crc >> 1
+    return crc
+
+
+def legacy_parse(raw_bytes, requests=human_readable_requests) -> dict:
+    """Register decoding of the former parse_modbus_response, word by word."""
+    results = {}
+    for (start_addr, reg_count), (_, _, data) in zip(requests, iter_modbus_frames(raw_bytes, (1,))):
+        values = [(data[2 * r] << 8) | data[2 * r + 1] for r in range(reg_count)]
+        offset = 0
+        while offset < reg_count:
+            reg_addr = start_addr + offset
+            if reg_addr not in REGISTER_DEFINITIONS:
+                results[f"Raw_{reg_addr}"] = values[offset]
+                offset += 1
+                continue
+            name, dtype, scale, nregs = REGISTER_DEFINITIONS[reg_addr]
+            if dtype == "ULong":
+                results[name] = (values[offset] << 16) | values[offset + 1]
+            elif dtype == "Int":
+                raw_val = values[offset]
+                if raw_val & 0x8000:
+                    raw_val = -((~raw_val & 0xFFFF) + 1)
+                results[name] = raw_val / scale
+            elif dtype == "UInt":
+                results[name] = values[offset] / scale
+            elif dtype == "ASCII":
+                results[name] = "".join(
+                    chr(byte)
+                    for word in values[offset:offset + nregs]
+                    for byte in ((word >> 8) & 0xFF, word & 0xFF)
+                    if byte
+                )
+            else:
+                results[name] = values[offset]
+            offset += nregs
+    return results
+
+
+def frame(slave_id, function, payload: bytes) -> bytes:
+    pdu = bytes((slave_id, function)) + payload
+    return pdu + struct.pack("<H", calculate_crc16(pdu))
+
+
+@pytest.mark.parametrize("data", [b"", b"\x01\x03\x00\x64\x00\x02", RAW_RESPONSE, bytes(range(256)) * 4])
+def test_crc16_table_matches_bitwise(data):
+    assert calculate_crc16(data) == crc16_bitwise(data)
+    assert calculate_crc16(memoryview(data)) == crc16_bitwise(data)
+
+
+def test_request_frame():
+    assert build_modbus_request(0x01, 100, 2) == bytes.fromhex("01 03 00 64 00 02 85 D4")
+    combined = build_combined_modbus_query(0x01, human_readable_requests)
+    assert combined == b"".join(build_modbus_request(0x01, *request) for request in human_readable_requests)
+    assert len(combined) == 8 * len(human_readable_requests)
+
+
+def test_parse_matches_legacy_decoder():
+    parsed = parse_modbus_response(RAW_RESPONSE)
+    assert parsed == legacy_parse(RAW_RESPONSE)
+    assert parse_modbus_response(memoryview(RAW_RESPONSE)) == parsed
+    assert parsed["Fault Code"] == 0
+
+
+def test_corrupted_frame_is_skipped():
+    broken = bytearray(RAW_RESPONSE)
+    broken[7] ^= 0xFF  # CRC of the first frame
+    parsed = parse_modbus_response(bytes(broken), requests=human_readable_requests[1:])
+    assert parsed == legacy_parse(RAW_RESPONSE[9:], human_readable_requests[1:])
+
+
+def test_exception_frame_takes_the_slot_of_its_request():
+    requests = [(100, 2), (171, 1)]
+    raw = frame(1, 0x83, b"\x02") + frame(1, 0x03, b"\x02\x73\x00")
+    frames = list(iter_modbus_frames(raw))
+    assert [(slave_id, function) for slave_id, function, _ in frames] == [(1, 0x83), (1, 0x03)]
+    assert parse_modbus_response(raw, requests=requests) == legacy_parse(
+        frame(1, 0x03, b"\x02\x73\x00"), requests[1:]
+    )
+
+
+def test_parse_by_slave():
+    requests = [(171, 1)]
+    raw = frame(1, 0x03, b"\x02\x00\x01") + frame(2, 0x03, b"\x02\x00\x02")
+    by_slave = parse_modbus_response_by_slave(raw, requests)
+    assert set(by_slave) == {1, 2}
+    assert by_slave[1] != by_slave[2]
+
+
+def test_plan_covers_every_register():
+    blocks = wanted_register_blocks()
+    plan = plan_register_reads(blocks)
+    assert len(plan) < len(human_readable_requests)
+    planned = {reg for start, count in plan for reg in range(start, start + count)}
+    wanted = {reg for start, end in blocks for reg in range(start, end)}
+    assert wanted <= planned
+    assert all(count <= 64 for _, count in plan)
+
+
+def test_plan_merges_small_gaps_only():
+    assert plan_register_reads(((0, 2), (4, 6)), max_gap=2) == ((0, 6),)
+    assert plan_register_reads(((0, 2), (10, 12)), max_gap=2) == ((0, 2), (10, 2))
+    assert plan_register_reads(((0, 100),), max_frame=40) == ((0, 40), (40, 40), (80, 20))
+
+
+def test_planner_learns_from_exceptions():
+    planner = ModbusReadPlanner({0: ("A", "UInt", 1, 2), 3: ("B", "UInt", 1, 1)})
+    assert planner.plan(1) == ((0, 4),)
+    # the merged window failed: its blocks are read alone next time
+    planner.observe_response(1, ((0, 4),), frame(1, 0x83, b"\x02"))
+    assert planner.plan(1) == ((0, 2), (3, 1))
+    # a block that fails alone is not read any more
+    planner.record_exception(1, 3, 1)
+    assert planner.plan(1) == ((0, 2),)
+    assert planner.plan(2) == ((0, 4),)
+
+    restored = ModbusReadPlanner({0: ("A", "UInt", 1, 2), 3: ("B", "UInt", 1, 1)})
+    restored.load(planner.as_dict())
+    assert restored.plan(1) == planner.plan(1)
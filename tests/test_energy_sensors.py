@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.dess_monitor.sensors import energy_sensors
+from custom_components.dess_monitor.sensors.energy_sensors import MyEnergySensor
+
+WALL_CLOCK = datetime(2026, 1, 1, 12, 0, 0)
+# the datalogger clock runs three hours ahead of ours, e.g. another time zone
+SAMPLE_CLOCK = WALL_CLOCK + timedelta(hours=3)
+
+
+class FakeDatetime(datetime):
+    current = WALL_CLOCK
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def sensor(monkeypatch):
+    monkeypatch.setattr(energy_sensors, "datetime", FakeDatetime)
+    FakeDatetime.current = WALL_CLOCK
+    # the integration state of a freshly added sensor, without an entity platform
+    sensor = MyEnergySensor.__new__(MyEnergySensor)
+    sensor._prev_value = None
+    sensor._prev_value_timestamp = WALL_CLOCK
+    sensor._prev_sample_time = None
+    sensor._prev_on_sample_clock = False
+    sensor._attr_native_value = 0
+    sensor._async_write_state_if_changed = lambda: None
+    return sensor
+
+
+def test_integrates_over_sample_times(sensor):
+    sensor.update_energy_value(1000, SAMPLE_CLOCK)
+    sensor.update_energy_value(1000, SAMPLE_CLOCK + timedelta(minutes=6))
+    assert sensor._attr_native_value == pytest.approx(100)
+    # a sample seen twice is not counted again
+    sensor.update_energy_value(1000, SAMPLE_CLOCK + timedelta(minutes=6))
+    assert sensor._attr_native_value == pytest.approx(100)
+
+
+def test_clock_switch_is_not_integrated(sensor):
+    sensor.update_energy_value(1000, SAMPLE_CLOCK)
+    # a sample without gts is timed by our clock, three hours "before" the last sample
+    FakeDatetime.current = WALL_CLOCK + timedelta(minutes=1)
+    sensor.update_energy_value(1000)
+    assert sensor._attr_native_value == 0
+
+    FakeDatetime.current = WALL_CLOCK + timedelta(minutes=7)
+    sensor.update_energy_value(1000)
+    assert sensor._attr_native_value == pytest.approx(100)
+
+    # back on the datalogger clock, three hours "after" our last reading
+    sensor.update_energy_value(1000, SAMPLE_CLOCK + timedelta(minutes=10))
+    assert sensor._attr_native_value == pytest.approx(100)
+    sensor.update_energy_value(1000, SAMPLE_CLOCK + timedelta(minutes=16))
+    assert sensor._attr_native_value == pytest.approx(200)
+
+
+def test_wall_clock_going_back_does_not_shrink_the_total(sensor):
+    FakeDatetime.current = WALL_CLOCK + timedelta(minutes=6)
+    sensor.update_energy_value(1000)
+    FakeDatetime.current = WALL_CLOCK + timedelta(minutes=12)
+    sensor.update_energy_value(1000)
+    assert sensor._attr_native_value == pytest.approx(100)
+
+    FakeDatetime.current = WALL_CLOCK
+    sensor.update_energy_value(1000)
+    assert sensor._attr_native_value == pytest.approx(100)
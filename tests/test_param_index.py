@@ -0,0 +1,173 @@
+import json
+
+import pytest
+
+from custom_components.dess_monitor.api import helpers
+from custom_components.dess_monitor.api.helpers import ParamIndex, active_param_index, get_param_index, \
+    get_sensor_value_simple, resolve_param
+from custom_components.dess_monitor.api.resolvers.data_resolvers import RESOLVED_KEY, RESOLVERS, resolve_all
+from custom_components.dess_monitor.api.resolvers.resolution_plan import ResolutionPlans
+
+
+@pytest.fixture
+def plans():
+    return ResolutionPlans()
+
+
+def lookup(name, data, device, plans):
+    """Sensor value as an entity reads it during an update of the coordinator."""
+    with active_param_index(ParamIndex(data, plans)):
+        return get_sensor_value_simple(name, data, device)
+
+
+def collect_keys(data, field) -> set[str]:
+    keys = set()
+
+    def walk(current):
+        if isinstance(current, dict):
+            if isinstance(current.get(field), str):
+                keys.add(current[field])
+            for value in current.values():
+                walk(value)
+        elif isinstance(current, list):
+            for item in current:
+                walk(item)
+
+    walk(data)
+    return keys
+
+
+@pytest.mark.parametrize("field", ["id", "par"])
+def test_lookups_match_resolve_param(device_payload, field):
+    index = ParamIndex(device_payload)
+    table = index.ids if field == "id" else index.pars
+    keys = collect_keys(device_payload, field)
+    assert keys
+    for key in keys:
+        for variant in (key, key.upper(), key.lower()):
+            expected = resolve_param(device_payload, {field: variant}, case_insensitive=True)
+            assert table.get(variant.lower()) is expected
+    assert table.get("no_such_key") is resolve_param(device_payload, {field: "no_such_key"}, case_insensitive=True)
+
+
+def test_first_entry_wins():
+    data = {
+        "last_data": [{"id": "Battery", "val": "1"}],
+        "pars": {"gd_": [{"id": "battery", "val": "2"}], "bt_": [{"par": "BATTERY", "val": "3"}]},
+    }
+    index = ParamIndex(data)
+    assert index.ids["battery"]["val"] == "1"
+    assert index.pars["battery"]["val"] == "3"
+    assert index.sections[("id", "battery")] == "last_data"
+    assert index.sections[("par", "battery")] == "pars"
+
+
+def test_active_index_belongs_to_its_payload(device_payload):
+    index = ParamIndex(device_payload)
+    with active_param_index(index):
+        assert get_param_index(device_payload) is index
+        other = dict(device_payload)
+        assert get_param_index(other) is not index
+    assert get_param_index(device_payload) is not index
+
+
+def plain_resolve(data, device_data) -> dict:
+    """Every resolver evaluated on its own, no index and no memo."""
+    values = {}
+    for name, resolver in RESOLVERS.items():
+        try:
+            values[name] = resolver.__wrapped__(data, device_data)
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+            pass
+    return values
+
+
+def test_resolve_all_matches_plain_resolvers(device_payload, plans):
+    device = device_payload["device"]
+    expected = plain_resolve(device_payload, device)
+    assert expected
+
+    assert resolve_all(device_payload, device, ParamIndex(device_payload)).as_dict() == expected
+    assert resolve_all(device_payload, device, ParamIndex(device_payload, plans)).as_dict() == expected
+    assert plans.for_device(device["pn"])
+    # the learned plans give the same answers on the next update
+    assert resolve_all(device_payload, device, ParamIndex(device_payload, plans)).as_dict() == expected
+
+
+def test_resolved_record_is_read_only(device_payload):
+    index = ParamIndex(device_payload)
+    resolved = resolve_all(device_payload, device_payload["device"], index)
+    with pytest.raises(TypeError):
+        resolved.values["resolve_battery_voltage"] = 0
+    resolved.as_dict()["resolve_battery_voltage"] = 0
+    assert resolved.values == index.resolved
+
+
+def test_payloads_compare_by_value(device_payload):
+    device = device_payload["device"]
+    first = dict(device_payload)
+    first[RESOLVED_KEY] = resolve_all(first, device, ParamIndex(first))
+    second = dict(device_payload)
+    second[RESOLVED_KEY] = resolve_all(second, device, ParamIndex(second))
+    assert first == second
+
+    changed = dict(device_payload, last_data={})
+    changed[RESOLVED_KEY] = resolve_all(changed, device, ParamIndex(changed))
+    assert changed != first
+
+
+def test_plan_hit_is_a_direct_lookup(monkeypatch, plans):
+    device = {"pn": "PN1"}
+    data = {"last_data": [{"id": "eybond_read_24", "val": "51.0"}]}
+    assert lookup("battery_voltage", data, device, plans) == "51.0"
+    assert plans.for_device("PN1") == {"battery_voltage": ("id", "eybond_read_24", "last_data")}
+
+    def no_scan(name):
+        raise AssertionError("alias scan on a plan hit")
+
+    monkeypatch.setattr(helpers, "_sensor_keys", no_scan)
+    next_update = {"last_data": [{"id": "eybond_read_24", "val": "50.5"}]}
+    assert lookup("battery_voltage", next_update, device, plans) == "50.5"
+
+
+def test_plan_never_skips_a_higher_priority_alias(plans):
+    device = {"pn": "PN1"}
+    low = {"last_data": [{"id": "eybond_read_24", "val": "51.0"}]}
+    assert lookup("battery_voltage", low, device, plans) == "51.0"
+
+    # a higher priority alias appears after the plan was learned
+    both = {"last_data": [{"id": "eybond_read_24", "val": "51.0"}, {"id": "bt_battery_voltage", "val": "52.0"}]}
+    assert lookup("battery_voltage", both, device, plans) == "52.0"
+    assert plans.for_device("PN1")["battery_voltage"] == ("id", "bt_battery_voltage", "last_data")
+
+
+def test_disabled_par_falls_back_to_the_scan(plans):
+    device = {"pn": "PN1"}
+    enabled = {"pars": {"bt_": [{"par": "Battery Voltage", "val": "48.0", "status": 1}]},
+               "last_data": [{"id": "eybond_read_24", "val": "51.0"}]}
+    assert lookup("battery_voltage", enabled, device, plans) == "48.0"
+    disabled = {"pars": {"bt_": [{"par": "Battery Voltage", "val": "48.0", "status": 0}]},
+                "last_data": [{"id": "eybond_read_24", "val": "51.0"}]}
+    assert lookup("battery_voltage", disabled, device, plans) == "51.0"
+
+
+def test_plans_are_per_device(plans):
+    first = {"last_data": [{"id": "eybond_read_24", "val": "51.0"}]}
+    second = {"pars": {"bt_": [{"par": "Battery Voltage", "val": "48.0", "status": 1}]}}
+    assert lookup("battery_voltage", first, {"pn": "PN1", "devcode": 2341}, plans) == "51.0"
+    assert lookup("battery_voltage", second, {"pn": "PN2", "devcode": 2341}, plans) == "48.0"
+    assert plans.for_device("PN1")["battery_voltage"][1] == "eybond_read_24"
+    assert plans.for_device("PN2")["battery_voltage"][1] == "battery voltage"
+
+
+def test_plans_persist(device_payload, plans):
+    device = device_payload["device"]
+    resolve_all(device_payload, device, ParamIndex(device_payload, plans))
+    assert plans.dirty
+
+    restored = ResolutionPlans()
+    restored.load(json.loads(json.dumps(plans.as_dict())))
+    assert restored.for_device(device["pn"]) == plans.for_device(device["pn"])
+    index = ParamIndex(device_payload, restored)
+    assert restored.steps_for(device["pn"], index.alias_keys()) == plans.for_device(device["pn"])
+    assert not restored.dirty
@@ -0,0 +1,75 @@
+import pytest
+
+from custom_components.dess_monitor.coordinators import section_cache
+from custom_components.dess_monitor.coordinators.section_cache import BACKOFF_BASE, BACKOFF_MAX, SectionBackoff
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(section_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_unknown_section_is_not_blocked(clock):
+    backoff = SectionBackoff()
+    assert not backoff.is_blocked("pn", "qpigs")
+    assert backoff.failures("pn", "qpigs") == 0
+    assert backoff.retry_in("pn", "qpigs") is None
+
+
+def test_delay_doubles_up_to_the_maximum(clock):
+    backoff = SectionBackoff()
+    delays = []
+    for _ in range(10):
+        backoff.failed("pn", "qpigs")
+        delays.append(backoff.retry_in("pn", "qpigs"))
+    assert delays[:3] == [BACKOFF_BASE, 2 * BACKOFF_BASE, 4 * BACKOFF_BASE]
+    assert max(delays) == BACKOFF_MAX
+    assert delays[-1] == BACKOFF_MAX
+    assert backoff.failures("pn", "qpigs") == 10
+
+
+def test_section_is_blocked_until_the_delay_expired(clock):
+    backoff = SectionBackoff()
+    backoff.failed("pn", "qpigs")
+    assert backoff.is_blocked("pn", "qpigs")
+
+    clock.now += BACKOFF_BASE - 1
+    assert backoff.is_blocked("pn", "qpigs")
+    assert backoff.retry_in("pn", "qpigs") == 1
+
+    clock.now += 1
+    assert not backoff.is_blocked("pn", "qpigs")
+    assert backoff.retry_in("pn", "qpigs") == 0
+    # the failure count survives until a success
+    assert backoff.failures("pn", "qpigs") == 1
+
+
+def test_sections_and_devices_are_independent(clock):
+    backoff = SectionBackoff()
+    backoff.failed("pn", "qpigs")
+    assert not backoff.is_blocked("pn", "qpiri")
+    assert not backoff.is_blocked("other", "qpigs")
+
+
+def test_success_resets_the_delay(clock):
+    backoff = SectionBackoff(base=5, maximum=60)
+    backoff.failed("pn", "qpigs")
+    backoff.failed("pn", "qpigs")
+    assert backoff.retry_in("pn", "qpigs") == 10
+
+    backoff.succeeded("pn", "qpigs")
+    assert not backoff.is_blocked("pn", "qpigs")
+    assert backoff.failures("pn", "qpigs") == 0
+
+    backoff.failed("pn", "qpigs")
+    assert backoff.retry_in("pn", "qpigs") == 5